@@ -0,0 +1,59 @@
+"""
+Shared test doubles: ultralytics-like results and a stub model (no weights needed)
+
+Test modules import them with ``from conftest import StubModel``.
+"""
+
+import numpy as np
+
+# Where a stub box sits unless a test says otherwise
+BOX = (1, 2, 11, 12)
+
+
+class FakeBoxes:
+    """Array-backed stand-in for ultralytics ``Boxes``"""
+
+    def __init__(self, cls_ids, confs, xyxy=None):
+        self.cls = np.array(cls_ids, dtype=np.float32).reshape(-1)
+        self.conf = np.array(confs, dtype=np.float32).reshape(-1)
+        if xyxy is None:
+            xyxy = [BOX] * len(self.conf)
+        self.xyxy = np.array(xyxy, dtype=np.float32).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class FakeResult:
+    """Stand-in for one ultralytics ``Results``; ``boxes=None`` mimics a result without boxes"""
+
+    def __init__(self, cls_ids=(), confs=(), xyxy=None, boxes=...):
+        self.boxes = FakeBoxes(cls_ids, confs, xyxy) if boxes is ... else boxes
+
+
+class StubModel:
+    """One ``cls_id`` box of confidence ``conf`` per frame ('happy' by default).
+
+    ``calls`` records the batch size and ``sizes`` the ``imgsz`` of every
+    predict call. With ``gate`` set, predict waits for it, which keeps a job
+    running. Subclasses override ``answer`` for per-frame results.
+    """
+
+    def __init__(self, cls_id: int = 4, conf: float = 0.9, box=BOX, gate=None):
+        self.cls_id = cls_id
+        self.conf = conf
+        self.box = box
+        self.gate = gate
+        self.calls = []
+        self.sizes = []
+
+    def answer(self, frame, **kwargs) -> FakeResult:
+        return FakeResult([self.cls_id], [self.conf], [self.box])
+
+    def predict(self, frames, **kwargs):
+        if self.gate is not None:
+            self.gate.wait(5)
+        frames = frames if isinstance(frames, list) else [frames]
+        self.calls.append(len(frames))
+        self.sizes.append(kwargs.get("imgsz"))
+        return [self.answer(frame, **kwargs) for frame in frames]
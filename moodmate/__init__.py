@@ -0,0 +1,3 @@
+"""
+Core building blocks for AI MoodMate that do not depend on the Streamlit UI.
+"""
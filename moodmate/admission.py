@@ -0,0 +1,268 @@
+"""
+Admission control in front of the model: a bounded priority queue of predict calls.
+
+Without it every Run Detection, video job and webcam frame calls
+``model.predict`` immediately, so a burst of users slows everyone down at
+once. Here each predict call first takes a slot; there are as many slots as
+model replicas (``ModelPool.size``, 1 for a single model). Callers that
+cannot get one wait in a queue ordered by:
+
+- priority: short interactive image requests go first, then live webcam
+  frames, then background video frames (a video job waits between frames,
+  so an image request never waits for a whole video);
+- age: a waiting request gains one priority level per ``AGING`` seconds, so
+  video work is delayed under load but never starved;
+- arrival order within the same level.
+
+A session holds at most ``per_session`` slots at a time; its further requests
+wait even when slots are free, so one user cannot take every replica.
+Interactive requests see their queue position through ``on_wait``; when the
+queue already holds ``max_queue`` requests they are rejected with
+``Overloaded`` instead of piling up. Webcam frames ask with ``timeout=0``
+and simply reuse the last detections when no slot is free.
+
+    MOODMATE_MAX_QUEUE       waiting requests before new ones are rejected (default 16)
+    MOODMATE_SESSION_LIMIT   slots one session may hold at once (default 1)
+
+Queue length, admissions, rejections and wait times are exported by
+``prometheus_text()``.
+"""
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from moodmate.metrics import Histogram, histogram_lines
+from moodmate.model import ModelPool
+
+IMAGE, STREAM, VIDEO = "image", "stream", "video"
+# Lower runs first
+PRIORITY = {IMAGE: 0, STREAM: 1, VIDEO: 2}
+
+MAX_QUEUE_ENV = "MOODMATE_MAX_QUEUE"
+SESSION_LIMIT_ENV = "MOODMATE_SESSION_LIMIT"
+MAX_QUEUE = 16
+SESSION_LIMIT = 1
+# Seconds of waiting that raise a request by one priority level
+AGING = 5.0
+# How often a waiting caller re-reports its queue position
+POLL_INTERVAL = 0.25
+# Suggested client back-off when the queue is full
+RETRY_AFTER = 2
+
+
+class Overloaded(RuntimeError):
+    """The request was not admitted: the queue is full or ``timeout`` ran out."""
+
+    def __init__(self, message: str, retry_after: int = RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    __slots__ = ("session", "kind", "seq", "queued_at")
+
+    def __init__(self, session: str, kind: str, seq: int, queued_at: float):
+        self.session = session
+        self.kind = kind
+        self.seq = seq
+        self.queued_at = queued_at
+
+
+class AdmissionController:
+    """Hands out ``slots`` concurrent predict slots in priority order."""
+
+    def __init__(self, slots: int = 1, max_queue: int = MAX_QUEUE, per_session: int = SESSION_LIMIT,
+                 aging: float = AGING, clock=time.monotonic):
+        self.slots = max(1, slots)
+        self.max_queue = max_queue
+        self.per_session = max(1, per_session)
+        self.aging = aging
+        self.clock = clock
+        self.running = 0
+        self._waiting = []
+        self._held: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self.admitted = {kind: 0 for kind in PRIORITY}
+        self.rejected = {kind: 0 for kind in PRIORITY}
+        self.waits = {kind: Histogram() for kind in PRIORITY}
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls, slots: int = 1, environ=os.environ) -> "AdmissionController":
+        return cls(slots, max_queue=int(environ.get(MAX_QUEUE_ENV) or MAX_QUEUE),
+                   per_session=int(environ.get(SESSION_LIMIT_ENV) or SESSION_LIMIT))
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def full(self) -> bool:
+        return len(self._waiting) >= self.max_queue
+
+    def _order(self, ticket: Ticket, now: float):
+        boost = int((now - ticket.queued_at) / self.aging) if self.aging else 0
+        return PRIORITY[ticket.kind] - boost, ticket.seq
+
+    def _next(self) -> Optional[Ticket]:
+        """The waiting ticket that gets the next free slot (sessions at their limit are passed over)."""
+        now = self.clock()
+        eligible = [t for t in self._waiting if self._held.get(t.session, 0) < self.per_session]
+        return min(eligible, key=lambda t: self._order(t, now), default=None)
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in the queue; 0 once admitted."""
+        with self._cond:
+            return self._position(ticket)
+
+    def _position(self, ticket: Ticket) -> int:
+        if ticket not in self._waiting:
+            return 0
+        now = self.clock()
+        mine = self._order(ticket, now)
+        return 1 + sum(self._order(t, now) < mine for t in self._waiting)
+
+    def _try_admit(self, ticket: Ticket) -> bool:
+        if self.running >= self.slots or self._next() is not ticket:
+            return False
+        self._waiting.remove(ticket)
+        self.running += 1
+        self._held[ticket.session] = self._held.get(ticket.session, 0) + 1
+        self.admitted[ticket.kind] += 1
+        self.waits[ticket.kind].observe(self.clock() - ticket.queued_at)
+        if self.running < self.slots:
+            # A waiter that was behind this ticket may fit in the slot still free
+            self._cond.notify_all()
+        return True
+
+    def acquire(self, session: str, kind: str, timeout: Optional[float] = None, bounded: bool = True,
+                on_wait: Callable[[int], None] = None) -> Ticket:
+        """Block until a slot is free; release it with ``release``.
+
+        ``bounded=False`` skips the queue limit, for work that is already
+        bounded elsewhere (background video jobs). ``on_wait(position)`` is
+        called, outside the lock, every ``POLL_INTERVAL`` while waiting.
+        """
+        if kind not in PRIORITY:
+            raise ValueError(f"unknown request kind: {kind!r}")
+        with self._cond:
+            if bounded and self.full:
+                self.rejected[kind] += 1
+                raise Overloaded(f"server busy: {len(self._waiting)} requests queued")
+            ticket = Ticket(session, kind, next(self._seq), self.clock())
+            self._waiting.append(ticket)
+        deadline = None if timeout is None else ticket.queued_at + timeout
+        while True:
+            with self._cond:
+                if self._try_admit(ticket):
+                    return ticket
+                remaining = None if deadline is None else deadline - self.clock()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self.rejected[kind] += 1
+                    # Whoever was behind this ticket may be next now
+                    self._cond.notify_all()
+                    raise Overloaded(f"no free slot within {timeout:g}s")
+                position = self._position(ticket)
+            if on_wait is not None:
+                on_wait(position)
+            with self._cond:
+                if self._try_admit(ticket):
+                    return ticket
+                self._cond.wait(POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining))
+
+    def release(self, ticket: Ticket):
+        with self._cond:
+            self.running -= 1
+            held = self._held[ticket.session] - 1
+            if held:
+                self._held[ticket.session] = held
+            else:
+                del self._held[ticket.session]
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, session: str, kind: str, **kwargs):
+        """``acquire``/``release`` around a block."""
+        ticket = self.acquire(session, kind, **kwargs)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def gate(self, model, session: str, kind: str, **kwargs) -> "AdmittedModel":
+        """``model`` with every ``predict`` taking a slot first."""
+        return AdmittedModel(model, self, session, kind, **kwargs)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "running": self.running,
+                "queued": len(self._waiting),
+                "max_queue": self.max_queue,
+                "admitted": dict(self.admitted),
+                "rejected": dict(self.rejected),
+                "wait_p95_ms": {kind: round(h.quantile(0.95) * 1000.0, 1)
+                                for kind, h in self.waits.items() if h.count},
+            }
+
+    def prometheus_text(self, metric: str = "moodmate_admission") -> str:
+        with self._cond:
+            lines = [
+                f"# HELP {metric}_queue_length Predict calls waiting for a slot.",
+                f"# TYPE {metric}_queue_length gauge",
+                f"{metric}_queue_length {len(self._waiting)}",
+                f"# HELP {metric}_running Predict calls holding a slot.",
+                f"# TYPE {metric}_running gauge",
+                f"{metric}_running {self.running}",
+                f"# HELP {metric}_admitted_total Predict calls admitted, by request kind.",
+                f"# TYPE {metric}_admitted_total counter",
+            ]
+            lines += [f'{metric}_admitted_total{{kind="{k}"}} {n}' for k, n in self.admitted.items()]
+            lines += [
+                f"# HELP {metric}_rejected_total Requests turned away (queue full or timed out), by kind.",
+                f"# TYPE {metric}_rejected_total counter",
+            ]
+            lines += [f'{metric}_rejected_total{{kind="{k}"}} {n}' for k, n in self.rejected.items()]
+            lines += [
+                f"# HELP {metric}_wait_seconds Time spent queued before admission.",
+                f"# TYPE {metric}_wait_seconds histogram",
+            ]
+            for kind, hist in self.waits.items():
+                lines += histogram_lines(f"{metric}_wait_seconds", f'kind="{kind}"', hist)
+        return "\n".join(lines) + "\n"
+
+
+class AdmittedModel:
+    """Drop-in model whose ``predict`` runs inside an admission slot; other attributes pass through."""
+
+    def __init__(self, model, controller: AdmissionController, session: str, kind: str, **kwargs):
+        self.model = model
+        self.controller = controller
+        self.session = session
+        self.kind = kind
+        self.kwargs = kwargs
+
+    def predict(self, *args, **kwargs):
+        with self.controller.slot(self.session, self.kind, **self.kwargs):
+            return self.model.predict(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def model_slots(model) -> int:
+    """Predict calls the model can run at once."""
+    return model.size if isinstance(model, ModelPool) else 1
+
+
+@lru_cache(maxsize=None)
+def get_admission(slots: int = 1) -> AdmissionController:
+    """Process-wide controller shared by all browser sessions."""
+    return AdmissionController.from_env(slots)
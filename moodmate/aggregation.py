@@ -0,0 +1,85 @@
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+from moodmate.config import EMOTION_CLASSES
+from moodmate.metrics import stage
+
+
+class Detections(NamedTuple):
+    """Boxes of one frame as flat arrays: xyxy (n, 4), confidences (n,), class ids (n,)."""
+    boxes: np.ndarray
+    confs: np.ndarray
+    classes: np.ndarray
+
+    def __len__(self):
+        return len(self.confs)
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int16))
+
+
+EMPTY = Detections.empty()
+
+
+def _to_numpy(values) -> np.ndarray:
+    if hasattr(values, "cpu"):
+        values = values.cpu()
+    if hasattr(values, "numpy"):
+        values = values.numpy()
+    return np.asarray(values)
+
+
+def as_detections(results) -> Detections:
+    """Normalize ``model.predict`` output (or a ``Detections``) to arrays.
+
+    Reads the whole ``Boxes`` tensor at once instead of one ``.item()`` per box.
+    """
+    if isinstance(results, Detections):
+        return results
+    if not results or len(results) == 0:
+        return EMPTY
+    res = results[0]
+    if isinstance(res, Detections):
+        return res
+    boxes = getattr(res, "boxes", None)
+    if boxes is None or len(boxes) == 0:
+        return EMPTY
+    return Detections(
+        _to_numpy(boxes.xyxy).astype(np.float32, copy=False).reshape(-1, 4),
+        _to_numpy(boxes.conf).astype(np.float32, copy=False).reshape(-1),
+        _to_numpy(boxes.cls).astype(np.int16).reshape(-1),
+    )
+
+
+def emotion_vector(results) -> np.ndarray:
+    """Confidence-weighted count per class, ordered like ``EMOTION_CLASSES``."""
+    det = as_detections(results)
+    valid = (det.classes >= 0) & (det.classes < len(EMOTION_CLASSES))
+    return np.bincount(det.classes[valid], weights=det.confs[valid], minlength=len(EMOTION_CLASSES))
+
+
+def accumulate_emotions(results, weights: Dict[str, float], repeat: int = 1):
+    """Update weights dict with confidence-weighted counts.
+
+    ``repeat`` counts the detections that many times (frames that reused them).
+    """
+    with stage("aggregate"):
+        sums = emotion_vector(results)
+        for i in np.flatnonzero(sums):
+            label = EMOTION_CLASSES[i]
+            weights[label] = weights.get(label, 0.0) + float(sums[i]) * repeat
+
+
+def normalize_percentages(weights: Dict[str, float]) -> Dict[str, float]:
+    total = sum(weights.values()) if weights else 0.0
+    if total <= 0:
+        return {k: 0.0 for k in EMOTION_CLASSES}
+    return {k: round((weights.get(k, 0.0) / total) * 100.0, 2) for k in EMOTION_CLASSES}
+
+
+def dominant_emotion(percentages: Dict[str, float]) -> str:
+    if not percentages:
+        return "natural"
+    return max(percentages.items(), key=lambda x: x[1])[0]
@@ -0,0 +1,315 @@
+"""
+Local HTTP API for mood detection and recommendations.
+
+    python -m moodmate.api [--host 127.0.0.1] [--port 8600]
+
+Endpoints:
+
+    GET  /health
+    GET  /metrics                       per-stage latency histograms (Prometheus text format),
+                                        admission queue gauges and wait times, plus cascade
+                                        counters when a fast model is configured
+    POST /analyze/image                 raw image bytes -> detections, percentages, recommendations
+    POST /analyze/video?stride=&segment=&change=
+                                        raw video bytes -> NDJSON events, one per segment; a
+                                        failure mid-stream ends it with an "error" event
+    GET  /recommendations/{emotion}
+    POST /recommendations               {"percentages": {...}} -> picks ranked on the distribution
+
+The model is the process-wide one from ``moodmate.model.get_model`` (the same
+object the Streamlit app's ``load_model()`` returns). Inference runs in worker
+threads so the event loop keeps serving while a long video is analyzed.
+Every predict call goes through ``moodmate.admission``: image requests are
+served before video segments, each client address holds one slot at a time,
+and when the queue is full requests get ``503`` with ``Retry-After``.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, Iterator, List
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from moodmate.admission import IMAGE, VIDEO, AdmissionController, Overloaded, model_slots
+from moodmate.aggregation import accumulate_emotions, as_detections, dominant_emotion, normalize_percentages
+from moodmate.cascade import cascade_stats
+from moodmate.config import EMOTION_CLASSES, MODEL_PATH
+from moodmate.metrics import METRICS, stage
+from moodmate.model import get_model
+from moodmate.pipeline import bgr_to_rgb, iter_video_frames, predict_batch, predict_frame, video_frame_count
+from moodmate.recommender import DEFAULT_K, get_recommender
+from moodmate.sampling import DEFAULT_THRESHOLD, ChangeDetector, keyframe_batches
+
+DEFAULT_CONF = 0.25
+# Frames per predict call and per progress event for /analyze/video
+DEFAULT_SEGMENT = 16
+NDJSON = "application/x-ndjson"
+
+
+def _items(items) -> List[Dict]:
+    return [{"title": title, "reason": reason, "link": link} for title, reason, link in items]
+
+
+def recommendations_payload(percentages: Dict[str, float], emotion: str = None, k: int = DEFAULT_K) -> Dict:
+    songs, reads, therapy, breathing = get_recommender().recommend(percentages, emotion, k=k)
+    return {
+        "songs": _items(songs),
+        "reads": _items(reads),
+        "therapy": _items(therapy),
+        "breathing": breathing,
+    }
+
+
+def detections_payload(results) -> List[Dict]:
+    det = as_detections(results)
+    return [
+        {
+            "emotion": EMOTION_CLASSES[cls_id] if 0 <= cls_id < len(EMOTION_CLASSES) else "unknown",
+            "confidence": round(conf, 4),
+            "box": [round(v, 1) for v in box],
+        }
+        for box, conf, cls_id in zip(det.boxes.tolist(), det.confs.tolist(), det.classes.tolist())
+    ]
+
+
+def _summary(weights: Dict[str, float], detections: int) -> Dict:
+    percentages = normalize_percentages(weights)
+    return {
+        "detections": detections,
+        "percentages": percentages,
+        "dominant_emotion": dominant_emotion(percentages) if detections else "unknown",
+    }
+
+
+def _error(status: int, detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status)
+
+
+def _busy(e: Overloaded) -> JSONResponse:
+    return JSONResponse({"detail": str(e)}, status_code=503, headers={"Retry-After": str(e.retry_after)})
+
+
+def _client(request: Request) -> str:
+    """Admission session of a request: one per client address."""
+    return request.client.host if request.client else ""
+
+
+def _float_param(request: Request, name: str, default: float) -> float:
+    value = request.query_params.get(name)
+    return float(value) if value is not None else default
+
+
+def _int_param(request: Request, name: str, default: int) -> int:
+    value = request.query_params.get(name)
+    return max(1, int(value)) if value is not None else default
+
+
+class InferenceService:
+    """Shared model plus the admission controller that hands out its predict slots."""
+
+    def __init__(self, model=None, model_path: str = MODEL_PATH, admission: AdmissionController = None):
+        self._model = model
+        self.model_path = model_path
+        self._admission = admission
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_model(self.model_path)
+        return self._model
+
+    @property
+    def cascade(self):
+        """Cascade stats once a cascade model is loaded (``moodmate.cascade``); loading is not forced."""
+        return cascade_stats(self._model) if self._model is not None else None
+
+    @property
+    def admission(self) -> AdmissionController:
+        """One slot per model replica, so a single model still takes one call at a time."""
+        if self._admission is None:
+            self._admission = AdmissionController.from_env(model_slots(self.model))
+        return self._admission
+
+    def analyze_image(self, data: bytes, conf: float, session: str = "") -> Dict:
+        import cv2
+        import numpy as np
+
+        with stage("decode"):
+            img_bgr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img_bgr is None:
+            raise ValueError("could not decode image")
+        with self.admission.slot(session, IMAGE):
+            results = predict_frame(self.model, bgr_to_rgb(img_bgr), conf)
+        weights = {k: 0.0 for k in EMOTION_CLASSES}
+        accumulate_emotions(results, weights)
+        payload = _summary(weights, len(as_detections(results)))
+        payload["faces"] = detections_payload(results)
+        payload["recommendations"] = recommendations_payload(payload["percentages"], payload["dominant_emotion"])
+        return payload
+
+    def video_events(self, path: str, conf: float, stride: int, segment: int,
+                     change_threshold: float = DEFAULT_THRESHOLD, session: str = "") -> Iterator[Dict]:
+        """One ``progress`` event per analyzed segment, then a final ``result``.
+
+        Unchanged frames reuse the previous keyframe's detections (see
+        ``moodmate.sampling``); ``frames`` counts every sampled frame and
+        ``inferred`` only those that reached the model. Segments queue behind
+        image requests but are never rejected once the video was accepted.
+        """
+        total = video_frame_count(path)
+        weights = {k: 0.0 for k in EMOTION_CLASSES}
+        frames = detections = inferred = 0
+        detector = ChangeDetector(change_threshold)
+        yield {"event": "start", "total_frames": total, "stride": stride, "segment": segment,
+               "change_threshold": change_threshold}
+
+        for keyframes in keyframe_batches(iter_video_frames(path, stride), segment, detector):
+            with self.admission.slot(session, VIDEO, bounded=False):
+                batch = predict_batch(self.model, [k.frame_rgb for k in keyframes], conf)
+            for keyframe, results in zip(keyframes, batch):
+                accumulate_emotions(results, weights, keyframe.weight)
+                detections += len(as_detections(results)) * keyframe.weight
+                frames += keyframe.weight
+            inferred += len(keyframes)
+            last_index = keyframes[-1].index + (keyframes[-1].weight - 1) * stride
+            event = {"event": "progress", "frames": frames, "inferred": inferred, "frame_index": last_index,
+                     "total_frames": total}
+            if total:
+                event["progress"] = round(min(1.0, (last_index + 1) / total), 4)
+            event.update(_summary(weights, detections))
+            yield event
+
+        if frames == 0:
+            yield {"event": "error", "detail": "no decodable frames"}
+            return
+        result = {"event": "result", "frames": frames, "inferred": inferred}
+        result.update(_summary(weights, detections))
+        result["recommendations"] = recommendations_payload(result["percentages"], result["dominant_emotion"])
+        yield result
+
+
+def _ndjson(events: Iterator[Dict], cleanup: str) -> Iterator[bytes]:
+    """Encode events; a failure mid-stream becomes a final ``error`` event (the 200 is already sent)."""
+    try:
+        for event in events:
+            yield (json.dumps(event) + "\n").encode()
+    except Exception as e:
+        yield (json.dumps({"event": "error", "detail": f"{type(e).__name__}: {e}"}) + "\n").encode()
+    finally:
+        os.remove(cleanup)
+
+
+def create_app(model=None, model_path: str = MODEL_PATH) -> Starlette:
+    """Build the API; pass ``model`` to serve an already loaded one."""
+    service = InferenceService(model, model_path)
+
+    async def health(request: Request):
+        body = {"status": "ok", "emotions": EMOTION_CLASSES}
+        if service.cascade is not None:
+            body["cascade"] = service.cascade.summary()
+        if service._admission is not None:
+            stats = service.admission.stats()
+            body["admission"] = {k: stats[k] for k in ("slots", "running", "queued")}
+        return JSONResponse(body)
+
+    async def metrics(request: Request):
+        text = METRICS.prometheus_text()
+        if service._admission is not None:
+            text += service.admission.prometheus_text()
+        if service.cascade is not None:
+            text += service.cascade.prometheus_text()
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    async def analyze_image(request: Request):
+        data = await request.body()
+        if not data:
+            return _error(400, "empty request body; send the image bytes")
+        try:
+            conf = _float_param(request, "conf", DEFAULT_CONF)
+            return JSONResponse(await run_in_threadpool(service.analyze_image, data, conf, _client(request)))
+        except ValueError as e:
+            return _error(400, str(e))
+        except Overloaded as e:
+            return _busy(e)
+
+    async def analyze_video(request: Request):
+        try:
+            conf = _float_param(request, "conf", DEFAULT_CONF)
+            stride = _int_param(request, "stride", 1)
+            segment = _int_param(request, "segment", DEFAULT_SEGMENT)
+            change = max(0.0, _float_param(request, "change", DEFAULT_THRESHOLD))
+        except ValueError as e:
+            return _error(400, str(e))
+        # The first access loads the model to size the controller; keep that off the event loop
+        if await run_in_threadpool(lambda: service.admission.full):
+            return _busy(Overloaded("server busy: admission queue is full"))
+
+        # Spool the upload to disk as it arrives; OpenCV needs a file path
+        fd, path = tempfile.mkstemp(suffix=".mp4", prefix="moodmate_api_")
+        size = 0
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+                size += len(chunk)
+        if size == 0:
+            os.remove(path)
+            return _error(400, "empty request body; send the video bytes")
+        # StreamingResponse iterates sync generators in the threadpool
+        events = service.video_events(path, conf, stride, segment, change, _client(request))
+        return StreamingResponse(_ndjson(events, path), media_type=NDJSON)
+
+    async def emotion_recommendations(request: Request):
+        emotion = request.path_params["emotion"].lower()
+        if emotion not in EMOTION_CLASSES:
+            return _error(404, f"unknown emotion: {emotion}")
+        try:
+            k = _int_param(request, "k", DEFAULT_K)
+        except ValueError as e:
+            return _error(400, str(e))
+        percentages = {name: 100.0 if name == emotion else 0.0 for name in EMOTION_CLASSES}
+        return JSONResponse(recommendations_payload(percentages, emotion, k))
+
+    async def distribution_recommendations(request: Request):
+        try:
+            body = await request.json()
+            percentages = {k: float(v) for k, v in body["percentages"].items() if k in EMOTION_CLASSES}
+            k = max(1, int(body.get("k", DEFAULT_K)))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return _error(400, 'expected JSON like {"percentages": {"happy": 80, "sad": 20}}')
+        if not any(percentages.values()):
+            return _error(400, "percentages must contain at least one known emotion")
+        return JSONResponse(recommendations_payload(percentages, dominant_emotion(percentages), k))
+
+    return Starlette(routes=[
+        Route("/health", health),
+        Route("/metrics", metrics),
+        Route("/analyze/image", analyze_image, methods=["POST"]),
+        Route("/analyze/video", analyze_video, methods=["POST"]),
+        Route("/recommendations/{emotion}", emotion_recommendations),
+        Route("/recommendations", distribution_recommendations, methods=["POST"]),
+    ])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve AI MoodMate analysis over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--model", default=MODEL_PATH, help="YOLO weights (default: last.pt)")
+    parser.add_argument("--no-metrics", action="store_true", help="Disable per-stage timers (/metrics stays empty)")
+    args = parser.parse_args(argv)
+
+    METRICS.enable(not args.no_metrics)
+    import uvicorn
+    uvicorn.run(create_app(model_path=args.model), host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
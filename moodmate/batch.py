@@ -0,0 +1,302 @@
+"""
+Headless batch analysis of image and video folders.
+
+    python -m moodmate.batch INPUT_DIR -o results.csv [--workers 4] [--batch 16]
+
+Writes one row per file with the emotion percentages and dominant emotion
+(CSV, JSONL or Parquet, chosen by the output extension). Rows are flushed as
+files finish, and files already present in the output are skipped, so an
+interrupted run resumes where it stopped. Failed files are retried on the
+next run, and their new row replaces the error row.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, Set
+
+from moodmate.aggregation import accumulate_emotions, as_detections, dominant_emotion, normalize_percentages
+from moodmate.config import EMOTION_CLASSES, MODEL_PATH
+from moodmate.model import model_loader
+from moodmate.pipeline import iter_video_frames, predict_batch
+from moodmate.runtime import RuntimeConfig, apply_runtime_config, available_cpus
+from moodmate.sampling import DEFAULT_THRESHOLD, ChangeDetector, keyframe_batches
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+VIDEO_EXTS = {".mp4", ".mov", ".avi", ".mkv"}
+
+FIELDS = ["path", "kind", "frames", "detections", "dominant_emotion"] + EMOTION_CLASSES + ["error"]
+
+# Model loaded once per worker process
+_MODEL = None
+
+
+def find_media(root: str) -> List[str]:
+    """All image/video files under ``root`` as sorted relative paths."""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            ext = os.path.splitext(name)[1].lower()
+            if ext in IMAGE_EXTS or ext in VIDEO_EXTS:
+                found.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(found)
+
+
+def _row(path: str, kind: str, frames: int, detections: int, weights: Dict[str, float], error: str = "") -> Dict:
+    percentages = normalize_percentages(weights)
+    row = {
+        "path": path,
+        "kind": kind,
+        "frames": frames,
+        "detections": detections,
+        "dominant_emotion": dominant_emotion(percentages) if detections else "unknown",
+        "error": error,
+    }
+    row.update(percentages)
+    return row
+
+
+def analyze_images(model, root: str, paths: List[str], conf: float, imgsz: int = None) -> List[Dict]:
+    """Analyze a group of images with a single batched predict call."""
+    import cv2
+
+    rows, frames, loaded = [], [], []
+    for path in paths:
+        img_bgr = cv2.imread(os.path.join(root, path))
+        if img_bgr is None:
+            rows.append(_row(path, "image", 0, 0, {}, "unreadable image"))
+            continue
+        frames.append(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB))
+        loaded.append(path)
+
+    for path, results in zip(loaded, predict_batch(model, frames, conf, imgsz)):
+        weights = {k: 0.0 for k in EMOTION_CLASSES}
+        accumulate_emotions(results, weights)
+        rows.append(_row(path, "image", 1, len(as_detections(results)), weights))
+    return rows
+
+
+def analyze_video(model, root: str, path: str, conf: float, stride: int = 1, batch: int = 16,
+                  imgsz: int = None, change_threshold: float = 0.0) -> Dict:
+    """Analyze every ``stride``-th frame of a video in batches.
+
+    With ``change_threshold`` > 0 only frames that changed get a predict
+    call; the others count their keyframe's detections again.
+    """
+    weights = {k: 0.0 for k in EMOTION_CLASSES}
+    frames = detections = 0
+    detector = ChangeDetector(change_threshold)
+
+    sampled = iter_video_frames(os.path.join(root, path), stride)
+    for keyframes in keyframe_batches(sampled, batch, detector):
+        results = predict_batch(model, [k.frame_rgb for k in keyframes], conf, imgsz)
+        for keyframe, res in zip(keyframes, results):
+            accumulate_emotions(res, weights, keyframe.weight)
+            detections += len(as_detections(res)) * keyframe.weight
+            frames += keyframe.weight
+
+    if frames == 0:
+        return _row(path, "video", 0, 0, weights, "no decodable frames")
+    return _row(path, "video", frames, detections, weights)
+
+
+def _init_worker(model_path: str, torch_threads: int = None):
+    global _MODEL
+    config = RuntimeConfig.from_env()
+    if config.torch_threads is None and torch_threads:
+        config = replace(config, torch_threads=torch_threads)
+    apply_runtime_config(config)
+    _MODEL = model_loader(model_path)()
+
+
+def _run_task(root: str, kind: str, paths: List[str], args: Dict) -> List[Dict]:
+    try:
+        if kind == "image":
+            return analyze_images(_MODEL, root, paths, args["conf"], args["imgsz"])
+        return [analyze_video(_MODEL, root, paths[0], args["conf"], args["stride"], args["batch"], args["imgsz"],
+                              args["change_threshold"])]
+    except Exception as e:
+        return [_row(path, kind, 0, 0, {}, f"{type(e).__name__}: {e}") for path in paths]
+
+
+def make_tasks(paths: Iterable[str], batch: int) -> List:
+    """Group images into predict-sized chunks; each video is its own task."""
+    tasks, images = [], []
+    for path in paths:
+        if os.path.splitext(path)[1].lower() in VIDEO_EXTS:
+            tasks.append(("video", [path]))
+        else:
+            images.append(path)
+    tasks += [("image", images[i:i + batch]) for i in range(0, len(images), batch)]
+    return tasks
+
+
+# ----------------------------
+# Output writers
+# ----------------------------
+
+class ResultWriter:
+    """Append-only result sink; Parquet goes through a JSONL journal finalized at the end.
+
+    A retried file appends a new row after its earlier error row; ``close``
+    compacts the output to the latest row per path.
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.format = os.path.splitext(output)[1].lower().lstrip(".")
+        if self.format not in ("csv", "jsonl", "parquet"):
+            raise ValueError(f"Unsupported output format: {output} (use .csv, .jsonl or .parquet)")
+        self.journal = output + ".partial.jsonl" if self.format == "parquet" else output
+        self._file = None
+        self._csv = None
+
+    def completed(self) -> Set[str]:
+        """Paths whose latest row from an earlier run is successful."""
+        return {path for path, row in self.rows().items() if not row.get("error")}
+
+    def rows(self) -> Dict[str, Dict]:
+        """Latest row per path, in the order the paths were first written."""
+        latest = {}
+        for row in self._existing_rows():
+            latest[row["path"]] = row
+        return latest
+
+    def _existing_rows(self) -> Iterator[Dict]:
+        if self.format == "parquet" and os.path.exists(self.output):
+            import pandas as pd
+            yield from pd.read_parquet(self.output).fillna("").to_dict("records")
+        if not os.path.exists(self.journal):
+            return
+        with open(self.journal, encoding="utf-8", newline="") as f:
+            if self.format == "csv":
+                yield from csv.DictReader(f)
+            else:
+                for line in f:
+                    if line.strip():
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            # Partially written last line from an interrupted run
+                            continue
+
+    def write(self, rows: List[Dict]):
+        if self._file is None:
+            size = os.path.getsize(self.journal) if os.path.exists(self.journal) else 0
+            self._file = open(self.journal, "a", encoding="utf-8", newline="")
+            if size and not _ends_with_newline(self.journal):
+                # Do not glue the first new row onto a line cut off by an interrupted run
+                self._file.write("\n")
+            if self.format == "csv":
+                self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+                if size == 0:
+                    self._csv.writeheader()
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow(row)
+            else:
+                self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = self._csv = None
+        if not os.path.exists(self.journal):
+            return
+        rows = self.rows()
+        if self.format == "parquet":
+            import pandas as pd
+            tmp = self.output + ".tmp"
+            pd.DataFrame(list(rows.values()), columns=FIELDS).to_parquet(tmp, index=False)
+            os.replace(tmp, self.output)
+            os.remove(self.journal)
+        elif sum(1 for _ in self._existing_rows()) > len(rows):
+            self._rewrite(rows.values())
+
+    def _rewrite(self, rows: Iterable[Dict]):
+        tmp = self.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            if self.format == "csv":
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                f.writelines(json.dumps(row) + "\n" for row in rows)
+        os.replace(tmp, self.output)
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def run(input_dir: str, output: str, model_path: str = MODEL_PATH, workers: int = 1, batch: int = 16,
+        stride: int = 1, conf: float = 0.25, imgsz: int = None, change_threshold: float = DEFAULT_THRESHOLD,
+        log=print) -> int:
+    """Analyze ``input_dir`` into ``output``; returns the number of files processed."""
+    writer = ResultWriter(output)
+    done = writer.completed()
+    paths = [p for p in find_media(input_dir) if p not in done]
+    tasks = make_tasks(paths, batch)
+    args = {"conf": conf, "imgsz": imgsz, "stride": stride, "batch": batch, "change_threshold": change_threshold}
+    log(f"{len(paths)} file(s) to analyze, {len(done)} already done")
+
+    processed = 0
+    start = time.time()
+    try:
+        if workers <= 1:
+            _init_worker(model_path)
+            outcomes = (_run_task(input_dir, kind, chunk, args) for kind, chunk in tasks)
+            for rows in outcomes:
+                writer.write(rows)
+                processed += len(rows)
+                log(f"[{processed}/{len(paths)}] {rows[-1]['path']}")
+        else:
+            # Split the cores between worker processes unless MOODMATE_TORCH_THREADS says otherwise
+            threads = max(1, available_cpus() // workers)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, threads)) as pool:
+                futures = [pool.submit(_run_task, input_dir, kind, chunk, args) for kind, chunk in tasks]
+                for future in as_completed(futures):
+                    rows = future.result()
+                    writer.write(rows)
+                    processed += len(rows)
+                    log(f"[{processed}/{len(paths)}] {rows[-1]['path']}")
+    finally:
+        writer.close()
+
+    log(f"Done: {processed} file(s) in {time.time() - start:.1f}s -> {output}")
+    return processed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze folders of images and videos with the AI MoodMate model")
+    parser.add_argument("input_dir", help="Folder scanned recursively for images and videos")
+    parser.add_argument("-o", "--output", required=True, help="Result file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--model", default=MODEL_PATH, help="YOLO weights (default: last.pt)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own model")
+    parser.add_argument("--batch", type=int, default=16, help="Frames per predict call")
+    parser.add_argument("--stride", type=int, default=1, help="Analyze every Nth video frame")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold")
+    parser.add_argument("--imgsz", type=int, default=None, help="Inference size (default: model's)")
+    parser.add_argument("--change-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Reuse detections for video frames whose mean grayscale change is below this "
+                             "(0 runs the model on every sampled frame)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"not a directory: {args.input_dir}")
+    run(args.input_dir, args.output, args.model, args.workers, max(1, args.batch), max(1, args.stride),
+        args.conf, args.imgsz, max(0.0, args.change_threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
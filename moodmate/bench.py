@@ -0,0 +1,335 @@
+"""
+Reproducible benchmarks for the detection and aggregation hot paths.
+
+    python -m moodmate.bench -o bench.json [--model last.pt --model last.onnx] [--device cpu]
+    python -m moodmate.bench -o new.json --baseline bench.json --threshold 0.2
+
+Runs on synthetic frames (seeded noise) and a generated test video, so results
+only depend on the code, the weights and the machine. Cases:
+
+- predict:    model.predict per resolution, batch size and backend
+- draw:       draw_detections per resolution and box count
+- accumulate: accumulate_emotions per box count
+- replay:     re-aggregating a recorded detection log (model-free)
+- pdf:        build_pdf with detection images
+- video:      the app's Video loop (analyze_video + previews) per resolution
+
+Writes a JSON document with the environment and one record per case
+(median/mean/p95/min latency and items per second). With ``--baseline`` the
+run is compared case by case and exits 1 if any median slowed down by more
+than ``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from moodmate.aggregation import Detections, accumulate_emotions
+from moodmate.config import EMOTION_CLASSES, MODEL_PATH, PROJECT_DIR
+from moodmate.detlog import DetectionLog, DetectionLogWriter, replay
+from moodmate.pipeline import analyze_video, draw_detections, predict_batch, video_fps
+
+RESOLUTIONS = {"240p": (320, 240), "480p": (640, 480), "720p": (1280, 720)}
+BATCH_SIZES = (1, 4, 8)
+BOX_COUNTS = (1, 8, 32)
+VIDEO_FRAMES = 60
+REPLAY_FRAMES = 1000
+REPEAT = 20
+WARMUP = 2
+
+QUICK = {"resolutions": ["480p"], "batch_sizes": (1, 4), "video_frames": 10, "repeat": 3}
+
+
+def measure(fn: Callable[[], object], repeat: int = REPEAT, warmup: int = WARMUP, items: int = 1) -> Dict:
+    """Time ``repeat`` calls of ``fn`` after ``warmup`` untimed ones; ``items`` processed per call."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "repeat": len(samples),
+        "items": items,
+        "median_ms": round(median, 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 4),
+        "min_ms": round(samples[0], 4),
+        "per_item_ms": round(median / items, 4),
+        "items_per_s": round(items * 1000.0 / median, 2) if median > 0 else None,
+    }
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def synthetic_detections(count: int, width: int, height: int, seed: int = 0) -> Detections:
+    """``count`` random boxes inside the frame with random classes and confidences."""
+    rng = np.random.default_rng(seed)
+    x1 = rng.uniform(0, width * 0.8, count)
+    y1 = rng.uniform(0, height * 0.8, count)
+    w = rng.uniform(20, width * 0.2, count)
+    h = rng.uniform(20, height * 0.2, count)
+    boxes = np.stack([x1, y1, np.minimum(x1 + w, width - 1), np.minimum(y1 + h, height - 1)], axis=1)
+    return Detections(
+        boxes.astype(np.float32),
+        rng.uniform(0.3, 1.0, count).astype(np.float32),
+        rng.integers(0, len(EMOTION_CLASSES), count).astype(np.int16),
+    )
+
+
+def write_test_video(path: str, width: int, height: int, frames: int, fps: int = 15) -> str:
+    """MJPG AVI of seeded noise frames (the codec OpenCV can always write)."""
+    import cv2
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    try:
+        for i in range(frames):
+            writer.write(synthetic_frame(width, height, seed=i))
+    finally:
+        writer.release()
+    return path
+
+
+class _OnDevice:
+    """Pins every predict call of a YOLO model to one device."""
+
+    def __init__(self, model, device: str):
+        self.model = model
+        self.device = device
+
+    def predict(self, source, **kwargs):
+        return self.model.predict(source, device=self.device, **kwargs)
+
+
+def _record(bench: str, stats: Dict, **params) -> Dict:
+    case = bench + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+    return dict({"case": case, "bench": bench}, **params, **stats)
+
+
+def bench_predict(model, backend: str, resolutions: Sequence[str], batch_sizes: Sequence[int],
+                  repeat: int, conf: float = 0.25) -> List[Dict]:
+    records = []
+    for res in resolutions:
+        width, height = RESOLUTIONS[res]
+        for batch in batch_sizes:
+            frames = [synthetic_frame(width, height, seed=i) for i in range(batch)]
+            stats = measure(lambda: predict_batch(model, frames, conf), repeat, items=batch)
+            records.append(_record("predict", stats, backend=backend, resolution=res, batch=batch))
+    return records
+
+
+def bench_draw(resolutions: Sequence[str], box_counts: Sequence[int], repeat: int) -> List[Dict]:
+    records = []
+    for res in resolutions:
+        width, height = RESOLUTIONS[res]
+        frame = synthetic_frame(width, height)
+        for count in box_counts:
+            det = synthetic_detections(count, width, height)
+            stats = measure(lambda: draw_detections(frame, det, 0.0), repeat)
+            records.append(_record("draw", stats, resolution=res, boxes=count))
+    return records
+
+
+def bench_accumulate(box_counts: Sequence[int], repeat: int, calls: int = 1000) -> List[Dict]:
+    """Many calls per sample: a single call is too short to time reliably."""
+    records = []
+    for count in box_counts:
+        det = synthetic_detections(count, 640, 480)
+        weights = {k: 0.0 for k in EMOTION_CLASSES}
+
+        def run():
+            for _ in range(calls):
+                accumulate_emotions(det, weights)
+
+        stats = measure(run, repeat, items=calls)
+        records.append(_record("accumulate", stats, boxes=count))
+    return records
+
+
+def write_test_log(path: str, frames: int, boxes: int, width: int = 640, height: int = 480) -> str:
+    """Seeded synthetic detection log: the same input for every run, no model needed."""
+    with DetectionLogWriter(path, source="bench") as log:
+        for i in range(frames):
+            log.write(i, synthetic_detections(boxes, width, height, seed=i), i / 30.0)
+    return path
+
+
+def bench_replay(box_counts: Sequence[int], repeat: int, workdir: str, frames: int = REPLAY_FRAMES) -> List[Dict]:
+    records = []
+    for count in box_counts:
+        log = DetectionLog(write_test_log(os.path.join(workdir, f"bench_{count}.mdlog"), frames, count))
+        stats = measure(lambda: replay(log), repeat, items=frames)
+        records.append(_record("replay", stats, boxes=count, frames=frames))
+    return records
+
+
+def bench_pdf(repeat: int, workdir: str, images: int = 3) -> List[Dict]:
+    from moodmate.recommender import recommend_content
+    from moodmate.reporting import build_pdf
+
+    songs, reads, therapy, _ = recommend_content("happy")
+    percentages = {k: round(100.0 / len(EMOTION_CLASSES), 2) for k in EMOTION_CLASSES}
+    session = {"timestamp": "2024-01-01 12:00:00", "input_mode": "Video"}
+    frames = [synthetic_frame(640, 480, seed=i) for i in range(images)]
+    stats = measure(
+        lambda: build_pdf(session, percentages, "happy", (songs, reads, therapy), frames, outputs_dir=workdir),
+        repeat,
+    )
+    return [_record("pdf", stats, images=images)]
+
+
+def bench_video(model, backend: str, resolutions: Sequence[str], frames: int, repeat: int,
+                workdir: str, conf: float = 0.25) -> List[Dict]:
+    """End-to-end Video mode: decode, predict, aggregate and draw the preview frames."""
+    records = []
+    for res in resolutions:
+        width, height = RESOLUTIONS[res]
+        path = write_test_video(os.path.join(workdir, f"bench_{res}.avi"), width, height, frames)
+        # Same preview cadence as the app
+        preview_every = max(1, int(video_fps(path)) // 3)
+
+        def run():
+            weights = {k: 0.0 for k in EMOTION_CLASSES}
+            for frame in analyze_video(model, path, conf, weights):
+                if (frame.index + 1) % preview_every == 0:
+                    draw_detections(frame.frame_rgb, frame.results, conf)
+
+        stats = measure(run, repeat, warmup=1, items=frames)
+        records.append(_record("video", stats, backend=backend, resolution=res, frames=frames))
+    return records
+
+
+def run_suite(backends: Dict[str, object], resolutions: Sequence[str] = tuple(RESOLUTIONS),
+              batch_sizes: Sequence[int] = BATCH_SIZES, box_counts: Sequence[int] = BOX_COUNTS,
+              video_frames: int = VIDEO_FRAMES, repeat: int = REPEAT, log=print) -> List[Dict]:
+    """All benchmark cases; ``backends`` maps a label to a model object."""
+    records = []
+    with tempfile.TemporaryDirectory(prefix="moodmate_bench_") as workdir:
+        steps = [
+            ("accumulate", lambda: bench_accumulate(box_counts, repeat)),
+            ("replay", lambda: bench_replay(box_counts, repeat, workdir)),
+            ("draw", lambda: bench_draw(resolutions, box_counts, repeat)),
+            ("pdf", lambda: bench_pdf(repeat, workdir)),
+        ]
+        for label, model in backends.items():
+            steps.append((f"predict {label}",
+                          lambda m=model, b=label: bench_predict(m, b, resolutions, batch_sizes, repeat)))
+            steps.append((f"video {label}",
+                          lambda m=model, b=label: bench_video(m, b, resolutions, video_frames, repeat, workdir)))
+        for name, step in steps:
+            log(f"running {name}...")
+            for record in step():
+                log(f"  {record['case']:<60} {record['median_ms']:>10.3f} ms  {record['items_per_s']} /s")
+                records.append(record)
+    return records
+
+
+def environment() -> Dict:
+    """Versions and hardware the results were measured on."""
+    import subprocess
+
+    env = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+    for name in ("cv2", "torch", "ultralytics", "fpdf"):
+        try:
+            env[name] = __import__(name).__version__
+        except (ImportError, AttributeError):
+            env[name] = None
+    try:
+        env["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        env["git_commit"] = None
+    return env
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    """Cases whose median latency grew by more than ``threshold`` (0.2 = 20%) over the baseline."""
+    before = {r["case"]: r for r in baseline}
+    regressions = []
+    for record in results:
+        old = before.get(record["case"])
+        if not old or not old["median_ms"]:
+            continue
+        ratio = record["median_ms"] / old["median_ms"]
+        if ratio > 1.0 + threshold:
+            regressions.append(f"{record['case']}: {old['median_ms']:.3f} -> {record['median_ms']:.3f} ms "
+                               f"({(ratio - 1.0) * 100:+.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the AI MoodMate detection and aggregation paths")
+    parser.add_argument("-o", "--output", required=True, help="Result file (.json)")
+    parser.add_argument("--model", action="append", help="Weights to benchmark; repeat for several "
+                        "exported formats (default: last.pt)")
+    parser.add_argument("--device", action="append", help="Inference device; repeat for several "
+                        "(default: ultralytics' choice)")
+    parser.add_argument("--resolution", action="append", choices=sorted(RESOLUTIONS), help="Frame size; repeatable")
+    parser.add_argument("--batch", action="append", type=int, help="Predict batch size; repeatable")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Timed runs per case")
+    parser.add_argument("--video-frames", type=int, default=VIDEO_FRAMES, help="Length of the generated video")
+    parser.add_argument("--quick", action="store_true", help="Small smoke-sized run (480p, few repeats)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    settings = {"resolutions": list(RESOLUTIONS), "batch_sizes": BATCH_SIZES,
+                "video_frames": args.video_frames, "repeat": args.repeat}
+    if args.quick:
+        settings.update(QUICK)
+    if args.resolution:
+        settings["resolutions"] = args.resolution
+    if args.batch:
+        settings["batch_sizes"] = [max(1, b) for b in args.batch]
+
+    from moodmate.model import load_yolo
+
+    backends = {}
+    for path in args.model or [MODEL_PATH]:
+        if not os.path.exists(path):
+            parser.error(f"model not found: {path}")
+        model = load_yolo(path)
+        for device in args.device or [None]:
+            label = os.path.basename(path) + (f"@{device}" if device else "")
+            backends[label] = _OnDevice(model, device) if device else model
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+
+    results = run_suite(backends, log=log, **settings)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "settings": settings, "results": results}, f, indent=2)
+    log(f"wrote {len(results)} case(s) to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for line in regressions:
+            log(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
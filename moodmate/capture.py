@@ -0,0 +1,54 @@
+"""
+Webcam capture constraints, and the server-side downscale when a browser ignores them.
+
+Without constraints browsers usually send 720p or more, while the model
+looks at 640px at most. The WebRTC stream is therefore requested at the
+capture size and frame rate the analysis actually uses. Browsers treat
+``ideal``/``max`` as hints, so each received frame is also checked. A
+larger one is scaled down (and converted to RGB) in the same libswscale
+pass that decodes it to an array.
+"""
+
+from typing import Dict, Tuple
+
+from moodmate.ratecontrol import SIZES
+
+# Label -> (width, height); the default keeps the model's native 640px
+CAPTURE_SIZES = {"320×240": (320, 240), "640×480": (640, 480), "1280×720": (1280, 720)}
+DEFAULT_CAPTURE = "640×480"
+STRIDE = 32
+
+
+def capture_constraints(width: int, height: int, fps: float) -> Dict:
+    """``media_stream_constraints`` for ``webrtc_streamer``."""
+    return {
+        "video": {
+            "width": {"ideal": width, "max": width},
+            "height": {"ideal": height, "max": height},
+            "frameRate": {"ideal": fps, "max": fps},
+        },
+        "audio": False,
+    }
+
+
+def fit_size(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """Largest even size with the same aspect ratio that fits the limits (never upscales)."""
+    scale = min(1.0, max_width / width, max_height / height)
+    if scale >= 1.0:
+        return width, height
+    # Even dimensions keep YUV 4:2:0 conversions exact
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
+def inference_sizes(width: int, height: int, sizes=SIZES) -> Tuple[int, ...]:
+    """Model input sizes worth trying for this capture: none above its long side."""
+    long_side = -(-max(width, height) // STRIDE) * STRIDE
+    return tuple(s for s in sizes if s <= long_side) or (min(sizes),)
+
+
+def frame_to_rgb(frame, max_width: int, max_height: int):
+    """RGB array of an ``av.VideoFrame``, downscaled to fit if the browser sent more pixels."""
+    width, height = fit_size(frame.width, frame.height, max_width, max_height)
+    if (width, height) == (frame.width, frame.height):
+        return frame.to_ndarray(format="rgb24")
+    return frame.reformat(width=width, height=height, format="rgb24").to_ndarray()
@@ -0,0 +1,136 @@
+"""
+Two-model cascade: a small fast model first, the full model only where it is unsure.
+
+``CascadeModel`` has the same ``predict`` as an ultralytics model, so it
+drops in wherever the app, API or batch CLI take a model. Every frame goes
+through the fast model; frames whose most confident detection is below
+``threshold`` (or that have none, since small models miss faces) are sent
+through the full model together, as one batch. The per-frame results are
+merged back in order, so ``accumulate_emotions`` and everything after it
+cannot tell which model answered.
+
+Enabled from the environment when the model is created:
+
+    MOODMATE_FAST_MODEL          weights of the fast model (e.g. a yolo11n fine-tune)
+    MOODMATE_CASCADE_THRESHOLD   top confidence the fast model must reach (default 0.6)
+
+``CascadeStats`` counts how many frames escalated and how long each model
+took, so the threshold can be tuned for throughput.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from moodmate.aggregation import as_detections
+from moodmate.metrics import stage
+
+ENV_FAST_MODEL = "MOODMATE_FAST_MODEL"
+ENV_THRESHOLD = "MOODMATE_CASCADE_THRESHOLD"
+DEFAULT_THRESHOLD = 0.6
+
+
+class CascadeStats:
+    """Counters shared by every replica of a cascade."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.frames = 0
+            self.escalated = 0
+            self.fast_seconds = 0.0
+            self.full_seconds = 0.0
+
+    def record(self, frames: int, escalated: int, fast_seconds: float, full_seconds: float):
+        with self._lock:
+            self.frames += frames
+            self.escalated += escalated
+            self.fast_seconds += fast_seconds
+            self.full_seconds += full_seconds
+
+    @property
+    def escalation_ratio(self) -> float:
+        return self.escalated / self.frames if self.frames else 0.0
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "escalated": self.escalated,
+                "escalation_ratio": round(self.escalated / self.frames, 4) if self.frames else 0.0,
+                "fast_ms_per_frame": round(1000.0 * self.fast_seconds / self.frames, 3) if self.frames else 0.0,
+                "full_ms_per_escalation": (round(1000.0 * self.full_seconds / self.escalated, 3)
+                                           if self.escalated else 0.0),
+            }
+
+    def prometheus_text(self, metric: str = "moodmate_cascade") -> str:
+        s = self.summary()
+        return "\n".join([
+            f"# HELP {metric}_frames_total Frames seen by the fast model.",
+            f"# TYPE {metric}_frames_total counter",
+            f"{metric}_frames_total {s['frames']}",
+            f"# HELP {metric}_escalated_total Frames re-run through the full model.",
+            f"# TYPE {metric}_escalated_total counter",
+            f"{metric}_escalated_total {s['escalated']}",
+        ]) + "\n"
+
+
+def top_confidence(result) -> float:
+    confs = as_detections([result]).confs
+    return float(confs.max()) if len(confs) else 0.0
+
+
+class CascadeModel:
+    """``predict`` runs ``fast`` on everything and ``full`` on the frames it is not sure about."""
+
+    def __init__(self, fast, full, threshold: float = DEFAULT_THRESHOLD, stats: CascadeStats = None):
+        self.fast = fast
+        self.full = full
+        self.threshold = threshold
+        self.cascade = stats if stats is not None else CascadeStats()
+
+    def predict(self, source, **kwargs) -> List:
+        frames = source if isinstance(source, list) else [source]
+        start = time.perf_counter()
+        with stage("predict.fast"):
+            results = list(self.fast.predict(frames, **kwargs))
+        fast_seconds = time.perf_counter() - start
+
+        unsure = [i for i, res in enumerate(results) if top_confidence(res) < self.threshold]
+        full_seconds = 0.0
+        if unsure:
+            start = time.perf_counter()
+            with stage("predict.full"):
+                rerun = self.full.predict([frames[i] for i in unsure], **kwargs)
+            full_seconds = time.perf_counter() - start
+            for i, res in zip(unsure, rerun):
+                results[i] = res
+        self.cascade.record(len(frames), len(unsure), fast_seconds, full_seconds)
+        return results
+
+    def __getattr__(self, name):
+        # names, overrides, ... come from the full model
+        return getattr(self.full, name)
+
+
+def threshold_from_env(environ: Mapping[str, str] = os.environ) -> float:
+    value = environ.get(ENV_THRESHOLD, "").strip()
+    if not value:
+        return DEFAULT_THRESHOLD
+    try:
+        threshold = float(value)
+    except ValueError:
+        raise ValueError(f"{ENV_THRESHOLD} must be a number, got {value!r}") from None
+    return float(np.clip(threshold, 0.0, 1.0))
+
+
+def cascade_stats(model) -> Optional[CascadeStats]:
+    """Stats of a cascade (or a pool of cascades); None for a plain model."""
+    stats = getattr(model, "cascade", None)
+    return stats if isinstance(stats, CascadeStats) else None
@@ -0,0 +1,226 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from moodmate import catalog_data
+
+# (title, reason, link)
+Item = Tuple[str, str, str]
+
+# Catalog item kinds; "song" and "read" are indexed per emotion
+KINDS = ("song", "read", "therapy")
+
+# Base items kept ahead of personalized picks (matches the original 3-item cut)
+TOP_N = 3
+
+# Emotion used when the requested one has no entries
+FALLBACK_EMOTION = "natural"
+
+# Optional path to a larger catalog file (.json, .jsonl or .csv)
+CATALOG_ENV = "MOODMATE_CATALOG"
+
+
+def item_key(item: Item) -> str:
+    """Content hash of an item; unlike table IDs it is the same in every process."""
+    return hashlib.sha256("\x1f".join(item).encode()).hexdigest()[:16]
+
+
+class ItemTable:
+    """Process-wide table of recommendation items addressed by integer ID.
+
+    Session records keep only the IDs, so an item shown in many sessions is
+    stored once no matter how many users or sessions reference it.
+    """
+
+    def __init__(self):
+        self._items: List[Item] = []
+        self._ids = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def intern(self, item: Item) -> int:
+        """Return the ID of ``item``, adding it to the table on first sight."""
+        item = tuple(item)
+        item_id = self._ids.get(item)
+        if item_id is None:
+            with self._lock:
+                item_id = self._ids.get(item)
+                if item_id is None:
+                    item_id = len(self._items)
+                    self._items.append(item)
+                    self._ids[item] = item_id
+                    self._keys[item_key(item)] = item_id
+        return item_id
+
+    def intern_many(self, items: Iterable[Item]) -> Tuple[int, ...]:
+        return tuple(self.intern(item) for item in items)
+
+    def get(self, item_id: int) -> Item:
+        return self._items[item_id]
+
+    def resolve(self, item_ids: Iterable[int]) -> List[Item]:
+        return [self._items[i] for i in item_ids]
+
+    def by_key(self, key: str) -> Optional[int]:
+        """ID of the item with ``item_key`` ``key``, if it has been interned."""
+        return self._keys.get(key)
+
+
+ITEMS = ItemTable()
+
+
+class PersonalizationState(NamedTuple):
+    """Which personalized picks apply to a request; small and hashable for caching."""
+    stabilize: bool = False
+    trend: bool = False
+    milestone: int = 0
+    regulation: bool = False
+    mastery: bool = False
+    weekly: bool = False
+
+
+def personalization_state(emotion: str, insights: Optional[Dict], session_count: int) -> PersonalizationState:
+    """Derive the personalization flags from the dashboard insights."""
+    total = insights['total_sessions'] if insights else 0
+    stability = insights['mood_stability'] if insights else 1.0
+    return PersonalizationState(
+        stabilize=total > 3 and stability < 0.5,
+        trend=total > 3 and insights['most_common_emotion'] == emotion,
+        milestone=session_count if session_count > 0 and session_count % 5 == 0 else 0,
+        regulation=total > 2 and stability < 0.4,
+        mastery=total >= 10,
+        weekly=session_count >= 7,
+    )
+
+
+class Catalog:
+    """Indexed recommendation store, loaded once per process.
+
+    Items are interned into an ``ItemTable`` so every item has a unique ID;
+    per-(kind, emotion) index arrays point into it and the base lists served
+    to the UI are resolved up front, so a recommendation is a dict lookup.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Item]], breathing: Dict[str, Dict],
+                 table: ItemTable = ITEMS):
+        self.table = table
+        self.breathing = breathing
+
+        ids: Dict[Tuple[str, str], List[int]] = {}
+        for kind, emotion, item in entries:
+            if kind not in KINDS:
+                raise ValueError(f"Unknown catalog item kind: {kind!r}")
+            ids.setdefault((kind, emotion), []).append(table.intern(item))
+
+        self.index = {key: np.asarray(v, dtype=np.int32) for key, v in ids.items()}
+        self.therapy = tuple(table.resolve(self.index.get(("therapy", ""), ())))
+        self._lists = {key: tuple(table.resolve(v)) for key, v in self.index.items() if key[0] != "therapy"}
+        self._personalized = lru_cache(maxsize=512)(self._build_personalized)
+        self._picks = lru_cache(maxsize=128)(self._build_picks)
+
+    @classmethod
+    def from_defaults(cls, table: ItemTable = ITEMS) -> "Catalog":
+        """Catalog built from the in-repo lists in ``catalog_data``."""
+        return cls(_default_entries(), catalog_data.BREATHING_EXERCISES, table)
+
+    @classmethod
+    def from_file(cls, path: str, table: ItemTable = ITEMS) -> "Catalog":
+        """Load a catalog file; kinds it does not define fall back to the defaults.
+
+        ``.json`` files use the in-repo layout (``songs``/``reads`` keyed by
+        emotion, ``therapy`` list, optional ``breathing``). ``.jsonl`` and
+        ``.csv`` files hold one item per row with ``kind``, ``emotion``,
+        ``title``, ``reason`` and ``link``.
+        """
+        ext = os.path.splitext(path)[1].lower()
+        breathing = catalog_data.BREATHING_EXERCISES
+        if ext == ".json":
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = list(_structured_entries(data.get("songs", {}), data.get("reads", {}), data.get("therapy", [])))
+            breathing = data.get("breathing", breathing)
+        elif ext in (".jsonl", ".csv"):
+            with open(path, encoding="utf-8", newline="") as f:
+                rows = csv.DictReader(f) if ext == ".csv" else (json.loads(line) for line in f if line.strip())
+                entries = [
+                    (row["kind"], row.get("emotion") or "", (row["title"], row["reason"], row["link"]))
+                    for row in rows
+                ]
+        else:
+            raise ValueError(f"Unsupported catalog format: {path}")
+
+        defined = {kind for kind, _, _ in entries}
+        entries += [entry for entry in _default_entries() if entry[0] not in defined]
+        return cls(entries, breathing, table)
+
+    def items(self, kind: str, emotion: str) -> Tuple[Item, ...]:
+        """All items of ``kind`` for ``emotion``, falling back to ``natural``."""
+        return self._lists.get((kind, emotion)) or self._lists.get((kind, FALLBACK_EMOTION), ())
+
+    def recommend(self, emotion: str):
+        """Full base lists for an emotion: (songs, reads, therapy, breathing)."""
+        breathing = self.breathing.get(emotion, self.breathing.get(FALLBACK_EMOTION))
+        return self.items("song", emotion), self.items("read", emotion), self.therapy, breathing
+
+    def personalized(self, emotion: str, state: PersonalizationState):
+        """Personalized picks followed by the top base items, cached per (emotion, state)."""
+        songs, reads = self._personalized(emotion, state)
+        return songs, reads, self.therapy, self.recommend(emotion)[3]
+
+    def personalized_picks(self, state: PersonalizationState):
+        """Only the personalized extras (songs, reads) for a state."""
+        return self._picks(state)
+
+    def _build_personalized(self, emotion: str, state: PersonalizationState):
+        songs, reads = self._picks(state)
+        return songs + self.items("song", emotion)[:TOP_N], reads + self.items("read", emotion)[:TOP_N]
+
+    def _build_picks(self, state: PersonalizationState):
+        songs = []
+        if state.stabilize:
+            songs.append(catalog_data.PERSONALIZED_SONGS["stabilize"])
+        if state.trend:
+            songs.append(catalog_data.PERSONALIZED_SONGS["trend"])
+        if state.milestone:
+            songs.append(tuple(s.format(count=state.milestone) for s in catalog_data.MILESTONE_SONG))
+
+        reads = []
+        if state.regulation:
+            reads.append(catalog_data.PERSONALIZED_READS["regulation"])
+        if state.mastery:
+            reads.append(catalog_data.PERSONALIZED_READS["mastery"])
+        if state.weekly:
+            reads.append(catalog_data.PERSONALIZED_READS["weekly"])
+
+        return tuple(songs), tuple(reads)
+
+
+def _structured_entries(songs: Dict, reads: Dict, therapy: List):
+    for kind, lists in (("song", songs), ("read", reads)):
+        for emotion, items in lists.items():
+            for item in items:
+                yield kind, emotion, tuple(item)
+    for item in therapy:
+        yield "therapy", "", tuple(item)
+
+
+def _default_entries():
+    return list(_structured_entries(catalog_data.YOUTUBE_SONGS, catalog_data.READING_MINDFULNESS,
+                                    catalog_data.THERAPY_RESOURCES))
+
+
+@lru_cache(maxsize=None)
+def get_catalog(path: Optional[str] = None) -> Catalog:
+    """Process-wide catalog, read from ``MOODMATE_CATALOG`` when set."""
+    path = path or os.environ.get(CATALOG_ENV)
+    return Catalog.from_file(path) if path else Catalog.from_defaults()
+
@@ -0,0 +1,338 @@
+# ----------------------------
+# RECOMMENDATION CATALOGS
+# (short rationale per item; keep concise)
+# ----------------------------
+
+YOUTUBE_SONGS = {
+    "happy": [
+        ("Pharrell Williams - Happy", "Upbeat rhythm reinforces positive affect and boosts mood naturally", "https://www.youtube.com/watch?v=ZbZSe6N_BXs"),
+        ("Katrina Kaif - Nachde Ne Saare", "Energetic tempo matches joyful state and encourages movement", "https://www.youtube.com/watch?v=3PgmGq3oPoE"),
+        ("Bruno Mars - Uptown Funk", "High-energy funk that amplifies happiness and confidence", "https://www.youtube.com/watch?v=OPf0YbXqDm0"),
+        ("Taylor Swift - Shake It Off", "Empowering lyrics help shake off negativity and embrace joy", "https://www.youtube.com/watch?v=nfWlot6h_JM"),
+        ("Arijit Singh - Tum Hi Ho", "Melodic celebration of love and happiness in relationships", "https://www.youtube.com/watch?v=7wtfhZwyrcc"),
+    ],
+    "sad": [
+        ("Coldplay - Fix You", "Gentle build helps emotional release and provides comfort", "https://www.youtube.com/watch?v=k4V3Mo61fJM"),
+        ("Arijit Singh - Channa Mereya", "Cathartic lyrics align with sadness and offer emotional validation", "https://www.youtube.com/watch?v=284Ov7ysmfA"),
+        ("Adele - Someone Like You", "Powerful ballad that helps process feelings of loss and longing", "https://www.youtube.com/watch?v=hLQl3WQQoQ0"),
+        ("Ed Sheeran - Photograph", "Tender melody that acknowledges sadness while offering hope", "https://www.youtube.com/watch?v=nSDgHBxUbVQ"),
+        ("Lata Mangeshkar - Lag Ja Gale", "Classic Hindi song that provides emotional catharsis and healing", "https://www.youtube.com/watch?v=0-Ed3qJzqgc"),
+    ],
+    "angry": [
+        ("Linkin Park - Numb", "High energy channels tension safely and validates frustration", "https://www.youtube.com/watch?v=kXYiU_JCYtU"),
+        ("Imagine Dragons - Believer", "Percussive drive aids affect regulation and builds resilience", "https://www.youtube.com/watch?v=7wtfhZwyrcc"),
+        ("Eminem - Lose Yourself", "Intense rap that channels anger into motivation and determination", "https://www.youtube.com/watch?v=_Yhyp-_hX2s"),
+        ("Rage Against The Machine - Killing in the Name", "Aggressive rock that provides safe outlet for anger expression", "https://www.youtube.com/watch?v=bWXazVhlyxQ"),
+        ("Badshah - Proper Patola", "High-energy Punjabi track that transforms anger into dance energy", "https://www.youtube.com/watch?v=6ZgKuZqXwbg"),
+    ],
+    "fear": [
+        ("AURORA - Runaway", "Airy vocals reduce perceived threat and create calming atmosphere", "https://www.youtube.com/watch?v=d_HlPboLRL8"),
+        ("Prateek Kuhad - Cold/Mess", "Soothing tone lowers arousal and provides emotional safety", "https://www.youtube.com/watch?v=On86kqM1bX4"),
+        ("Billie Eilish - Everything I Wanted", "Gentle electronic sounds that help process anxiety and fear", "https://www.youtube.com/watch?v=EgBJmlPo8Xw"),
+        ("Bon Iver - Skinny Love", "Minimalist arrangement that creates sense of security and peace", "https://www.youtube.com/watch?v=8j741TUIET0"),
+        ("A R Rahman - Mumbai Theme", "Ambient instrumental that provides grounding and reduces anxiety", "https://www.youtube.com/watch?v=DkO5G6j1GIs"),
+    ],
+    "disgust": [
+        ("Daft Punk - Get Lucky", "Clean groove resets affective state and brings positive energy", "https://www.youtube.com/watch?v=5NV6Rdv1a3I"),
+        ("Shankar–Ehsaan–Loy - Dil Chahta Hai", "Light, refreshing vibe reorients mood and clears negative feelings", "https://www.youtube.com/watch?v=0-Ed3qJzqgc"),
+        ("Kygo - Firestone", "Upbeat tropical house that washes away disgust with positivity", "https://www.youtube.com/watch?v=9Sc-ir2UwGU"),
+        ("Calvin Harris - Summer", "Energetic electronic music that transforms negative emotions", "https://www.youtube.com/watch?v=ebXbLfLACGM"),
+        ("Arijit Singh - Kesariya", "Melodic Bollywood track that replaces disgust with romantic feelings", "https://www.youtube.com/watch?v=OPf0YbXqDm0"),
+    ],
+    "surprised": [
+        ("OK Go - Here It Goes Again", "Playful novelty complements surprise and encourages exploration", "https://www.youtube.com/watch?v=dTAAsCNK7RA"),
+        ("Badshah - Proper Patola", "Festive bounce sustains positive surprise and amplifies excitement", "https://www.youtube.com/watch?v=6ZgKuZqXwbg"),
+        ("Panic! At The Disco - High Hopes", "Uplifting anthem that channels surprise into motivation and optimism", "https://www.youtube.com/watch?v=IPXIgEAGe4U"),
+        ("The Weeknd - Blinding Lights", "Retro synth-pop that celebrates unexpected positive moments", "https://www.youtube.com/watch?v=4NRXx6U8ABQ"),
+        ("Dua Lipa - Levitating", "Futuristic pop that elevates surprise into pure joy and energy", "https://www.youtube.com/watch?v=TUVcZfQe-Kw"),
+    ],
+    "contempt": [
+        ("Daft Punk - Get Lucky", "Clean groove resets affective state and brings positive energy", "https://www.youtube.com/watch?v=5NV6Rdv1a3I"),
+        ("Shankar–Ehsaan–Loy - Dil Chahta Hai", "Light, refreshing vibe reorients mood and clears negative feelings", "https://www.youtube.com/watch?v=0-Ed3qJzqgc"),
+        ("Kygo - Firestone", "Upbeat tropical house that washes away contempt with positivity", "https://www.youtube.com/watch?v=9Sc-ir2UwGU"),
+        ("Calvin Harris - Summer", "Energetic electronic music that transforms negative emotions", "https://www.youtube.com/watch?v=ebXbLfLACGM"),
+        ("Arijit Singh - Kesariya", "Melodic Bollywood track that replaces contempt with romantic feelings", "https://www.youtube.com/watch?v=OPf0YbXqDm0"),
+    ],
+    "natural": [
+        ("Ludovico Einaudi - Nuvole Bianche", "Calm piano supports reflection and maintains emotional balance", "https://www.youtube.com/watch?v=kcihcYEOeic"),
+        ("A R Rahman - Mumbai Theme", "Ambient flow maintains balance and provides peaceful atmosphere", "https://www.youtube.com/watch?v=DkO5G6j1GIs"),
+        ("Max Richter - On The Nature of Daylight", "Gentle orchestral piece that supports neutral emotional state", "https://www.youtube.com/watch?v=rVN1B-tUpgs"),
+        ("Ólafur Arnalds - Near Light", "Minimalist composition that enhances focus and inner calm", "https://www.youtube.com/watch?v=4NRXx6U8ABQ"),
+        ("Nils Frahm - Says", "Ambient electronic that promotes mindfulness and presence", "https://www.youtube.com/watch?v=TUVcZfQe-Kw"),
+    ],
+    "sleepy": [
+        ("Ludovico Einaudi - Nuvole Bianche", "Calm piano supports relaxation and prepares mind for rest", "https://www.youtube.com/watch?v=kcihcYEOeic"),
+        ("Max Richter - On The Nature of Daylight", "Gentle orchestral piece for rest and peaceful sleep preparation", "https://www.youtube.com/watch?v=rVN1B-tUpgs"),
+        ("Ólafur Arnalds - Near Light", "Soft melodies that gently guide toward sleep and relaxation", "https://www.youtube.com/watch?v=4NRXx6U8ABQ"),
+        ("Nils Frahm - Says", "Ambient sounds that create perfect sleep-inducing atmosphere", "https://www.youtube.com/watch?v=TUVcZfQe-Kw"),
+        ("Brian Eno - An Ending (Ascent)", "Ethereal ambient music that promotes deep relaxation and sleep", "https://www.youtube.com/watch?v=OPf0YbXqDm0"),
+    ],
+}
+
+READING_MINDFULNESS = {
+    "happy": [
+        ("The Science of Happiness - Greater Good", "Free research-based happiness practices", "https://greatergood.berkeley.edu/topic/happiness"),
+        ("Gratitude Journaling Guide - Mindful.org", "Free step-by-step gratitude practice", "https://www.mindful.org/how-to-start-a-gratitude-practice/"),
+        ("Positive Psychology Exercises - Verywell Mind", "Free activities to boost wellbeing", "https://www.verywellmind.com/positive-psychology-exercises-2795045"),
+        ("Savoring Positive Moments - Psychology Today", "Free techniques to extend joy", "https://www.psychologytoday.com/us/blog/fulfillment-any-age/201201/how-savor-positive-moments"),
+        ("Flow State Activities - Mindful.org", "Free guide to finding your flow", "https://www.mindful.org/how-to-find-your-flow-state/"),
+    ],
+    "sad": [
+        ("Coping with Sadness - Mayo Clinic", "Free evidence-based strategies for low mood", "https://www.mayoclinic.org/diseases-conditions/depression/symptoms-causes/syc-20356007"),
+        ("Self-Compassion During Difficult Times - Mindful.org", "Free practices for self-kindness", "https://www.mindful.org/loving-kindness-meditation/"),
+        ("Grief and Loss Resources - Psychology Today", "Free support for processing sadness", "https://www.psychologytoday.com/us/basics/grief"),
+        ("Depression Support Techniques - Verywell Mind", "Free professional strategies", "https://www.healthline.com/health/breathing-exercise"),
+        ("Mindful Depression Management - Mindful.org", "Free mindfulness-based approaches", "https://www.mindful.org/mindful-depression-management/"),
+    ],
+    "angry": [
+        ("Anger Management Techniques - Mayo Clinic", "Evidence-based strategies for managing anger", "https://www.mayoclinic.org/healthy-lifestyle/adult-health/in-depth/anger-management/art-20045434"),
+        ("Mindful Anger: A Guide to Emotional Regulation", "Free article on mindfulness-based anger management", "https://www.mindful.org/mindful-anger/"),
+        ("Psychology Today: Understanding Anger", "Professional insights on anger psychology", "https://www.psychologytoday.com/us/basics/anger"),
+        ("Breathing Exercises for Anger - Healthline", "Immediate techniques to calm anger", "https://www.healthline.com/health/box-breathing"),
+        ("The Science of Anger - Verywell Mind", "Understanding the biology and psychology of anger", "https://www.verywellmind.com/what-is-anger-5120208"),
+    ],
+    "fear": [
+        ("Managing Anxiety and Fear - Mayo Clinic", "Free evidence-based anxiety management", "https://www.mayoclinic.org/diseases-conditions/anxiety/symptoms-causes/syc-20350961"),
+        ("Breathing Exercises for Anxiety - Healthline", "Free immediate relief techniques", "https://www.healthline.com/health/grounding-techniques"),
+        ("Progressive Muscle Relaxation - Verywell Mind", "Free step-by-step relaxation guide", "https://www.verywellmind.com/progressive-muscle-relaxation-2584454"),
+        ("Exposure Therapy Techniques - Psychology Today", "Free guide to facing fears gradually", "https://www.mindful.org/mindfulness-based-stress-reduction/"),
+        ("Calm Breathing Techniques - Mindful.org", "Free breathing practices for anxiety", "https://www.mindful.org/how-to-practice-mindful-breathing/"),
+    ],
+    "disgust": [
+        ("Understanding Disgust - Psychology Today", "Free article on the psychology of disgust", "https://www.psychologytoday.com/us/basics/disgust"),
+        ("Body Image and Self-Compassion - Mindful.org", "Free resources for body acceptance", "https://www.mindful.org/how-to-practice-mindful-walking/"),
+        ("Grounding Techniques for Trauma - Verywell Mind", "Free techniques for emotional regulation", "https://www.verywellmind.com/grounding-techniques-for-trauma-5206278"),
+        ("Mindful Eating Guide - Mindful.org", "Free practices for healthy food relationship", "https://www.mindful.org/compassion-meditation/"),
+        ("Self-Compassion Exercises - Self-Compassion.org", "Free practices by Dr. Kristin Neff", "https://self-compassion.org/category/exercises/"),
+    ],
+    "surprised": [
+        ("Adaptability and Resilience - Psychology Today", "Free guide to handling unexpected changes", "https://www.psychologytoday.com/us/basics/resilience"),
+        ("Mindful Curiosity Practices - Mindful.org", "Free techniques to channel surprise positively", "https://www.psychologytoday.com/us/blog/the-happiness-project/201503/3-new-things"),
+        ("Change Management Strategies - Verywell Mind", "Free approaches to navigate transitions", "https://www.verywellmind.com/how-to-deal-with-change-3145028"),
+        ("Openness to Experience - Greater Good", "Free practices for flexibility and growth", "https://www.mindful.org/the-power-of-curiosity/"),
+        ("Embracing Uncertainty - Mindful.org", "Free mindfulness practices for life's surprises", "https://www.mindful.org/how-to-embrace-uncertainty/"),
+    ],
+    "contempt": [
+        ("Overcoming Judgment and Contempt - Mindful.org", "Free guide to reducing judgmental thinking", "https://www.mindful.org/overcoming-judgment/"),
+        ("The Psychology of Contempt - Psychology Today", "Understanding contempt and its effects", "https://www.mindful.org/how-to-practice-mindful-walking/"),
+        ("Compassion Meditation Guide - Greater Good", "Free practices to develop compassion", "https://greatergood.berkeley.edu/topic/compassion"),
+        ("Mindful Walking Practice - Mindful.org", "Step-by-step guide to mindful movement", "https://www.mindful.org/compassion-meditation/"),
+        ("Radical Acceptance - Psychology Today", "Free article on accepting reality without judgment", "https://www.psychologytoday.com/us/blog/compassion-matters/201307/radical-acceptance"),
+    ],
+    "natural": [
+        ("Mindfulness for Beginners - Mindful.org", "Free comprehensive mindfulness guide", "https://www.mindful.org/how-to-practice-mindfulness/"),
+        ("Body Scan Meditation - Greater Good", "Free guided body awareness practice", "https://www.mindful.org/how-to-practice-mindful-breathing/"),
+        ("Loving-Kindness Meditation - Mindful.org", "Free compassion cultivation practice", "https://www.mindful.org/how-to-practice-loving-kindness-meditation/"),
+        ("Daily Mindfulness Routine - Verywell Mind", "Free simple practices for balance", "https://www.mindful.org/how-to-meditate/"),
+        ("Mindfulness Research - Greater Good", "Free scientific articles on mindfulness benefits", "https://greatergood.berkeley.edu/topic/mindfulness"),
+    ],
+    "sleepy": [
+        ("Sleep Hygiene Guide - Mayo Clinic", "Free evidence-based sleep improvement", "https://www.mayoclinic.org/healthy-lifestyle/adult-health/in-depth/sleep/art-20048379"),
+        ("Relaxation Techniques for Sleep - Healthline", "Free practices for better rest", "https://www.mayoclinic.org/healthy-lifestyle/stress-management/in-depth/progressive-muscle-relaxation/art-20045354"),
+        ("Circadian Rhythm Optimization - Verywell Mind", "Free guide to natural sleep cycles", "https://www.sleepfoundation.org/sleep-hygiene"),
+        ("Insomnia Management - Psychology Today", "Free strategies for sleep difficulties", "https://www.headspace.com/sleep"),
+        ("Mindful Sleep Practices - Mindful.org", "Free meditation for better sleep", "https://www.mindful.org/how-to-practice-mindful-sleep/"),
+    ],
+}
+
+THERAPY_RESOURCES = [
+    ("NIMHANS (India)", "National mental health institute with clinical services", "https://www.nimhans.ac.in/"),
+    ("iCALL Tata Institute of Social Sciences", "Professional counseling helpline", "https://icallhelpline.org/"),
+    ("Fortis Mental Health", "Counseling & psychiatry network", "https://www.fortishealthcare.com/india/clinical-speciality/mental-health-and-behavioural-sciences"),
+]
+
+# Breathing exercises for each emotion with scientific references
+BREATHING_EXERCISES = {
+    "angry": {
+        "name": "4-7-8 Calming Breath",
+        "description": "Slow breathing technique to activate parasympathetic nervous system and reduce anger",
+        "technique": "Inhale for 4 counts, hold for 7 counts, exhale for 8 counts",
+        "duration": "5-10 minutes",
+        "reference": "Weil, A. (2012). Breathing: The Master Key to Self Healing. Evidence shows slow breathing reduces cortisol and activates relaxation response.",
+        "reference_link": "https://www.drweil.com/health-wellness/body-mind-spirit/stress-anxiety/breathing-exercises-4-7-8-breath/",
+        "steps": [
+            "Sit comfortably with spine straight",
+            "Place tip of tongue behind upper front teeth",
+            "Exhale completely through mouth",
+            "Close mouth, inhale through nose for 4 counts",
+            "Hold breath for 7 counts", 
+            "Exhale through mouth for 8 counts",
+            "Repeat 4-8 cycles"
+        ]
+    },
+    "contempt": {
+        "name": "Heart-Centered Breathing",
+        "description": "Compassion-focused breathing to dissolve judgmental feelings and cultivate empathy",
+        "technique": "Breathe into heart center while focusing on compassion",
+        "duration": "8-12 minutes",
+        "reference": "Fredrickson, B. (2013). Love 2.0: How Our Supreme Emotion Affects Everything We Feel, Think, Do, and Become. Heart-focused breathing increases positive emotions.",
+        "reference_link": "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC3156028/",
+        "steps": [
+            "Place hand over heart center",
+            "Breathe slowly and deeply",
+            "With each inhale, imagine breathing in compassion",
+            "With each exhale, release judgment and criticism",
+            "Visualize warm, loving energy in your heart",
+            "Extend compassion to yourself and others",
+            "Continue for 8-12 minutes"
+        ]
+    },
+    "disgust": {
+        "name": "Cleansing Breath",
+        "description": "Purifying breathing technique to release negative emotions and refresh mental state",
+        "technique": "Deep inhales followed by forceful exhales to cleanse",
+        "duration": "6-8 minutes",
+        "reference": "Brown, R. P., & Gerbarg, P. L. (2005). Sudarshan Kriya yogic breathing in the treatment of stress, anxiety, and depression. Journal of Alternative and Complementary Medicine.",
+        "reference_link": "https://pubmed.ncbi.nlm.nih.gov/16332104/",
+        "steps": [
+            "Sit upright with shoulders relaxed",
+            "Take deep breath through nose",
+            "Hold for 2-3 seconds",
+            "Exhale forcefully through mouth",
+            "Imagine releasing all negativity",
+            "Repeat 8-12 times",
+            "End with 3 gentle breaths"
+        ]
+    },
+    "fear": {
+        "name": "Grounding Breath",
+        "description": "Stabilizing breathing to calm nervous system and reduce anxiety",
+        "technique": "Slow, deep breathing with grounding visualization",
+        "duration": "10-15 minutes",
+        "reference": "Jerath, R., et al. (2006). Physiology of long pranayamic breathing: Neural respiratory elements may provide a mechanism. Journal of Applied Physiology.",
+        "reference_link": "https://pubmed.ncbi.nlm.nih.gov/16282441/",
+        "steps": [
+            "Sit with feet flat on ground",
+            "Place hands on thighs",
+            "Breathe slowly through nose",
+            "Feel connection to earth",
+            "With each breath, imagine roots growing down",
+            "Focus on present moment",
+            "Continue until feeling grounded"
+        ]
+    },
+    "happy": {
+        "name": "Joy Amplification Breath",
+        "description": "Energizing breathing to enhance positive emotions and boost mood",
+        "technique": "Rhythmic breathing with joyful visualization",
+        "duration": "5-8 minutes",
+        "reference": "Kok, B. E., et al. (2013). How positive emotions build physical health. Psychological Science.",
+        "reference_link": "https://pubmed.ncbi.nlm.nih.gov/23527591/",
+        "steps": [
+            "Stand or sit with open posture",
+            "Smile gently",
+            "Breathe in joy and gratitude",
+            "Exhale spreading happiness",
+            "Visualize golden light filling your body",
+            "Feel energy expanding outward",
+            "Share joy with the world"
+        ]
+    },
+    "natural": {
+        "name": "Mindful Breathing",
+        "description": "Present-moment awareness breathing for emotional balance and clarity",
+        "technique": "Natural breathing with mindful attention",
+        "duration": "10-20 minutes",
+        "reference": "Kabat-Zinn, J. (1990). Full Catastrophe Living: Using the Wisdom of Your Body and Mind to Face Stress, Pain, and Illness.",
+        "reference_link": "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC3679190/",
+        "steps": [
+            "Sit comfortably",
+            "Close eyes gently",
+            "Notice natural breath",
+            "Don't change breathing",
+            "Observe sensations",
+            "When mind wanders, return to breath",
+            "Practice non-judgmental awareness"
+        ]
+    },
+    "sad": {
+        "name": "Comforting Breath",
+        "description": "Gentle, nurturing breathing to provide emotional support and healing",
+        "technique": "Soft, slow breathing with self-compassion",
+        "duration": "12-15 minutes",
+        "reference": "Neff, K. (2011). Self-Compassion: The Proven Power of Being Kind to Yourself. Compassionate breathing reduces depression symptoms.",
+        "reference_link": "https://self-compassion.org/",
+        "steps": [
+            "Lie down or sit comfortably",
+            "Place hand on heart",
+            "Breathe softly and slowly",
+            "With each breath, offer yourself kindness",
+            "Imagine warm, healing light",
+            "Allow emotions to flow naturally",
+            "Practice self-acceptance"
+        ]
+    },
+    "sleepy": {
+        "name": "Energizing Breath",
+        "description": "Invigorating breathing to increase alertness and mental clarity",
+        "technique": "Quick, energizing breaths followed by deep inhales",
+        "duration": "3-5 minutes",
+        "reference": "Brown, R. P., & Gerbarg, P. L. (2009). Yoga breathing, meditation, and longevity. Annals of the New York Academy of Sciences.",
+        "reference_link": "https://pubmed.ncbi.nlm.nih.gov/19673776/",
+        "steps": [
+            "Sit upright",
+            "Take 3 quick breaths through nose",
+            "Hold breath briefly",
+            "Exhale slowly",
+            "Repeat 5-7 times",
+            "End with 3 deep breaths",
+            "Feel energy and alertness"
+        ]
+    },
+    "surprised": {
+        "name": "Centering Breath",
+        "description": "Balancing breathing to process unexpected emotions and regain equilibrium",
+        "technique": "Equal-length inhales and exhales for balance",
+        "duration": "6-10 minutes",
+        "reference": "Gerbarg, P. L., & Brown, R. P. (2005). Yoga and neuro-psychiatric disorders. International Journal of Yoga.",
+        "reference_link": "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC3193654/",
+        "steps": [
+            "Sit in comfortable position",
+            "Breathe in for 4 counts",
+            "Hold for 4 counts",
+            "Exhale for 4 counts",
+            "Hold empty for 4 counts",
+            "Repeat equal rhythm",
+            "Feel centered and balanced"
+        ]
+    }
+}
+
+# Extra picks added on top of the base lists depending on the user's history
+PERSONALIZED_SONGS = {
+    "stabilize": (
+        "🎯 Personalized Pick: Calming Focus Music",
+        "Based on your mood patterns, you might benefit from calming music to help stabilize your emotions.",
+        "https://www.youtube.com/results?search_query=calming+focus+music"
+    ),
+    "trend": (
+        "📈 Trend-Based Recommendation",
+        "This emotion appears frequently in your sessions. Here are some specialized tracks for deeper exploration.",
+        "https://www.youtube.com/results?search_query=emotional+healing+music"
+    ),
+}
+
+# Formatted with the session count every 5 sessions
+MILESTONE_SONG = (
+    "🏆 Milestone Achievement: {count} Sessions!",
+    "Congratulations on your {count}th session! Here's a special recommendation for your dedication to emotional wellness.",
+    "https://www.youtube.com/results?search_query=motivational+wellness+music"
+)
+
+PERSONALIZED_READS = {
+    "regulation": (
+        "🧠 Advanced Emotional Regulation Guide",
+        "Based on your emotional patterns, this advanced guide can help you develop stronger emotional regulation skills.",
+        "https://www.psychologytoday.com/us/basics/emotional-regulation"
+    ),
+    "mastery": (
+        "📚 Deep Dive: Emotional Intelligence Mastery",
+        "With your consistent practice, you're ready for advanced emotional intelligence techniques.",
+        "https://www.verywellmind.com/what-is-emotional-intelligence-2795423"
+    ),
+    "weekly": (
+        "🌟 Weekly Wellness Reflection",
+        "You've been practicing for a week! Here's a guide to reflect on your emotional growth.",
+        "https://www.mindful.org/how-to-practice-mindfulness/"
+    ),
+}
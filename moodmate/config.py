@@ -0,0 +1,13 @@
+import os
+
+EMOTION_CLASSES = ["angry","contempt","disgust","fear","happy","natural","sad","sleepy","surprised"]
+
+INPUT_MODES = ["Image", "Video", "Live Webcam", "Text Input"]
+
+# ----------------------------
+# PATHS CONFIGURATION
+# ----------------------------
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(PROJECT_DIR, "last.pt")
+ASSETS_DIR = os.path.join(PROJECT_DIR, "assets")
+OUTPUTS_DIR = os.path.join(PROJECT_DIR, "outputs")
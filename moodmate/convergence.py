@@ -0,0 +1,71 @@
+"""
+Early stop for video analysis once the emotion mix has settled.
+
+Every ``window`` analyzed frames the running weights are normalized into
+class shares and kept as a snapshot. The analysis has converged when the
+last ``windows`` snapshots all name the same dominant emotion and no class
+share moved by more than ``tolerance`` percentage points between any two of
+them. Consecutive video frames are strongly correlated, so a binomial
+confidence interval over frames would be far too optimistic; agreement
+across whole windows is the more honest signal.
+"""
+
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from moodmate.config import EMOTION_CLASSES
+
+# Largest change of any class share (percentage points) still counted as stable
+DEFAULT_TOLERANCE = 2.0
+# Analyzed frames between snapshots
+WINDOW = 30
+# Snapshots that must agree before stopping
+WINDOWS = 4
+# Never stop before this many frames
+MIN_FRAMES = 90
+
+
+def share_vector(weights: Dict[str, float]) -> Optional[np.ndarray]:
+    """Class shares in percent, in EMOTION_CLASSES order; None before any detection."""
+    vec = np.array([weights.get(k, 0.0) for k in EMOTION_CLASSES], np.float64)
+    total = vec.sum()
+    return vec * (100.0 / total) if total > 0 else None
+
+
+class ConvergenceMonitor:
+    """Fed the running weights after each frame; says when further frames would not change the result."""
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE, window: int = WINDOW, windows: int = WINDOWS,
+                 min_frames: int = MIN_FRAMES):
+        self.tolerance = tolerance
+        self.window = window
+        self.windows = windows
+        self.min_frames = min_frames
+        self.frames = 0
+        self.converged = False
+        self._snapshots: deque = deque(maxlen=windows)
+
+    def update(self, weights: Dict[str, float]) -> bool:
+        """Count one analyzed frame; True once the distribution is stable."""
+        self.frames += 1
+        if self.converged or self.frames % self.window:
+            return self.converged
+        shares = share_vector(weights)
+        if shares is None:
+            # Nothing detected yet; stability of an empty mix means nothing
+            self._snapshots.clear()
+            return False
+        self._snapshots.append(shares)
+        self.converged = self.frames >= self.min_frames and self._stable()
+        return self.converged
+
+    def _stable(self) -> bool:
+        if len(self._snapshots) < self.windows:
+            return False
+        snaps = np.stack(self._snapshots)
+        if len(set(snaps.argmax(axis=1).tolist())) > 1:
+            return False
+        spread = snaps.max(axis=0) - snaps.min(axis=0)
+        return float(spread.max()) <= self.tolerance
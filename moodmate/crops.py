@@ -0,0 +1,103 @@
+"""
+Two-stage detection: find faces on the full frame now and then, classify crops in between.
+
+A full-frame predict at detection resolution is only needed to *find* faces.
+Between refreshes each known face is cropped (with a margin so it can move a
+little), and the crops are sent through the model as one small batch at
+``crop_size``. The best detection inside each crop updates that face's box
+and emotion. A crop that comes back empty means the face moved away or left,
+so the frame falls back to a full pass.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from moodmate.aggregation import Detections, as_detections
+from moodmate.metrics import stage
+from moodmate.pipeline import predict_batch, predict_frame
+
+# Full-frame passes happen at least every REFRESH_EVERY frames
+REFRESH_EVERY = 10
+# Model input size for face crops (a multiple of the YOLO stride, 32)
+CROP_SIZE = 160
+# Extra context around a box, as a fraction of its width/height per side
+CROP_MARGIN = 0.25
+MAX_FACES = 8
+
+
+def crop_regions(boxes: np.ndarray, width: int, height: int, margin: float = CROP_MARGIN) -> np.ndarray:
+    """Integer crop windows (x1, y1, x2, y2) around ``boxes``, clipped to the frame."""
+    if not len(boxes):
+        return np.zeros((0, 4), np.int32)
+    sizes = np.concatenate([boxes[:, 2:] - boxes[:, :2]] * 2, axis=1)
+    grown = boxes + sizes * margin * np.array([-1, -1, 1, 1], np.float32)
+    grown = np.clip(grown, 0, [width, height, width, height])
+    regions = np.round(grown).astype(np.int32)
+    # Never produce an empty crop
+    regions[:, 2:] = np.maximum(regions[:, 2:], regions[:, :2] + 1)
+    return regions
+
+
+class FaceCropClassifier:
+    """Drop-in for per-frame ``predict`` that mostly runs on face crops."""
+
+    def __init__(self, model, conf: float, refresh_every: int = REFRESH_EVERY, crop_size: int = CROP_SIZE,
+                 margin: float = CROP_MARGIN, max_faces: int = MAX_FACES):
+        self.model = model
+        self.conf = conf
+        self.refresh_every = refresh_every
+        self.crop_size = crop_size
+        self.margin = margin
+        self.max_faces = max_faces
+        self.boxes = np.zeros((0, 4), np.float32)
+        self.since_refresh = 0
+        self.full_passes = 0
+        self.crop_passes = 0
+
+    def detect(self, frame_rgb: np.ndarray) -> Detections:
+        if not len(self.boxes) or self.since_refresh >= self.refresh_every:
+            return self._refresh(frame_rgb)
+        det = self._classify_crops(frame_rgb)
+        if det is None:
+            return self._refresh(frame_rgb)
+        self.since_refresh += 1
+        return det
+
+    def _refresh(self, frame_rgb: np.ndarray) -> Detections:
+        det = as_detections(predict_frame(self.model, frame_rgb, self.conf))
+        if len(det) > self.max_faces:
+            keep = np.argsort(-det.confs, kind="stable")[:self.max_faces]
+            det = Detections(det.boxes[keep], det.confs[keep], det.classes[keep])
+        self.boxes = det.boxes.copy()
+        self.since_refresh = 0
+        self.full_passes += 1
+        return det
+
+    def _classify_crops(self, frame_rgb: np.ndarray) -> Optional[Detections]:
+        height, width = frame_rgb.shape[:2]
+        with stage("crop"):
+            regions = crop_regions(self.boxes, width, height, self.margin)
+            crops = [np.ascontiguousarray(frame_rgb[y1:y2, x1:x2]) for x1, y1, x2, y2 in regions.tolist()]
+        results = predict_batch(self.model, crops, self.conf, self.crop_size)
+
+        boxes, confs, classes = [], [], []
+        for (x1, y1, _, _), res in zip(regions.tolist(), results):
+            det = as_detections(res)
+            if not len(det):
+                return None
+            best = int(np.argmax(det.confs))
+            boxes.append(det.boxes[best] + np.array([x1, y1, x1, y1], np.float32))
+            confs.append(det.confs[best])
+            classes.append(det.classes[best])
+        det = Detections(np.array(boxes, np.float32), np.array(confs, np.float32), np.array(classes, np.int16))
+        # Follow the faces so the next crops stay centred
+        self.boxes = det.boxes.copy()
+        self.crop_passes += 1
+        return det
+
+    @property
+    def crop_ratio(self) -> float:
+        """Share of frames served from crops only."""
+        total = self.full_passes + self.crop_passes
+        return self.crop_passes / total if total else 0.0
@@ -0,0 +1,222 @@
+"""
+Binary per-frame detection log, and replay without the model.
+
+A log is one file: a small JSON header followed by fixed-width frame records
+(``record_dtype``). Each record holds the frame index, a timestamp in
+seconds, and up to ``slots`` detections as parallel class/confidence/box
+arrays, most confident first. Fixed-width records mean the file can be
+appended while analysis runs and memory-mapped as one numpy structured
+array when read, including a log that is still being written.
+
+    python -m moodmate.detlog outputs/video_1234.mdlog [--conf 0.5]
+
+Replay re-runs ``accumulate_emotions``/``normalize_percentages`` over the
+logged detections, optionally at a stricter confidence threshold, so
+reports and charts can be rebuilt and benchmarks get a deterministic,
+model-free input.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from moodmate.aggregation import Detections, accumulate_emotions, as_detections, normalize_percentages
+from moodmate.config import EMOTION_CLASSES
+
+MAGIC = b"MMDLOG\x00\x01"
+# Detections kept per frame (the most confident ones); matches crops.MAX_FACES
+SLOTS = 8
+# Records buffered before a write; the reader only sees flushed records
+FLUSH_EVERY = 64
+# Header (magic, JSON length, JSON) is padded so records start aligned
+ALIGN = 64
+SUFFIX = ".mdlog"
+
+
+def record_dtype(slots: int = SLOTS) -> np.dtype:
+    return np.dtype([
+        ("index", "<u4"),
+        ("count", "<u2"),
+        ("timestamp", "<f8"),
+        ("classes", "<i2", (slots,)),
+        ("confs", "<f4", (slots,)),
+        ("boxes", "<f4", (slots, 4)),
+    ])
+
+
+class DetectionLogWriter:
+    """Appends one record per analyzed frame; use as a context manager or call ``close``.
+
+    The file is created on the first ``write``, so a stream that never
+    delivers a frame leaves nothing behind.
+    """
+
+    def __init__(self, path: str, slots: int = SLOTS, **meta):
+        self.path = path
+        self.slots = slots
+        self.dtype = record_dtype(slots)
+        self.meta = meta
+        self.frames = 0
+        self.truncated = 0
+        header = json.dumps({"version": 1, "slots": slots, "classes": list(EMOTION_CLASSES), **meta}).encode()
+        size = len(MAGIC) + 4 + len(header)
+        header += b" " * (-size % ALIGN)
+        self._header = MAGIC + struct.pack("<I", len(header)) + header
+        self._file = None
+        self._closed = False
+        self._buffer = np.zeros(FLUSH_EVERY, self.dtype)
+        self._pending = 0
+        # A stream thread writes while the UI thread may flush to read the log
+        self._lock = threading.Lock()
+
+    def write(self, index: int, detections, timestamp: float = 0.0):
+        det = as_detections(detections)
+        n = len(det)
+        if n > self.slots:
+            keep = np.argsort(-det.confs, kind="stable")[:self.slots]
+            det = Detections(det.boxes[keep], det.confs[keep], det.classes[keep])
+            self.truncated += 1
+            n = self.slots
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._file = open(self.path, "wb")
+                self._file.write(self._header)
+                self._file.flush()
+            rec = self._buffer[self._pending]
+            rec["index"] = index
+            rec["count"] = n
+            rec["timestamp"] = timestamp
+            rec["classes"][:n] = det.classes
+            rec["confs"][:n] = det.confs
+            rec["boxes"][:n] = det.boxes
+            self._pending += 1
+            self.frames += 1
+            if self._pending == FLUSH_EVERY:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._file is None or self._file.closed:
+            return
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._buffer[:self._pending] = 0
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prune_logs(directory: str, prefix: str, keep: int):
+    """Delete all but the ``keep`` newest ``prefix*`` logs in ``directory``."""
+    try:
+        names = [n for n in os.listdir(directory) if n.startswith(prefix) and n.endswith(SUFFIX)]
+    except FileNotFoundError:
+        return
+    paths = sorted((os.path.join(directory, n) for n in names), key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def read_header(path: str) -> Tuple[Dict, int]:
+    """(header dict, byte offset of the first record)."""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a detection log")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+    return header, len(MAGIC) + 4 + length
+
+
+class DetectionLog:
+    """Read side: ``records`` is a memory-mapped structured array (never loaded eagerly)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header, offset = read_header(path)
+        dtype = record_dtype(self.header["slots"])
+        # Only whole records; a log that is still being written may end mid-flush
+        count = (os.path.getsize(path) - offset) // dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def detections(self, conf: float = 0.0) -> Iterator[Tuple[int, float, Detections]]:
+        """(frame index, timestamp, detections at or above ``conf``) per logged frame."""
+        for rec in self.records:
+            n = int(rec["count"])
+            confs = np.asarray(rec["confs"][:n])
+            keep = confs >= conf
+            yield int(rec["index"]), float(rec["timestamp"]), Detections(
+                np.asarray(rec["boxes"][:n])[keep], confs[keep], np.asarray(rec["classes"][:n])[keep])
+
+
+def replay(log: DetectionLog, conf: float = 0.0) -> Dict[str, float]:
+    """Emotion weights rebuilt from the log, as the live analysis would have accumulated them."""
+    weights = {k: 0.0 for k in EMOTION_CLASSES}
+    for _, _, det in log.detections(conf):
+        accumulate_emotions(det, weights)
+    return weights
+
+
+def replay_percentages(log: DetectionLog, conf: float = 0.0) -> Dict[str, float]:
+    return normalize_percentages(replay(log, conf))
+
+
+def replay_timeline(log: DetectionLog, conf: float = 0.0,
+                    points: Optional[int] = 100) -> Iterator[Tuple[float, Dict[str, float]]]:
+    """(timestamp, running percentages) at up to ``points`` evenly spaced frames."""
+    every = max(1, len(log) // points) if points else 1
+    weights = {k: 0.0 for k in EMOTION_CLASSES}
+    for i, (_, timestamp, det) in enumerate(log.detections(conf)):
+        accumulate_emotions(det, weights)
+        if (i + 1) % every == 0 or i + 1 == len(log):
+            yield timestamp, normalize_percentages(weights)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-aggregate a MoodMate detection log without the model")
+    parser.add_argument("log", help="Detection log (.mdlog)")
+    parser.add_argument("--conf", type=float, default=0.0,
+                        help="Ignore detections below this confidence (only stricter than the recorded one)")
+    args = parser.parse_args(argv)
+
+    log = DetectionLog(args.log)
+    percentages = replay_percentages(log, args.conf)
+    json.dump({"frames": len(log), "header": log.header, "percentages": percentages}, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
+
+from moodmate.config import EMOTION_CLASSES, INPUT_MODES
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Dominant emotion may be "unknown" when a session had no detections
+DOMINANT_CATEGORIES = EMOTION_CLASSES + ["unknown"]
+
+
+class HistoryFrame:
+    """Columnar mood history backing the Full History page.
+
+    Sessions are appended into preallocated NumPy columns (one float column
+    per emotion plus integer codes for the categorical fields). The pandas
+    views are built once with vectorized ops and cached until the next append.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._size = 0
+        self._timestamps = np.empty(capacity, dtype="datetime64[s]")
+        self._percentages = np.zeros((capacity, len(EMOTION_CLASSES)), dtype=np.float32)
+        self._dominant = np.zeros(capacity, dtype=np.int8)
+        self._mode = np.zeros(capacity, dtype=np.int8)
+        self._session_ids = []
+        self._modes = list(INPUT_MODES)
+        self._frame = None
+        self._display = None
+
+    @classmethod
+    def from_history(cls, history) -> "HistoryFrame":
+        """Build the columns from an existing list of session records."""
+        frame = cls(capacity=max(64, len(history)))
+        for record in history:
+            frame.append_record(record)
+        return frame
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp: datetime, input_mode: str, dominant: str,
+               percentages: Dict[str, float], session_id: str):
+        """Add one session, growing the columns geometrically when full."""
+        vector = [percentages.get(k, 0.0) for k in EMOTION_CLASSES]
+        self._append(timestamp, input_mode, dominant, vector, session_id)
+
+    def append_record(self, record):
+        """Add one ``SessionRecord`` without going through a percentages dict."""
+        self._append(record.timestamp, record.input_mode, record.dominant_emotion,
+                     record.percentages, record.session_id)
+
+    def _append(self, timestamp, input_mode, dominant, vector, session_id):
+        if self._size == len(self._timestamps):
+            self._grow()
+
+        i = self._size
+        self._timestamps[i] = np.datetime64(timestamp, "s")
+        self._percentages[i] = vector
+        self._dominant[i] = DOMINANT_CATEGORIES.index(dominant) if dominant in DOMINANT_CATEGORIES else len(EMOTION_CLASSES)
+        if input_mode not in self._modes:
+            self._modes.append(input_mode)
+        self._mode[i] = self._modes.index(input_mode)
+        self._session_ids.append(session_id)
+        self._size += 1
+
+        self._frame = None
+        self._display = None
+
+    def copy(self) -> "HistoryFrame":
+        """Independent columns; the cached pandas views are shared until either side appends."""
+        other = HistoryFrame.__new__(HistoryFrame)
+        other.__dict__.update(self.__dict__)
+        other._timestamps = self._timestamps.copy()
+        other._percentages = self._percentages.copy()
+        other._dominant = self._dominant.copy()
+        other._mode = self._mode.copy()
+        other._session_ids = list(self._session_ids)
+        other._modes = list(self._modes)
+        return other
+
+    def clear(self):
+        self.__init__()
+
+    def _grow(self):
+        capacity = len(self._timestamps) * 2
+        self._timestamps = np.resize(self._timestamps, capacity)
+        self._dominant = np.resize(self._dominant, capacity)
+        self._mode = np.resize(self._mode, capacity)
+        percentages = np.zeros((capacity, len(EMOTION_CLASSES)), dtype=np.float32)
+        percentages[:self._size] = self._percentages[:self._size]
+        self._percentages = percentages
+
+    def frame(self) -> "pd.DataFrame":
+        """Typed columnar view: timestamp, categoricals and one column per emotion."""
+        if self._frame is None:
+            import pandas as pd
+
+            n = self._size
+            data = {
+                'timestamp': pd.to_datetime(self._timestamps[:n]),
+                'input_mode': pd.Categorical.from_codes(self._mode[:n], categories=self._modes),
+                'dominant_emotion': pd.Categorical.from_codes(self._dominant[:n], categories=DOMINANT_CATEGORIES),
+                'session_id': self._session_ids[:n],
+            }
+            for j, emotion in enumerate(EMOTION_CLASSES):
+                data[emotion] = self._percentages[:n, j]
+            self._frame = pd.DataFrame(data)
+        return self._frame
+
+    def display_frame(self) -> "pd.DataFrame":
+        """Formatted table shown on the history page."""
+        if self._display is None:
+            import pandas as pd
+
+            df = self.frame()
+            n = self._size
+
+            # Top 3 emotions per session via a single argsort over the percentage matrix
+            percentages = self._percentages[:n]
+            top_idx = np.argsort(-percentages, axis=1, kind="stable")[:, :3]
+            top_vals = np.take_along_axis(percentages, top_idx, axis=1)
+            names = np.array([e.capitalize() for e in EMOTION_CLASSES], dtype=object)
+            parts = [
+                pd.Series(names[top_idx[:, k]]) + "(" + pd.Series(top_vals[:, k]).map("{:.1f}".format) + "%)"
+                for k in range(top_idx.shape[1])
+            ]
+            breakdown = parts[0].str.cat(parts[1:], sep=", ") if parts else pd.Series([""] * n)
+
+            self._display = pd.DataFrame({
+                'Date': df['timestamp'].dt.strftime('%Y-%m-%d'),
+                'Time': df['timestamp'].dt.strftime('%H:%M'),
+                'Input Mode': df['input_mode'],
+                'Dominant Emotion': df['dominant_emotion'].cat.rename_categories(str.capitalize),
+                'Emotion Breakdown': breakdown,
+                'Session ID': df['session_id'],
+            })
+        return self._display
+
+    def dominant_counts(self) -> "pd.DataFrame":
+        """Session count per dominant emotion, for the distribution chart."""
+        import pandas as pd
+        counts = self.frame()['dominant_emotion'].value_counts(sort=False)
+        counts = counts[counts > 0]
+        return pd.DataFrame({'Emotion': counts.index.astype(str), 'Count': counts.to_numpy()})
+
+    def mean_percentages(self) -> "pd.Series":
+        """Average emotion distribution across all sessions."""
+        return self.frame()[EMOTION_CLASSES].mean()
@@ -0,0 +1,111 @@
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Optional
+
+# Number of most recent sessions used for trend and stability metrics
+RECENT_WINDOW = 7
+
+
+class MoodInsights:
+    """Running aggregate of mood history, updated once per saved session.
+
+    Every dashboard metric is read from counters kept here, so the cost of a
+    rerun does not grow with the length of the history.
+    """
+
+    __slots__ = (
+        "total_sessions", "emotion_counts", "mode_counts", "recent",
+        "recent_counts", "first_timestamp", "last_timestamp", "last_session",
+    )
+
+    def __init__(self, window: int = RECENT_WINDOW):
+        self.total_sessions = 0
+        self.emotion_counts = Counter()
+        self.mode_counts = Counter()
+        self.recent = deque(maxlen=window)
+        self.recent_counts = Counter()
+        self.first_timestamp: Optional[datetime] = None
+        self.last_timestamp: Optional[datetime] = None
+        self.last_session = None
+
+    @classmethod
+    def from_history(cls, history, window: int = RECENT_WINDOW) -> "MoodInsights":
+        """Rebuild the aggregate from an existing list of session records."""
+        insights = cls(window)
+        for session in history:
+            insights.record(session.dominant_emotion, session.input_mode, session.timestamp, session)
+        return insights
+
+    def record(self, dominant: str, input_mode: str, timestamp: datetime, session=None):
+        """Fold one saved session into the aggregate."""
+        self.total_sessions += 1
+        self.emotion_counts[dominant] += 1
+        self.mode_counts[input_mode] += 1
+
+        # Slide the recent window, dropping the oldest emotion from its counter
+        if len(self.recent) == self.recent.maxlen:
+            evicted = self.recent[0]
+            self.recent_counts[evicted] -= 1
+            if self.recent_counts[evicted] <= 0:
+                del self.recent_counts[evicted]
+        self.recent.append(dominant)
+        self.recent_counts[dominant] += 1
+
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        self.last_session = session
+
+    def copy(self) -> "MoodInsights":
+        """Independent aggregate; sessions recorded into it leave this one unchanged."""
+        other = MoodInsights(self.recent.maxlen)
+        other.total_sessions = self.total_sessions
+        other.emotion_counts = self.emotion_counts.copy()
+        other.mode_counts = self.mode_counts.copy()
+        other.recent.extend(self.recent)
+        other.recent_counts = self.recent_counts.copy()
+        other.first_timestamp = self.first_timestamp
+        other.last_timestamp = self.last_timestamp
+        other.last_session = self.last_session
+        return other
+
+    def reset(self):
+        """Forget all sessions (used when the history is cleared)."""
+        self.__init__(self.recent.maxlen)
+
+    @property
+    def most_common_emotion(self) -> str:
+        """Most frequent dominant emotion over the whole history."""
+        return _top(self.emotion_counts)
+
+    @property
+    def most_used_mode(self) -> str:
+        return _top(self.mode_counts)
+
+    @property
+    def days_active(self) -> int:
+        if self.first_timestamp is None or self.total_sessions < 2:
+            return 1
+        return (self.last_timestamp - self.first_timestamp).days + 1
+
+    def as_dict(self) -> Optional[Dict]:
+        """Dashboard summary in the shape returned by ``get_mood_insights``."""
+        if self.total_sessions == 0:
+            return None
+
+        most_common = max(self.recent_counts.items(), key=lambda x: x[1]) if self.recent_counts else ('unknown', 0)
+        # Lower ratio of distinct emotions = more stable mood
+        stability_score = len(self.recent_counts) / len(self.recent) if self.recent else 0
+
+        return {
+            'total_sessions': self.total_sessions,
+            'most_common_emotion': most_common[0],
+            'emotion_frequency': most_common[1],
+            'mood_stability': stability_score,
+            'recent_trend': dict(self.recent_counts),
+            'last_session': self.last_session,
+        }
+
+
+def _top(counts: Counter) -> str:
+    return max(counts.items(), key=lambda x: x[1])[0] if counts else "None"
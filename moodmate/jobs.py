@@ -0,0 +1,303 @@
+"""
+Background video analysis jobs, keyed by upload content.
+
+Streamlit reruns the whole script on every widget interaction, so a video
+loop running inside the script is abandoned and restarted. Here the loop runs
+on a worker thread instead. The script submits the upload bytes plus the
+analysis settings, keeps only the job key, and polls the job on each rerun.
+The same upload with the same settings always maps to the same job, so a
+video is analyzed once however often the page reruns.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from moodmate.aggregation import dominant_emotion, normalize_percentages
+from moodmate.config import EMOTION_CLASSES, OUTPUTS_DIR
+from moodmate.convergence import ConvergenceMonitor
+from moodmate.crops import FaceCropClassifier
+from moodmate.detlog import SUFFIX as LOG_SUFFIX, DetectionLogWriter
+from moodmate.pipeline import analyze_video, draw_detections, video_fps
+from moodmate.sampling import ChangeDetector
+from moodmate.thumbnails import ThumbnailStore, encode_thumbnail, max_confidence
+from moodmate.tracking import FaceTracker
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = "queued", "running", "done", "cancelled", "failed"
+FINISHED = (DONE, CANCELLED, FAILED)
+
+JOB_WORKERS_ENV = "MOODMATE_VIDEO_JOBS"
+# Finished jobs remembered for reruns/re-submits; older ones are dropped
+KEEP_FINISHED = 16
+# Live preview: downscaled JPEG, refreshed at most every PREVIEW_INTERVAL seconds
+PREVIEW_SIDE = 480
+PREVIEW_QUALITY = 70
+PREVIEW_INTERVAL = 0.5
+# Points kept for the running emotion chart; halved when full
+TIMELINE_POINTS = 240
+
+
+class Throttle:
+    """Wall-clock rate limit: ``ready()`` is True at most once per ``interval`` seconds."""
+
+    def __init__(self, interval: float, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._last: Optional[float] = None
+
+    def ready(self) -> bool:
+        now = self.clock()
+        if self._last is not None and now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
+
+
+def job_key(data: bytes, **settings) -> str:
+    """Content hash of the upload plus the settings that change the result."""
+    digest = hashlib.sha256(data)
+    for name in sorted(settings):
+        digest.update(f"|{name}={settings[name]}".encode())
+    return digest.hexdigest()[:32]
+
+
+class VideoJob:
+    """State of one background analysis; read from the script thread, written by the worker."""
+
+    def __init__(self, key: str, path: str, conf: float, change_threshold: float = 0.0, face_crops: bool = False,
+                 converge: bool = False, log_path: Optional[str] = None):
+        self.key = key
+        self.path = path
+        # Per-frame detections (``moodmate.detlog``), kept after the job so results can be replayed
+        self.log_path = log_path
+        self.conf = conf
+        self.change_threshold = change_threshold
+        self.face_crops = face_crops
+        self.converge = converge
+        # Set when the job stopped early because the emotion mix had settled
+        self.converged = False
+        self.status = QUEUED
+        self.error = ""
+        self.frames = 0
+        self.total = 0
+        self.keyframes = 0
+        self.crop_passes = 0
+        self.full_passes = 0
+        self.thumbnails = ThumbnailStore()
+        self.tracker = FaceTracker()
+        self.preview: Optional[bytes] = None
+        self.preview_index = 0
+        # (frames analyzed, percentages) sampled as the job runs
+        self.timeline: List[Tuple[int, Dict[str, float]]] = []
+        self.submitted = time.time()
+        self.finished_at: Optional[float] = None
+        self._weights = {k: 0.0 for k in EMOTION_CLASSES}
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def analyzed_ratio(self) -> float:
+        """Share of the video's frames that were decoded before the job ended."""
+        return min(1.0, self.frames / self.total) if self.total else 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def progress(self) -> float:
+        if self.status == DONE:
+            return 1.0
+        return min(1.0, self.frames / self.total) if self.total else 0.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._weights)
+
+    @property
+    def percentages(self) -> Dict[str, float]:
+        return normalize_percentages(self.weights)
+
+    @property
+    def dominant(self) -> str:
+        return dominant_emotion(self.percentages)
+
+    def detection_images(self) -> List[bytes]:
+        return self.thumbnails.images()
+
+    def people(self) -> List[Dict]:
+        """Per-face tracks (``moodmate.tracking``), most seen first."""
+        return self.tracker.people()
+
+    def run(self, model):
+        """Worker body: decode, infer and aggregate until done or cancelled."""
+        if self.cancelled:
+            self._finish(CANCELLED)
+            return
+        self.status = RUNNING
+        try:
+            log = None
+            if self.log_path:
+                log = DetectionLogWriter(self.log_path, source="video", conf=self.conf,
+                                         fps=video_fps(self.path) or 30.0)
+            try:
+                self._analyze(model, log)
+            finally:
+                if log is not None:
+                    log.close()
+            if self.cancelled:
+                self._finish(CANCELLED)
+            elif self.frames == 0:
+                self.error = "no decodable frames"
+                self._finish(FAILED)
+            else:
+                self._finish(DONE)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self._finish(FAILED)
+
+    def _analyze(self, model, log: Optional[DetectionLogWriter]):
+        throttle = Throttle(PREVIEW_INTERVAL)
+        detector = ChangeDetector(self.change_threshold)
+        classifier = FaceCropClassifier(model, self.conf) if self.face_crops else None
+        monitor = ConvergenceMonitor() if self.converge else None
+        fps = log.meta["fps"] if log is not None else 0.0
+        weights = {k: 0.0 for k in EMOTION_CLASSES}
+        for frame in analyze_video(model, self.path, self.conf, weights, detector=detector,
+                                   classifier=classifier):
+            if self.cancelled:
+                break
+            if log is not None:
+                log.write(frame.index, frame.results, frame.index / fps)
+            self.tracker.update(frame.results)
+            out = None
+            # Drawing and encoding cost the same whatever the model speed, so
+            # they are paced by the clock instead of the frame count
+            update = throttle.ready()
+            if update:
+                out = draw_detections(frame.frame_rgb, frame.results, self.conf)
+                self.preview = encode_thumbnail(out, PREVIEW_SIDE, PREVIEW_QUALITY)
+                self.preview_index = frame.index + 1
+            self.thumbnails.offer(
+                frame.index, max_confidence(frame.results),
+                lambda f=frame, o=out: o if o is not None else draw_detections(f.frame_rgb, f.results, self.conf),
+            )
+            with self._lock:
+                self._weights = dict(weights)
+                self.frames = frame.index + 1
+                self.total = frame.total
+                self.keyframes = detector.keyframes
+                if classifier is not None:
+                    self.crop_passes, self.full_passes = classifier.crop_passes, classifier.full_passes
+                if update:
+                    self._add_point(frame.index + 1, normalize_percentages(weights))
+            if monitor is not None and monitor.update(weights) and (self.total <= 0 or self.frames < self.total):
+                # Leaving the generator stops decoding the rest of the file; an
+                # unknown frame count (0) must not rule convergence out
+                self.converged = True
+                break
+
+    def _add_point(self, frames: int, percentages: Dict[str, float]):
+        if len(self.timeline) >= TIMELINE_POINTS:
+            # Keep the chart a fixed size however long the video is
+            self.timeline = self.timeline[::2]
+        self.timeline = self.timeline + [(frames, percentages)]
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class JobManager:
+    """Runs ``VideoJob`` objects on a small thread pool; one job per key."""
+
+    def __init__(self, workers: int = 1, outputs_dir: str = OUTPUTS_DIR, keep_finished: int = KEEP_FINISHED):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="moodmate-video")
+        self.outputs_dir = outputs_dir
+        self.keep_finished = keep_finished
+        self._jobs: "OrderedDict[str, VideoJob]" = OrderedDict()
+        # Cancelled or failed jobs superseded by a resubmission; their logs go once they end
+        self._replaced: List[VideoJob] = []
+        self._lock = threading.Lock()
+
+    def submit_video(self, data: bytes, model, conf: float, change_threshold: float = 0.0,
+                     face_crops: bool = False, converge: bool = False, suffix: str = ".mp4") -> VideoJob:
+        """Start analyzing ``data`` unless the same upload/settings are queued, running or done."""
+        key = job_key(data, conf=conf, change=change_threshold, crops=face_crops, converge=converge)
+        with self._lock:
+            old = self._jobs.get(key)
+            # A cancelled job may still be running until its current frame is done
+            if old is not None and old.status not in (CANCELLED, FAILED) and not old.cancelled:
+                self._jobs.move_to_end(key)
+                return old
+            if old is not None:
+                self._replaced.append(old)
+            os.makedirs(self.outputs_dir, exist_ok=True)
+            # Unique per job, so a replaced job still winding down never touches the new one's files
+            name = f"video_{key[:16]}_{uuid4().hex[:8]}"
+            path = os.path.join(self.outputs_dir, name + suffix)
+            with open(path, "wb") as f:
+                f.write(data)
+            log_path = os.path.join(self.outputs_dir, name + LOG_SUFFIX)
+            job = self._jobs[key] = VideoJob(key, path, conf, change_threshold, face_crops, converge, log_path)
+            self._evict()
+        self.executor.submit(job.run, model)
+        return job
+
+    def get(self, key: Optional[str]) -> Optional[VideoJob]:
+        if not key:
+            return None
+        with self._lock:
+            return self._jobs.get(key)
+
+    def position(self, key: str) -> int:
+        """1-based place of a queued job among those waiting for a worker; 0 once it has started."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status != QUEUED:
+                return 0
+            return 1 + sum(other.status == QUEUED and not other.cancelled and other.submitted < job.submitted
+                           for other in self._jobs.values())
+
+    def cancel(self, key: str) -> bool:
+        job = self.get(key)
+        if job is None or job.finished:
+            return False
+        job.cancel()
+        return True
+
+    def _evict(self):
+        finished = [k for k, job in self._jobs.items() if job.finished]
+        dropped = [self._jobs.pop(key) for key in finished[:max(0, len(finished) - self.keep_finished)]]
+        dropped += [job for job in self._replaced if job.finished]
+        self._replaced = [job for job in self._replaced if not job.finished]
+        for job in dropped:
+            if job.log_path:
+                try:
+                    os.remove(job.log_path)
+                except OSError:
+                    pass
+
+
+@lru_cache(maxsize=None)
+def get_job_manager() -> JobManager:
+    """Process-wide manager shared by all browser sessions."""
+    return JobManager(workers=max(1, int(os.environ.get(JOB_WORKERS_ENV, "1") or 1)))
@@ -0,0 +1,216 @@
+"""
+Per-stage latency histograms.
+
+    from moodmate.metrics import stage
+
+    with stage("predict"):
+        results = model.predict(...)
+
+Timers are off unless ``MOODMATE_METRICS=1`` is set, ``METRICS.enable()``
+is called, or a session (a browser tab with the performance panel open) has
+asked for them with ``METRICS.watch(session)`` within the last ``WATCH_TTL``
+seconds. While off, ``stage()`` hands back one shared no-op context manager,
+so instrumented code pays only a function call. While on, each stage feeds a
+fixed-bucket histogram (Prometheus-style cumulative buckets) from which
+p50/p95 are estimated; ``prometheus_text()`` renders them in the text
+exposition format.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+METRICS_ENV = "MOODMATE_METRICS"
+# Seconds a watching session keeps timers on without renewing its watch;
+# a closed tab cannot unregister, so it simply stops renewing
+WATCH_TTL = 30.0
+
+# Upper bounds in seconds; the last bucket (+Inf) catches the rest
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_NULL = nullcontext()
+
+
+class Histogram:
+    """Counts per bucket plus sum/count; quantiles interpolate inside a bucket."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated ``q`` quantile in seconds (None when empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    # Beyond the last bound there is nothing to interpolate against
+                    return lower
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Named stage histograms shared by every thread of the process."""
+
+    def __init__(self, enabled: bool = False, watch_ttl: float = WATCH_TTL, clock=time.monotonic):
+        self._enabled = enabled
+        self.watch_ttl = watch_ttl
+        self.clock = clock
+        # session -> time its watch runs out; independent of ``enable``
+        self._watchers: Dict[str, float] = {}
+        # Latest expiry among the watchers, 0 when there are none
+        self._watch_until = 0.0
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled:
+            return True
+        if not self._watch_until:
+            return False
+        if self.clock() < self._watch_until:
+            return True
+        with self._lock:
+            self._expire()
+            return bool(self._watch_until)
+
+    def enable(self, enabled: bool = True):
+        self._enabled = enabled
+
+    def watch(self, session: str, watching: bool = True):
+        """Keep timers on for ``watch_ttl`` seconds on behalf of ``session``; call again to renew."""
+        with self._lock:
+            if watching:
+                self._watchers[session] = self.clock() + self.watch_ttl
+            else:
+                self._watchers.pop(session, None)
+            self._expire()
+
+    def _expire(self):
+        now = self.clock()
+        self._watchers = {session: until for session, until in self._watchers.items() if until > now}
+        self._watch_until = max(self._watchers.values(), default=0.0)
+
+    def time(self, name: str):
+        """Context manager timing one run of stage ``name``."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, name)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def summary(self) -> List[Dict]:
+        """One row per stage: count, p50/p95/mean in milliseconds."""
+        with self._lock:
+            items = sorted(self.histograms.items())
+            return [
+                {
+                    "stage": name,
+                    "count": hist.count,
+                    "p50_ms": round(hist.quantile(0.5) * 1000.0, 3),
+                    "p95_ms": round(hist.quantile(0.95) * 1000.0, 3),
+                    "mean_ms": round(hist.mean * 1000.0, 3),
+                    "total_s": round(hist.total, 3),
+                }
+                for name, hist in items
+            ]
+
+    def prometheus_text(self, metric: str = "moodmate_stage_seconds") -> str:
+        """Histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {metric} Time spent per processing stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            for name, hist in sorted(self.histograms.items()):
+                lines += histogram_lines(metric, f'stage="{name}"', hist)
+        return "\n".join(lines) + "\n"
+
+
+def histogram_lines(metric: str, labels: str, hist: Histogram) -> List[str]:
+    """Bucket/sum/count sample lines of one labelled histogram."""
+    lines = []
+    cumulative = 0
+    for bound, n in zip(hist.bounds + (float("inf"),), hist.counts):
+        cumulative += n
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+    lines.append(f'{metric}_sum{{{labels}}} {hist.total!r}')
+    lines.append(f'{metric}_count{{{labels}}} {hist.count}')
+    return lines
+
+
+METRICS = Metrics(enabled=os.environ.get(METRICS_ENV, "").lower() in ("1", "true", "yes", "on"))
+
+
+def stage(name: str):
+    """Time a block as stage ``name`` on the process-wide registry."""
+    return METRICS.time(name)
+
+
+def observe_predict_speed(results, frames: int = 1):
+    """Record ultralytics' own preprocess/inference/postprocess split for one predict call.
+
+    ``Results.speed`` holds per-image milliseconds, so they are scaled by the
+    number of frames in the call.
+    """
+    if not METRICS.enabled or not results:
+        return
+    speed = getattr(results[0], "speed", None)
+    if not speed:
+        return
+    for part in ("preprocess", "inference", "postprocess"):
+        ms = speed.get(part)
+        if ms is not None:
+            METRICS.observe(f"predict.{part}", ms * frames / 1000.0)
@@ -0,0 +1,103 @@
+import os
+import queue
+import threading
+
+from moodmate.cascade import ENV_FAST_MODEL, CascadeModel, CascadeStats, threshold_from_env
+from moodmate.config import MODEL_PATH
+from moodmate.runtime import RuntimeConfig, apply_runtime_config, apply_threads, tuned_config
+
+_models = {}
+_lock = threading.Lock()
+
+
+def load_yolo(model_path: str = MODEL_PATH):
+    """Load a fresh YOLO model (ultralytics is imported on first use)."""
+    from ultralytics import YOLO
+    return YOLO(model_path)
+
+
+def model_loader(model_path: str = MODEL_PATH, environ=os.environ):
+    """Callable that loads one replica of the configured model.
+
+    With ``MOODMATE_FAST_MODEL`` set each replica is a ``CascadeModel``; all
+    replicas from one loader share a single ``CascadeStats``.
+    """
+    fast_path = environ.get(ENV_FAST_MODEL, "").strip()
+    if not fast_path:
+        return lambda: load_yolo(model_path)
+    threshold = threshold_from_env(environ)
+    stats = CascadeStats()
+    return lambda: CascadeModel(load_yolo(fast_path), load_yolo(model_path), threshold, stats)
+
+
+class ModelPool:
+    """A fixed number of model replicas behind one ``predict``.
+
+    Each call borrows a free replica, so up to ``size`` predictions run at
+    once and none of them share predictor state. Other attributes are read
+    from the first replica.
+    """
+
+    def __init__(self, load, size: int, replicas=()):
+        self._load = load
+        self.size = size
+        self._free = queue.Queue()
+        self._grow = threading.Lock()
+        replicas = list(replicas)[:size] or [load()]
+        self._created = len(replicas)
+        self.first = replicas[0]
+        for model in replicas:
+            self._free.put(model)
+
+    def _acquire(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        with self._grow:
+            # Replicas are created lazily, only when every existing one is busy
+            if self._created < self.size:
+                self._created += 1
+                return self._load()
+        return self._free.get()
+
+    def predict(self, *args, **kwargs):
+        model = self._acquire()
+        try:
+            return model.predict(*args, **kwargs)
+        finally:
+            self._free.put(model)
+
+    def __getattr__(self, name):
+        return getattr(self.first, name)
+
+
+def create_model(model_path: str = MODEL_PATH, config: RuntimeConfig = None, log=print):
+    """Apply the runtime settings, then load the model (a ``ModelPool`` when workers > 1)."""
+    config = config or RuntimeConfig.from_env()
+    apply_runtime_config(config)
+    load = model_loader(model_path)
+    # Replicas built while auto-tuning are kept instead of loaded again
+    replicas = []
+    if config.autotune:
+        def load_for_tuning():
+            replicas.append(load())
+            return replicas[-1]
+
+        config = tuned_config(config, load_for_tuning, model_path, log=log)
+        apply_threads(config.torch_threads)
+        log(f"runtime: {config.torch_threads} torch thread(s), {config.workers} worker(s)")
+    if config.workers and config.workers > 1:
+        return ModelPool(load, config.workers, replicas)
+    return replicas[0] if replicas else load()
+
+
+def get_model(model_path: str = MODEL_PATH):
+    """Process-wide shared model; loaded once per path."""
+    model = _models.get(model_path)
+    if model is None:
+        with _lock:
+            model = _models.get(model_path)
+            if model is None:
+                model = _models[model_path] = create_model(model_path)
+    return model
@@ -0,0 +1,201 @@
+"""
+Frame pipeline: color conversion, batched prediction, video decoding and drawing.
+
+cv2 is imported inside the functions that use it so that importing this module
+stays cheap.
+"""
+
+import time
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+
+from moodmate.admission import Overloaded
+from moodmate.aggregation import EMPTY, accumulate_emotions, as_detections
+from moodmate.config import EMOTION_CLASSES
+from moodmate.metrics import observe_predict_speed, stage
+from moodmate.sampling import ChangeDetector
+from moodmate.thumbnails import ThumbnailStore, max_confidence
+from moodmate.tracking import FaceTracker
+
+
+def bgr_to_rgb(img_bgr):
+    import cv2
+    with stage("color"):
+        return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+
+def rgb_to_bgr(img_rgb):
+    import cv2
+    with stage("color"):
+        return cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
+
+def draw_detections(image_rgb, results, conf_threshold=0.25):
+    """Draw boxes with labels on the image."""
+    import cv2
+    with stage("draw"):
+        img = image_rgb.copy()
+        det = as_detections(results)
+        for (x1, y1, x2, y2), conf, cls_id in zip(det.boxes.astype(int).tolist(), det.confs.tolist(), det.classes.tolist()):
+            if conf < conf_threshold:
+                continue
+            label = EMOTION_CLASSES[cls_id] if 0 <= cls_id < len(EMOTION_CLASSES) else "unknown"
+            cv2.rectangle(img, (x1,y1), (x2,y2), (0,255,0), 2)
+            text = f"{label} {conf:.2f}"
+            cv2.putText(img, text, (x1, max(0, y1-8)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,0,0), 3, cv2.LINE_AA)
+            cv2.putText(img, text, (x1, max(0, y1-8)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
+        return img
+
+def predict_frame(model, frame_rgb, conf: float, imgsz: int = None):
+    """Single-frame predict; returns the ``[Results]`` list the helpers expect."""
+    kwargs = {"conf": conf, "verbose": False}
+    if imgsz:
+        kwargs["imgsz"] = imgsz
+    with stage("predict"):
+        results = model.predict(frame_rgb, **kwargs)
+    observe_predict_speed(results)
+    return results
+
+def predict_batch(model, frames_rgb: Sequence, conf: float, imgsz: int = None) -> List:
+    """Run one batched predict call; returns one ``[Results]`` list per frame."""
+    if not frames_rgb:
+        return []
+    kwargs = {"conf": conf, "verbose": False}
+    if imgsz:
+        kwargs["imgsz"] = imgsz
+    with stage("predict"):
+        results = model.predict(list(frames_rgb), **kwargs)
+    observe_predict_speed(results, len(frames_rgb))
+    return [[res] for res in results]
+
+def iter_video_frames(path: str, stride: int = 1) -> Iterator[Tuple[int, object]]:
+    """Yield (frame index, RGB frame) for every ``stride``-th frame of a video."""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        index = 0
+        while True:
+            # grab() skips decoding for frames that are not sampled
+            with stage("decode"):
+                ok = cap.grab()
+                if ok and index % stride == 0:
+                    ok, frame_bgr = cap.retrieve()
+                else:
+                    frame_bgr = None
+            if not ok:
+                break
+            if frame_bgr is not None:
+                yield index, bgr_to_rgb(frame_bgr)
+            index += 1
+    finally:
+        cap.release()
+
+def video_frame_count(path: str) -> int:
+    """Frame count from the container header (0 when unknown)."""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        return max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    finally:
+        cap.release()
+
+def video_fps(path: str) -> float:
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        return cap.get(cv2.CAP_PROP_FPS) or 0.0
+    finally:
+        cap.release()
+
+
+class FrameResult(NamedTuple):
+    index: int
+    total: int
+    frame_rgb: object
+    results: object
+    # False when the detections were reused from an unchanged earlier frame
+    keyframe: bool = True
+
+
+def analyze_video(model, path: str, conf: float, weights, stride: int = 1,
+                  detector: ChangeDetector = None, classifier=None) -> Iterator[FrameResult]:
+    """Predict each sampled frame of a video, folding detections into ``weights``.
+
+    Yields a ``FrameResult`` per analyzed frame so callers can show previews
+    and progress without owning the decode/infer loop. With a ``detector``,
+    frames that barely changed reuse the last keyframe's detections; with a
+    ``classifier`` (``moodmate.crops.FaceCropClassifier``) keyframes are
+    mostly classified from face crops.
+    """
+    total = video_frame_count(path)
+    for index, frame_rgb in iter_video_frames(path, stride):
+        # The detector always reports the first frame as a keyframe
+        keyframe = detector is None or detector.is_keyframe(frame_rgb)
+        if keyframe:
+            det = _detect(model, classifier, frame_rgb, conf)
+        accumulate_emotions(det, weights)
+        yield FrameResult(index, total, frame_rgb, det, keyframe)
+
+
+def _detect(model, classifier, frame_rgb, conf: float, imgsz: int = None):
+    if classifier is not None:
+        return classifier.detect(frame_rgb)
+    return as_detections(predict_frame(model, frame_rgb, conf, imgsz))
+
+
+class StreamAnalyzer:
+    """Per-frame analysis for live streams: predict, aggregate, draw, keep samples.
+
+    Holds the running weights for one stream; the webcam transformer in the
+    app only converts between video frames and arrays around ``process``.
+    Sample frames go to a bounded ``ThumbnailStore``; an optional
+    ``classifier`` replaces the full-frame predict (see ``moodmate.crops``)
+    and an optional ``rate`` (``moodmate.ratecontrol.RateController``) skips
+    inference on some frames and picks the input size.
+    """
+
+    def __init__(self, model, conf: float, thumbnails: ThumbnailStore = None, classifier=None, log=None,
+                 rate=None):
+        self.model = model
+        self.conf = conf
+        self.classifier = classifier
+        self.rate = rate
+        self._last = EMPTY
+        self.tracker = FaceTracker()
+        # Optional ``moodmate.detlog.DetectionLogWriter``; timestamps are seconds since the first frame
+        self.log = log
+        self._started = None
+        self.weights = {k: 0.0 for k in EMOTION_CLASSES}
+        self.thumbnails = thumbnails if thumbnails is not None else ThumbnailStore()
+        self.frame_count = 0
+
+    @property
+    def detection_images(self) -> List[bytes]:
+        return self.thumbnails.images()
+
+    def process(self, frame_rgb):
+        """Analyze one RGB frame and return it with detections drawn."""
+        try:
+            if self.rate is None:
+                res = self._last = _detect(self.model, self.classifier, frame_rgb, self.conf)
+            elif self.rate.should_infer():
+                start = time.perf_counter()
+                res = self._last = _detect(self.model, self.classifier, frame_rgb, self.conf, self.rate.imgsz)
+                self.rate.record(time.perf_counter() - start)
+            else:
+                # Skipped frames stand for the last inference, like unchanged video frames
+                res = self._last
+        except Overloaded:
+            # A gated model (``moodmate.admission``) had no free slot; same as a skipped frame
+            res = self._last
+        accumulate_emotions(res, self.weights)
+        self.tracker.update(res)
+        if self.log is not None:
+            now = time.monotonic()
+            self._started = self._started or now
+            self.log.write(self.frame_count, res, now - self._started)
+        drawn = draw_detections(frame_rgb, res, self.conf)
+        self.thumbnails.offer(self.frame_count, max_confidence(res), lambda: drawn)
+        self.frame_count += 1
+        return drawn
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
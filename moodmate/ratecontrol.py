@@ -0,0 +1,120 @@
+"""
+Adaptive inference rate for live streams.
+
+A webcam delivers frames at a fixed pace whatever the model costs. When
+``predict`` is slower than the frame interval the stream stutters, so the
+controller measures inference latency (EWMA) and adapts two knobs:
+
+- frame skip: infer on every Nth frame, with N chosen so the average model
+  time per frame fits the target output frame rate; skipped frames are
+  drawn with the last detections;
+- input resolution: when a single inference is over the latency budget
+  (a visible hitch even with skipping), step down through ``sizes``;
+  step back up once latency has room again.
+
+Changes wait ``cooldown`` inferences so the EWMA settles first.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Sequence
+
+TARGET_FPS = 15.0
+# One inference over this blocks the stream visibly, whatever the skip
+LATENCY_BUDGET_MS = 120.0
+# Model input sizes to step through (multiples of the YOLO stride)
+SIZES = (640, 512, 416, 320)
+MAX_SKIP = 8
+SMOOTHING = 0.3
+COOLDOWN = 5
+# Latency under this share of the budget lets resolution step back up
+HEADROOM = 0.5
+# Seconds over which the effective rates are measured
+RATE_WINDOW = 2.0
+
+
+class RateController:
+    """Decides per frame whether to infer, and at which input size."""
+
+    def __init__(self, target_fps: float = TARGET_FPS, latency_budget_ms: float = LATENCY_BUDGET_MS,
+                 sizes: Sequence[int] = SIZES, max_skip: int = MAX_SKIP, smoothing: float = SMOOTHING,
+                 cooldown: int = COOLDOWN, clock=time.monotonic):
+        self.target_fps = target_fps
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.sizes = tuple(sizes)
+        self.max_skip = max_skip
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.clock = clock
+        self.skip = 1
+        self.level = 0
+        self.latency: Optional[float] = None
+        # Frames since the last inference; starts high so the first frame is inferred
+        self._since_infer = max_skip
+        self._since_change = 0
+        self._frames = deque()
+        self._inferences = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def imgsz(self) -> int:
+        return self.sizes[self.level]
+
+    def should_infer(self) -> bool:
+        """Call once per incoming frame."""
+        with self._lock:
+            now = self.clock()
+            self._frames.append(now)
+            self._trim(self._frames, now)
+            infer = self._since_infer + 1 >= self.skip
+            self._since_infer = 0 if infer else self._since_infer + 1
+            return infer
+
+    def record(self, seconds: float):
+        """Latency of the inference just run; adapts skip and resolution."""
+        with self._lock:
+            now = self.clock()
+            self._inferences.append(now)
+            self._trim(self._inferences, now)
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency += self.smoothing * (seconds - self.latency)
+            self._since_change += 1
+            if self._since_change < self.cooldown:
+                return
+            level = self.level
+            if self.latency > self.latency_budget and self.level < len(self.sizes) - 1:
+                level += 1
+            elif self.latency < self.latency_budget * HEADROOM and self.level > 0:
+                level -= 1
+            # Average model time per output frame must fit the frame interval
+            skip = min(self.max_skip, max(1, math.ceil(self.latency * self.target_fps)))
+            if (level, skip) != (self.level, self.skip):
+                self.level, self.skip = level, skip
+                self._since_change = 0
+
+    @staticmethod
+    def _trim(times: deque, now: float):
+        while times and now - times[0] > RATE_WINDOW:
+            times.popleft()
+
+    @staticmethod
+    def _rate(times: deque) -> float:
+        if len(times) < 2:
+            return 0.0
+        span = times[-1] - times[0]
+        return (len(times) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> Dict:
+        """Current settings and measured rates, for display."""
+        with self._lock:
+            return {
+                "analysis_fps": round(self._rate(self._inferences), 1),
+                "output_fps": round(self._rate(self._frames), 1),
+                "skip": self.skip,
+                "imgsz": self.imgsz,
+                "latency_ms": round(self.latency * 1000.0, 1) if self.latency is not None else None,
+            }
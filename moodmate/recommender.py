@@ -0,0 +1,130 @@
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from moodmate.catalog import TOP_N, Catalog, get_catalog, personalization_state
+from moodmate.config import EMOTION_CLASSES
+
+# Number of items returned per list when recommending from a distribution
+DEFAULT_K = 5
+
+
+class VectorRecommender:
+    """Ranks catalog items by cosine similarity to an emotion distribution.
+
+    Each song/read is a vector over ``EMOTION_CLASSES`` (multi-hot over the
+    emotions it is listed under, L2-normalized). Identical vectors are
+    collapsed into one row of a precomputed float32 pattern matrix that keeps
+    its member items in catalog order, so a query is one small mat-vec
+    product and an ``argpartition`` top-k whose cost does not grow with the
+    number of items.
+    """
+
+    def __init__(self, catalog: Catalog, kinds: Sequence[str] = ("song", "read")):
+        self.catalog = catalog
+        self.matrices: Dict[str, np.ndarray] = {}
+        self._members: Dict[str, np.ndarray] = {}
+        self._offsets: Dict[str, np.ndarray] = {}
+
+        for kind in kinds:
+            keys = [(k, e) for k, e in catalog.index if k == kind and e in EMOTION_CLASSES]
+            if not keys:
+                continue
+            ids = np.concatenate([catalog.index[key] for key in keys])
+            cols = np.concatenate([
+                np.full(len(catalog.index[key]), EMOTION_CLASSES.index(key[1]), dtype=np.int32) for key in keys
+            ])
+            unique_ids, rows = np.unique(ids, return_inverse=True)
+
+            vectors = np.zeros((len(unique_ids), len(EMOTION_CLASSES)), dtype=np.float32)
+            np.add.at(vectors, (rows, cols), 1.0)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+            patterns, pattern_of = np.unique(vectors, axis=0, return_inverse=True)
+            pattern_of = pattern_of.ravel()
+            counts = np.bincount(pattern_of, minlength=len(patterns))
+
+            self.matrices[kind] = patterns
+            self._members[kind] = unique_ids[np.argsort(pattern_of, kind="stable")]
+            self._offsets[kind] = np.concatenate([[0], np.cumsum(counts)])
+
+    def top_k(self, kind: str, vector: np.ndarray, k: int = DEFAULT_K) -> np.ndarray:
+        """Item IDs of the ``k`` most similar items, best first.
+
+        Ties keep catalog order, so a one-hot query returns the curated list.
+        """
+        patterns = self.matrices.get(kind)
+        if patterns is None or k <= 0:
+            return np.empty(0, dtype=np.int32)
+
+        # Every pattern has at least one item, so the best k items come from the best k patterns
+        scores = patterns @ vector
+        if k < len(scores):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+
+        members, offsets = self._members[kind], self._offsets[kind]
+        candidates = np.concatenate([members[offsets[p]:min(offsets[p + 1], offsets[p] + k)] for p in best])
+        candidate_scores = np.concatenate([
+            np.full(min(offsets[p + 1] - offsets[p], k), scores[p], dtype=np.float32) for p in best
+        ])
+        order = np.lexsort((candidates, -candidate_scores))[:k]
+        return candidates[order]
+
+    def recommend(self, percentages: Union[Dict[str, float], np.ndarray], emotion: str = None, k: int = DEFAULT_K):
+        """(songs, reads, therapy, breathing) ranked against the whole distribution.
+
+        Falls back to the per-emotion lists when the distribution is empty.
+        """
+        vector = as_vector(percentages)
+        norm = float(np.linalg.norm(vector))
+        if emotion is None:
+            emotion = EMOTION_CLASSES[int(np.argmax(vector))] if norm > 0 else "natural"
+        if norm == 0:
+            songs, reads, therapy, breathing = self.catalog.recommend(emotion)
+            return songs[:k], reads[:k], therapy, breathing
+
+        vector = vector / norm
+        resolve = self.catalog.table.resolve
+        songs = tuple(resolve(self.top_k("song", vector, k)))
+        reads = tuple(resolve(self.top_k("read", vector, k)))
+        _, _, therapy, breathing = self.catalog.recommend(emotion)
+        return songs, reads, therapy, breathing
+
+
+def as_vector(percentages: Union[Dict[str, float], np.ndarray]) -> np.ndarray:
+    """Percentages as a float32 vector ordered like ``EMOTION_CLASSES``."""
+    if isinstance(percentages, dict):
+        return np.array([percentages.get(k, 0.0) for k in EMOTION_CLASSES], dtype=np.float32)
+    return np.asarray(percentages, dtype=np.float32)
+
+
+@lru_cache(maxsize=None)
+def get_recommender(catalog: Catalog = None) -> VectorRecommender:
+    """Process-wide recommender over the loaded catalog."""
+    return VectorRecommender(catalog or get_catalog())
+
+
+
+def recommend_content(emotion: str):
+    """Curated lists for a single emotion: (songs, reads, therapy, breathing)."""
+    return get_catalog().recommend(emotion)
+
+
+def personalized_recommendations(emotion: str, insights: Optional[Dict], session_count: int,
+                                 percentages: Dict[str, float] = None):
+    """Personalized picks first, then base items.
+
+    Base items are the curated top of the emotion's list, or the closest
+    items to ``percentages`` when a detected distribution is given.
+    """
+    catalog = get_catalog()
+    state = personalization_state(emotion, insights, session_count)
+    if percentages is None:
+        return catalog.personalized(emotion, state)
+
+    extra_songs, extra_reads = catalog.personalized_picks(state)
+    songs, reads, therapy, breathing = get_recommender().recommend(percentages, emotion, k=TOP_N)
+    return extra_songs + songs, extra_reads + reads, therapy, breathing
@@ -0,0 +1,115 @@
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Tuple
+
+import numpy as np
+
+from moodmate.catalog import ITEMS, ItemTable, item_key
+from moodmate.config import EMOTION_CLASSES
+
+
+@dataclass(frozen=True)
+class SessionRecord:
+    """One saved mood session in compact form.
+
+    Percentages are a fixed-size float32 vector ordered like ``EMOTION_CLASSES``
+    and recommendations are item IDs into the shared ``ItemTable``; display
+    strings are formatted on read.
+    """
+
+    # Written out instead of ``dataclass(slots=True)``, which needs Python 3.10
+    __slots__ = ("number", "epoch", "input_mode", "dominant_emotion", "percentages",
+                 "song_ids", "read_ids", "therapy_ids", "breathing")
+
+    number: int
+    epoch: float
+    input_mode: str
+    dominant_emotion: str
+    percentages: np.ndarray
+    song_ids: Tuple[int, ...]
+    read_ids: Tuple[int, ...]
+    therapy_ids: Tuple[int, ...]
+    breathing: str
+
+    @classmethod
+    def create(cls, number: int, timestamp: datetime, input_mode: str, dominant: str,
+               percentages: Dict[str, float], recommendations, table: ItemTable = ITEMS) -> "SessionRecord":
+        """Build a record from the values produced by an analysis run."""
+        songs, reads, therapy, breathing = recommendations
+        vector = np.array([percentages.get(k, 0.0) for k in EMOTION_CLASSES], dtype=np.float32)
+        vector.flags.writeable = False
+        breathing_key = dominant if isinstance(breathing, dict) else breathing
+        return cls(
+            number=number,
+            epoch=timestamp.timestamp(),
+            input_mode=sys.intern(input_mode),
+            dominant_emotion=sys.intern(dominant),
+            percentages=vector,
+            song_ids=table.intern_many(songs),
+            read_ids=table.intern_many(reads),
+            therapy_ids=table.intern_many(therapy),
+            breathing=sys.intern(breathing_key),
+        )
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch)
+
+    @property
+    def date(self) -> str:
+        return self.timestamp.strftime('%Y-%m-%d')
+
+    @property
+    def time(self) -> str:
+        return self.timestamp.strftime('%H:%M')
+
+    @property
+    def session_id(self) -> str:
+        return f"session_{self.number}"
+
+    @property
+    def emotion_percentages(self) -> Dict[str, float]:
+        return {k: round(float(v), 2) for k, v in zip(EMOTION_CLASSES, self.percentages)}
+
+    def recommendations(self, table: ItemTable = ITEMS):
+        """Return (songs, reads, therapy, breathing emotion key) for this session."""
+        return table.resolve(self.song_ids), table.resolve(self.read_ids), table.resolve(self.therapy_ids), self.breathing
+
+    def to_dict(self, table: ItemTable = ITEMS) -> Dict:
+        """JSON-ready row; items are referenced by ``item_key`` because IDs only hold in this process.
+
+        The number is left out: it is the record's position in the history.
+        """
+        return {
+            "epoch": self.epoch,
+            "input_mode": self.input_mode,
+            "dominant_emotion": self.dominant_emotion,
+            "percentages": [round(float(v), 4) for v in self.percentages],
+            "songs": [item_key(table.get(i)) for i in self.song_ids],
+            "reads": [item_key(table.get(i)) for i in self.read_ids],
+            "therapy": [item_key(table.get(i)) for i in self.therapy_ids],
+            "breathing": self.breathing,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, number: int, table: ItemTable = ITEMS) -> "SessionRecord":
+        """Record from ``to_dict``; items not interned in ``table`` are left out."""
+        vector = np.array(data["percentages"], dtype=np.float32)
+        vector.flags.writeable = False
+        return cls(
+            number=number,
+            epoch=data["epoch"],
+            input_mode=sys.intern(data["input_mode"]),
+            dominant_emotion=sys.intern(data["dominant_emotion"]),
+            percentages=vector,
+            song_ids=_known(table, data["songs"]),
+            read_ids=_known(table, data["reads"]),
+            therapy_ids=_known(table, data["therapy"]),
+            breathing=sys.intern(data["breathing"]),
+        )
+
+
+def _known(table: ItemTable, keys) -> Tuple[int, ...]:
+    ids = (table.by_key(k) for k in keys)
+    return tuple(i for i in ids if i is not None)
@@ -0,0 +1,153 @@
+import io
+import os
+import time
+from typing import Dict, List
+
+from moodmate.config import EMOTION_CLASSES, OUTPUTS_DIR
+from moodmate.metrics import stage
+
+# Move to the start of the next line after each cell (fpdf2 >= 2.5.2)
+NEXT_LINE = {"new_x": "LMARGIN", "new_y": "NEXT"}
+
+
+def clean_text_for_pdf(text: str, max_length: int = 150) -> str:
+    """Clean text to remove Unicode characters that can't be encoded in latin-1 and truncate if too long"""
+    if not text:
+        return ""
+    # Replace common Unicode characters with ASCII equivalents
+    replacements = {
+        '–': '-',  # en dash to hyphen
+        '—': '-',  # em dash to hyphen
+        '“': '"',  # left double quotation mark
+        '”': '"',  # right double quotation mark
+        '‘': "'",  # left single quotation mark
+        '’': "'",  # right single quotation mark
+        '…': '...',  # horizontal ellipsis
+        '•': '*',  # bullet point
+    }
+
+    cleaned_text = text
+    for unicode_char, ascii_char in replacements.items():
+        cleaned_text = cleaned_text.replace(unicode_char, ascii_char)
+
+    # Drop anything else the core PDF fonts cannot encode (e.g. emoji in personalized picks)
+    cleaned_text = cleaned_text.encode("latin-1", "ignore").decode("latin-1").strip()
+
+    # Truncate if too long and add ellipsis
+    if len(cleaned_text) > max_length:
+        cleaned_text = cleaned_text[:max_length-3] + "..."
+
+    return cleaned_text
+
+def _encode_image(img) -> io.BytesIO:
+    """PNG-encode an RGB array in memory (bytes from a thumbnail store pass through)."""
+    if isinstance(img, (bytes, bytearray)):
+        return io.BytesIO(img)
+    import cv2
+    ok, buf = cv2.imencode(".png", cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+    if not ok:
+        raise ValueError("could not encode image")
+    return io.BytesIO(buf.tobytes())
+
+def _item_section(pdf, heading: str, items, reason_label: str):
+    pdf.ln(2)
+    pdf.set_font("Helvetica", "B", 13)
+    pdf.cell(0, 8, heading, **NEXT_LINE)
+    pdf.set_font("Helvetica", size=10)
+    for title, reason, link in items:
+        clean_title = clean_text_for_pdf(title, max_length=80)
+        clean_reason = clean_text_for_pdf(reason, max_length=120)
+        clean_link = clean_text_for_pdf(link, max_length=100)
+        # Split into multiple lines to avoid text overflow
+        pdf.set_font("Helvetica", "B", 10)
+        pdf.multi_cell(0, 5, f"- {clean_title}", **NEXT_LINE)
+        pdf.set_font("Helvetica", size=9)
+        pdf.multi_cell(0, 4, f"  {reason_label}{clean_reason}", **NEXT_LINE)
+        pdf.multi_cell(0, 4, f"  Link: {clean_link}", **NEXT_LINE)
+        pdf.ln(1)
+
+def _people_section(pdf, people: List[Dict]):
+    from moodmate.tracking import group_summary
+
+    group = group_summary(people)
+    pdf.ln(2)
+    pdf.set_font("Helvetica", "B", 13)
+    pdf.cell(0, 8, f"People Detected: {group['people']}", **NEXT_LINE)
+    pdf.set_font("Helvetica", size=11)
+    agree = round(group["agreement"] * group["people"])
+    pdf.cell(0, 7, f"Group mood: {group['dominant'].capitalize()} ({agree} of {group['people']} share it)",
+             **NEXT_LINE)
+    pdf.set_font("Helvetica", size=10)
+    for person in people:
+        top = sorted(person["percentages"].items(), key=lambda x: -x[1])[:3]
+        mix = ", ".join(f"{k.capitalize()} {v}%" for k, v in top if v > 0)
+        pdf.cell(0, 6, f"- {person['label']} ({person['frames']} frames): {person['dominant'].capitalize()} - {mix}",
+                 **NEXT_LINE)
+
+def build_pdf(session_info: Dict, percentages: Dict[str, float], top_emotion: str, recs,
+              detection_images: List = None, outputs_dir: str = OUTPUTS_DIR, people: List[Dict] = None) -> str:
+    """Write the session summary PDF and return its path.
+
+    ``people`` (``moodmate.tracking.FaceTracker.people``) adds a per-person
+    section when more than one face was tracked.
+    """
+    with stage("pdf"):
+        return _build_pdf(session_info, percentages, top_emotion, recs, detection_images, outputs_dir, people)
+
+def _build_pdf(session_info, percentages, top_emotion, recs, detection_images, outputs_dir, people=None) -> str:
+    from fpdf import FPDF
+    songs, reads, therapy = recs
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    # Title
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 10, "AI MoodMate - Session Summary", **NEXT_LINE)
+
+    pdf.set_font("Helvetica", size=11)
+    pdf.cell(0, 8, f"Date/Time: {session_info['timestamp']}", **NEXT_LINE)
+    pdf.cell(0, 8, f"Input Mode: {session_info['input_mode']}", **NEXT_LINE)
+    pdf.ln(4)
+
+    # Detection Images
+    if detection_images and len(detection_images) > 0:
+        pdf.set_font("Helvetica", "B", 13)
+        pdf.cell(0, 8, "Detection Images:", **NEXT_LINE)
+        pdf.set_font("Helvetica", size=10)
+
+        for i, img in enumerate(detection_images[:3]):  # Show max 3 images
+            try:
+                pdf.image(_encode_image(img), w=80, h=60)
+                pdf.cell(0, 5, f"Detection Image {i+1}", **NEXT_LINE)
+                pdf.ln(2)
+            except Exception:
+                pdf.cell(0, 5, f"Image {i+1}: Error loading image", **NEXT_LINE)
+
+        pdf.ln(4)
+
+    # Percentages
+    pdf.set_font("Helvetica", "B", 13)
+    pdf.cell(0, 8, "Average Emotion Percentages:", **NEXT_LINE)
+    pdf.set_font("Helvetica", size=11)
+    for k in EMOTION_CLASSES:
+        pdf.cell(0, 7, f"- {k.capitalize()}: {percentages.get(k, 0.0)}%", **NEXT_LINE)
+
+    pdf.ln(4)
+    pdf.set_font("Helvetica", "B", 13)
+    pdf.cell(0, 8, f"Dominant Emotion: {top_emotion.capitalize()}", **NEXT_LINE)
+
+    if people and len(people) > 1:
+        _people_section(pdf, people)
+
+    pdf.ln(2)
+    _item_section(pdf, "Recommended Songs:", songs, "Reason: ")
+    _item_section(pdf, "Reading & Mindfulness:", reads, "Why: ")
+    _item_section(pdf, "Support & Counseling Resources:", therapy, "")
+
+    # Save
+    os.makedirs(outputs_dir, exist_ok=True)
+    filename = f"moodmate_summary_{int(time.time())}.pdf"
+    pdf_path = os.path.join(outputs_dir, filename)
+    pdf.output(pdf_path)
+    return pdf_path
@@ -0,0 +1,191 @@
+"""
+CPU thread, worker and affinity settings for inference.
+
+Read from the environment when the model is first created
+(``moodmate.model.get_model``):
+
+    MOODMATE_TORCH_THREADS   PyTorch intra-op threads per predict call
+    MOODMATE_CV2_THREADS     OpenCV worker threads (0 = OpenCV runs single-threaded)
+    MOODMATE_WORKERS         model replicas that may predict at the same time
+    MOODMATE_CPU_AFFINITY    CPUs the process may run on, e.g. "0-3,8"
+    MOODMATE_AUTOTUNE        "1": measure a few thread/worker combinations once per
+                             host and reuse the winner; "force": measure again
+
+Unset variables leave the library defaults alone, so nothing changes until a
+deployment opts in. Threads x workers should stay at or below the CPUs the
+process may use; otherwise concurrent sessions oversubscribe the machine.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from moodmate.config import OUTPUTS_DIR
+
+ENV_TORCH_THREADS = "MOODMATE_TORCH_THREADS"
+ENV_CV2_THREADS = "MOODMATE_CV2_THREADS"
+ENV_WORKERS = "MOODMATE_WORKERS"
+ENV_AFFINITY = "MOODMATE_CPU_AFFINITY"
+ENV_AUTOTUNE = "MOODMATE_AUTOTUNE"
+
+TUNING_FILE = os.path.join(OUTPUTS_DIR, "runtime_tuning.json")
+# Predict calls per worker when measuring one combination
+TUNE_FRAMES = 6
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    torch_threads: Optional[int] = None
+    cv2_threads: Optional[int] = None
+    workers: Optional[int] = None
+    affinity: Optional[Tuple[int, ...]] = None
+    autotune: str = ""
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "RuntimeConfig":
+        def number(name: str) -> Optional[int]:
+            value = environ.get(name, "").strip()
+            if not value:
+                return None
+            try:
+                return max(0, int(value))
+            except ValueError:
+                raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+        affinity = environ.get(ENV_AFFINITY, "").strip()
+        autotune = environ.get(ENV_AUTOTUNE, "").strip().lower()
+        return cls(
+            torch_threads=number(ENV_TORCH_THREADS) or None,
+            cv2_threads=number(ENV_CV2_THREADS),
+            workers=number(ENV_WORKERS) or None,
+            affinity=parse_cpu_list(affinity) if affinity else None,
+            autotune="" if autotune in ("", "0", "false", "no", "off") else autotune,
+        )
+
+
+def parse_cpu_list(text: str) -> Tuple[int, ...]:
+    """"0-3,8" -> (0, 1, 2, 3, 8), the same syntax as taskset/cpuset."""
+    cpus = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = (int(x) for x in part.split("-", 1))
+                cpus.update(range(start, end + 1))
+            else:
+                cpus.add(int(part))
+        except ValueError:
+            raise ValueError(f"invalid CPU list {text!r}") from None
+    if not cpus:
+        raise ValueError(f"invalid CPU list {text!r}")
+    return tuple(sorted(cpus))
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity masks)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def apply_threads(torch_threads: Optional[int] = None, cv2_threads: Optional[int] = None):
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    if cv2_threads is not None:
+        import cv2
+        cv2.setNumThreads(cv2_threads)
+
+
+def apply_runtime_config(config: RuntimeConfig):
+    """Pin the process and size the thread pools; unset fields are left alone."""
+    if config.affinity and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, config.affinity)
+    apply_threads(config.torch_threads, config.cv2_threads)
+
+
+def candidate_settings(cpus: int) -> List[Tuple[int, int]]:
+    """(torch threads, workers) pairs that use at most ``cpus`` cores in total."""
+    threads = sorted({1, 2, max(1, cpus // 2), cpus})
+    pairs = set()
+    for t in threads:
+        for w in sorted({1, 2, max(1, cpus // t)}):
+            if t * w <= cpus:
+                pairs.add((t, w))
+    return sorted(pairs)
+
+
+def measure_throughput(models: Sequence, torch_threads: int, frame: np.ndarray,
+                       frames_per_worker: int = TUNE_FRAMES) -> float:
+    """Frames per second with one thread per model replica predicting concurrently."""
+    apply_threads(torch_threads)
+    for model in models:
+        # First call builds the predictor; keep it out of the timing
+        model.predict(frame, verbose=False)
+
+    def work(model):
+        for _ in range(frames_per_worker):
+            model.predict(frame, verbose=False)
+
+    threads = [threading.Thread(target=work, args=(m,)) for m in models]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(models) * frames_per_worker / (time.perf_counter() - start)
+
+
+def autotune(load: Callable[[], object], cpus: int = None, frame: np.ndarray = None,
+             log=print) -> Dict:
+    """Measure each candidate setting on this host and return the fastest.
+
+    ``load`` creates one model replica; replicas are reused across candidates.
+    """
+    cpus = cpus or available_cpus()
+    if frame is None:
+        frame = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    replicas: List = []
+    best = None
+    for torch_threads, workers in candidate_settings(cpus):
+        while len(replicas) < workers:
+            replicas.append(load())
+        fps = measure_throughput(replicas[:workers], torch_threads, frame)
+        log(f"autotune: {torch_threads} thread(s) x {workers} worker(s): {fps:.2f} frames/s")
+        if best is None or fps > best["frames_per_s"]:
+            best = {"torch_threads": torch_threads, "workers": workers, "frames_per_s": round(fps, 3)}
+    best["cpus"] = cpus
+    return best
+
+
+def tuned_config(config: RuntimeConfig, load: Callable[[], object], model_path: str,
+                 path: str = TUNING_FILE, log=print) -> RuntimeConfig:
+    """Fill threads/workers from a cached or fresh auto-tune; explicit settings win."""
+    cpus = available_cpus()
+    key = {"cpus": cpus, "model": os.path.abspath(model_path)}
+    result = None
+    if config.autotune != "force" and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if all(cached.get(k) == v for k, v in key.items()):
+                result = cached
+        except (OSError, ValueError):
+            result = None
+    if result is None:
+        result = dict(autotune(load, cpus, log=log), **key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return replace(
+        config,
+        torch_threads=config.torch_threads or result["torch_threads"],
+        workers=config.workers or result["workers"],
+    )
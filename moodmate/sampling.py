@@ -0,0 +1,106 @@
+"""
+Change detection for video frames: only run the model when the scene moved.
+
+Each frame gets a cheap signature (a strided, area-downsampled 32x32 grayscale
+thumbnail). A frame whose mean absolute difference from the last *keyframe*
+stays under ``threshold`` reuses that keyframe's detections instead of getting
+its own predict call, and those detections are counted once per frame they
+stand for, so the emotion percentages keep their per-frame weighting.
+Comparing against the keyframe (not the previous frame) keeps slow drifts from
+slipping through, and ``max_skip`` forces a fresh prediction now and then.
+"""
+
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from moodmate.metrics import stage
+
+# Mean absolute difference on 0-255 grayscale; 0 disables skipping
+DEFAULT_THRESHOLD = 3.0
+SIGNATURE_SIZE = 32
+# Longest run of frames served from one keyframe
+MAX_SKIP = 30
+
+
+def frame_signature(frame_rgb: np.ndarray, size: int = SIGNATURE_SIZE) -> np.ndarray:
+    """Small grayscale thumbnail used to compare frames."""
+    import cv2
+    height, width = frame_rgb.shape[:2]
+    # Strided pick first so INTER_AREA only averages a few pixels per cell
+    step = max(1, min(height, width) // (size * 4))
+    small = cv2.resize(frame_rgb[::step, ::step], (size, size), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY).astype(np.int16)
+
+
+class ChangeDetector:
+    """Decides per frame whether it differs enough from the last keyframe to need inference."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, max_skip: int = MAX_SKIP,
+                 size: int = SIGNATURE_SIZE):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.size = size
+        self._reference: Optional[np.ndarray] = None
+        self._skipped = 0
+        self.frames = 0
+        self.keyframes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def is_keyframe(self, frame_rgb: np.ndarray) -> bool:
+        self.frames += 1
+        if self.enabled:
+            with stage("signature"):
+                signature = frame_signature(frame_rgb, self.size)
+                changed = (
+                    self._reference is None
+                    or self._skipped >= self.max_skip
+                    or float(np.abs(signature - self._reference).mean()) > self.threshold
+                )
+            if not changed:
+                self._skipped += 1
+                return False
+            self._reference = signature
+        self._skipped = 0
+        self.keyframes += 1
+        return True
+
+    @property
+    def skipped_ratio(self) -> float:
+        return 1.0 - self.keyframes / self.frames if self.frames else 0.0
+
+
+class Keyframe(NamedTuple):
+    index: int
+    frame_rgb: np.ndarray
+    # Number of sampled frames this keyframe's detections stand for (itself included)
+    weight: int = 1
+
+
+def keyframe_batches(frames: Iterable[Tuple[int, np.ndarray]], batch: int,
+                     detector: ChangeDetector = None) -> Iterator[List[Keyframe]]:
+    """Group (index, frame) pairs into predict batches of keyframes.
+
+    Frames that did not change are folded into the weight of the keyframe
+    before them. A batch is only released once the next keyframe (or the end
+    of the stream) shows its last weight is final.
+    """
+    detector = detector or ChangeDetector(threshold=0)
+    pending: List[Keyframe] = []
+    for index, frame_rgb in frames:
+        if pending and not detector.is_keyframe(frame_rgb):
+            last = pending[-1]
+            pending[-1] = last._replace(weight=last.weight + 1)
+            continue
+        if not pending:
+            # First frame of the stream is always a keyframe
+            detector.is_keyframe(frame_rgb)
+        elif len(pending) >= batch:
+            yield pending
+            pending = []
+        pending.append(Keyframe(index, frame_rgb))
+    if pending:
+        yield pending
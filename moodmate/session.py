@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from moodmate.history import HistoryFrame
+from moodmate.insights import MoodInsights
+from moodmate.records import SessionRecord
+
+# Number of distinct recent dominant emotions remembered as preferences
+MAX_FAVORITES = 10
+
+
+class MoodTracker:
+    """One user's mood history plus the aggregates derived from it.
+
+    The Streamlit app keeps one tracker per user in a shared state backend
+    (``moodmate.state``); nothing here touches the UI, so the same object can
+    back the batch CLI or the API.
+    """
+
+    def __init__(self):
+        self.history: List[SessionRecord] = []
+        self.insights = MoodInsights()
+        self.frame = HistoryFrame()
+        self.preferences = {
+            'favorite_genres': [],
+            'preferred_activities': [],
+            'wellness_goals': [],
+            'session_count': 0
+        }
+
+    @property
+    def session_count(self) -> int:
+        return self.preferences['session_count']
+
+    def save_session(self, emotion_data: Dict, recommendations, input_mode: str,
+                     timestamp: Optional[datetime] = None) -> SessionRecord:
+        """Save current mood session to history"""
+        record = SessionRecord.create(
+            number=len(self.history) + 1,
+            timestamp=timestamp or datetime.now(),
+            input_mode=input_mode,
+            dominant=emotion_data.get('dominant', 'unknown'),
+            percentages=emotion_data.get('percentages', {}),
+            recommendations=recommendations,
+        )
+        return self.add_record(record)
+
+    def add_record(self, record: SessionRecord) -> SessionRecord:
+        """Append an already built record (e.g. one read back from ``moodmate.state``)"""
+        self.history.append(record)
+        self.insights.record(record.dominant_emotion, record.input_mode, record.timestamp, record)
+        self.frame.append_record(record)
+        self.preferences['session_count'] += 1
+
+        # Update user preferences based on interactions
+        self.update_preferences(record)
+        return record
+
+    def copy(self) -> "MoodTracker":
+        """Tracker that can take more sessions without changing this one (records are immutable)."""
+        other = MoodTracker.__new__(MoodTracker)
+        other.history = list(self.history)
+        other.insights = self.insights.copy()
+        other.frame = self.frame.copy()
+        other.preferences = {k: list(v) if isinstance(v, list) else v for k, v in self.preferences.items()}
+        return other
+
+    def update_preferences(self, record: SessionRecord):
+        """Track favorite emotions (for personalized recommendations)"""
+        favorites = self.preferences['favorite_genres']
+        if record.dominant_emotion not in favorites:
+            favorites.append(record.dominant_emotion)
+
+        # Keep only last 10 preferences to avoid clutter
+        if len(favorites) > MAX_FAVORITES:
+            self.preferences['favorite_genres'] = favorites[-MAX_FAVORITES:]
+
+    def mood_insights(self) -> Optional[Dict]:
+        """Dashboard summary, or None before the first session"""
+        return self.insights.as_dict()
+
+    def clear(self):
+        """Forget the history; other preferences are kept"""
+        self.history = []
+        self.insights.reset()
+        self.frame.clear()
+        self.preferences['session_count'] = 0
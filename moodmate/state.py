@@ -0,0 +1,528 @@
+"""
+Per-user state outside the Streamlit process, so any app replica can serve any user.
+
+``st.session_state`` lives in one process and is lost when a browser
+reconnects to another replica behind a load balancer. Each user's mood
+history is therefore kept in a shared backend as an append-only log of
+small events, one row per saved session (plus a marker when the history is
+cleared). A row references its recommendations by ``item_key`` (a content
+hash); each item is written once, under its own key, by the first save that
+uses it. The tracker (history, insights, preferences) is built by
+replaying the log once; after that only new events are applied, to a copy.
+A clear event carries the preferences it keeps, and its position is stored
+so a cold replay starts there; the cleared rows are blanked out.
+
+Saving is a single atomic append (an ``INSERT`` in SQLite, ``RPUSH`` in
+redis, a locked append to a file). Replicas saving at the same moment
+therefore both land in the log, in some order, without read-modify-write
+races. Nothing in memory changes until the append has succeeded.
+
+    MOODMATE_STATE       sqlite:///path/state.db   (default: outputs/moodmate_state.db)
+                         file:///path/dir          one file per key
+                         memory://                 in-process stand-in (tests, single replica)
+                         redis://host:6379/0       needs the ``redis`` package
+    MOODMATE_STATE_TTL   seconds a cached read is trusted (default 2)
+
+The user is identified by a random ID signed with a server secret
+(``sign_user``), so IDs cannot be guessed or forged and rotating the secret
+invalidates every issued token. The token is a bearer credential for that
+user's mood history: the app keeps it in a cookie, never in the page URL,
+and anyone holding it can read and add to the history.
+
+    MOODMATE_SECRET      key that signs user tokens; set the same value on every replica
+                         (default: a random key kept in outputs/moodmate_secret)
+
+A backend implements ``get``/``add`` (set if absent) on single values and
+``append``/``range`` on logs. ``CachedBackend`` puts a read-through cache in
+front of the logs, so the many reruns of one page view make no round trip.
+After the TTL only the entries past the cached ones are fetched.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from moodmate.catalog import ITEMS, ItemTable, item_key
+from moodmate.config import OUTPUTS_DIR
+from moodmate.records import SessionRecord
+from moodmate.session import MoodTracker
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND writes of one line are still not interleaved locally
+    fcntl = None
+
+STATE_ENV = "MOODMATE_STATE"
+TTL_ENV = "MOODMATE_STATE_TTL"
+DEFAULT_URL = "sqlite:///" + os.path.join(OUTPUTS_DIR, "moodmate_state.db")
+DEFAULT_TTL = 2.0
+# Logs (and decoded trackers) kept by one replica's caches
+CACHE_SIZE = 1024
+USER_PREFIX = "moodmate:user:"
+ITEM_PREFIX = "moodmate:item:"
+# Position of the user's last clear event, where a replay can start
+CLEARED_PREFIX = "moodmate:cleared:"
+# User IDs end up in keys and cookies
+USER_ID = re.compile(r"[A-Za-z0-9_-]{8,64}")
+SECRET_ENV = "MOODMATE_SECRET"
+SECRET_PATH = os.path.join(OUTPUTS_DIR, "moodmate_secret")
+USER_COOKIE = "moodmate_user"
+# Seconds the browser keeps the user cookie
+COOKIE_MAX_AGE = 365 * 24 * 3600
+
+
+class MemoryBackend:
+    """The in-process key-value stand-in."""
+
+    def __init__(self):
+        self._values = {}
+        self._logs = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._values.get(key)
+
+    def add(self, key: str, value: bytes) -> bool:
+        with self._lock:
+            if key in self._values:
+                return False
+            self._values[key] = bytes(value)
+            return True
+
+    def set(self, key: str, value: bytes):
+        with self._lock:
+            self._values[key] = bytes(value)
+
+    def append(self, key: str, value: bytes) -> int:
+        with self._lock:
+            log = self._logs.setdefault(key, [])
+            log.append(bytes(value))
+            return len(log) - 1
+
+    def range(self, key: str, start: int = 0) -> List[bytes]:
+        with self._lock:
+            return self._logs.get(key, [])[start:]
+
+    def erase(self, key: str, end: int):
+        with self._lock:
+            log = self._logs.get(key, [])
+            log[:end] = [b""] * len(log[:end])
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+            self._logs.pop(key, None)
+
+
+class SQLiteBackend:
+    """Two tables in a local SQLite file; replicas on the same host (or volume) share it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # sqlite3 connections must stay on the thread that made them
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS log (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                       "key TEXT NOT NULL, value BLOB NOT NULL, created REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS log_key ON log (key, seq)")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10)
+            # Readers do not block the writer of another replica
+            db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def add(self, key: str, value: bytes) -> bool:
+        with self._connect() as db:
+            return db.execute("INSERT OR IGNORE INTO kv (key, value) VALUES (?, ?)", (key, value)).rowcount == 1
+
+    def set(self, key: str, value: bytes):
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, value))
+
+    def append(self, key: str, value: bytes) -> int:
+        with self._connect() as db:
+            seq = db.execute("INSERT INTO log (key, value, created) VALUES (?, ?, ?)",
+                             (key, value, time.time())).lastrowid
+            # Still inside the write transaction, so no other row can land before this one
+            return db.execute("SELECT COUNT(*) FROM log WHERE key = ? AND seq < ?", (key, seq)).fetchone()[0]
+
+    def range(self, key: str, start: int = 0) -> List[bytes]:
+        rows = self._connect().execute("SELECT value FROM log WHERE key = ? ORDER BY seq LIMIT -1 OFFSET ?",
+                                       (key, start)).fetchall()
+        return [bytes(row[0]) for row in rows]
+
+    def erase(self, key: str, end: int):
+        with self._connect() as db:
+            db.execute("UPDATE log SET value = x'' WHERE seq IN "
+                       "(SELECT seq FROM log WHERE key = ? ORDER BY seq LIMIT ?)", (key, end))
+
+    def delete(self, key: str):
+        with self._connect() as db:
+            db.execute("DELETE FROM kv WHERE key = ?", (key,))
+            db.execute("DELETE FROM log WHERE key = ?", (key,))
+
+
+class FileBackend:
+    """Files in a directory: values are created once by a hard link, logs are locked line appends."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest()[:32] + suffix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key, ".val"), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def add(self, key: str, value: bytes) -> bool:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        try:
+            # Fails if the key exists, so the first writer wins and readers never see half a value
+            os.link(tmp, self._path(key, ".val"))
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp)
+
+    def set(self, key: str, value: bytes):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        os.replace(tmp, self._path(key, ".val"))
+
+    def append(self, key: str, value: bytes) -> int:
+        if b"\n" in value:
+            raise ValueError("log entries must not contain newlines")
+        with open(self._path(key, ".log"), "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            position = f.read().count(b"\n")
+            f.write(value + b"\n")
+        return position
+
+    def range(self, key: str, start: int = 0) -> List[bytes]:
+        try:
+            with open(self._path(key, ".log"), "rb") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_SH)
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return []
+        # The last element is the empty remainder after the final newline
+        return lines[start:-1]
+
+    def erase(self, key: str, end: int):
+        try:
+            f = open(self._path(key, ".log"), "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            lines = f.read().split(b"\n")
+            lines[:min(end, len(lines) - 1)] = [b""] * min(end, len(lines) - 1)
+            f.seek(0)
+            f.write(b"\n".join(lines))
+            f.truncate()
+
+    def delete(self, key: str):
+        for suffix in (".val", ".log"):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+
+class RedisBackend:
+    """Values are plain keys (``SET``/``SET NX``), logs are lists (``RPUSH``/``LRANGE``)."""
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def add(self, key: str, value: bytes) -> bool:
+        return bool(self.client.set(key, value, nx=True))
+
+    def set(self, key: str, value: bytes):
+        self.client.set(key, value)
+
+    def append(self, key: str, value: bytes) -> int:
+        return self.client.rpush(key, value) - 1
+
+    def range(self, key: str, start: int = 0) -> List[bytes]:
+        return self.client.lrange(key, start, -1)
+
+    def erase(self, key: str, end: int):
+        # LTRIM would shift every position, so entries are blanked in place instead
+        pipe = self.client.pipeline()
+        for i in range(end):
+            pipe.lset(key, i, b"")
+        pipe.execute()
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+
+class CachedBackend:
+    """Read-through cache of logs in front of a backend; reads younger than ``ttl`` make no round trip.
+
+    Logs are append-only, so a stale cache is refreshed by fetching only
+    the entries past the cached ones. Entries before the latest ``start``
+    asked for are dropped: readers only move forward through a log.
+    """
+
+    def __init__(self, backend, ttl: float = DEFAULT_TTL, size: int = CACHE_SIZE, clock=time.monotonic):
+        self.backend = backend
+        self.ttl = ttl
+        self.size = size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        # key -> (position of the first cached entry, entries, fetched at)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.backend.get(key)
+
+    def add(self, key: str, value: bytes) -> bool:
+        return self.backend.add(key, value)
+
+    def set(self, key: str, value: bytes):
+        self.backend.set(key, value)
+
+    def range(self, key: str, start: int = 0) -> List[bytes]:
+        """Entries from position ``start`` on; cached if younger than ``ttl``."""
+        with self._lock:
+            offset, entries, fetched = self._cache.get(key, (start, (), None))
+            if offset > start:
+                offset, entries, fetched = start, (), None
+            entries = entries[start - offset:]
+            if fetched is not None and self.clock() - fetched < self.ttl:
+                self._cache[key] = (start, entries, fetched)
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(entries)
+        entries += tuple(self.backend.range(key, start + len(entries)))
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = (start, entries, self.clock())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+        return list(entries)
+
+    def append(self, key: str, value: bytes) -> int:
+        position = self.backend.append(key, value)
+        self._stale(key)
+        return position
+
+    def erase(self, key: str, end: int):
+        self.backend.erase(key, end)
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def _stale(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                # Other replicas may have appended too, so the next read fetches the tail
+                self._cache[key] = (entry[0], entry[1], None)
+
+
+def backend_from_url(url: str):
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        return SQLiteBackend(parsed.netloc + parsed.path)
+    if parsed.scheme == "file":
+        return FileBackend(parsed.netloc + parsed.path)
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisBackend(url)
+    raise ValueError(f"{STATE_ENV} must be a sqlite://, file://, memory:// or redis:// URL, got {url!r}")
+
+
+def new_user_id() -> str:
+    return os.urandom(16).hex()
+
+
+def valid_user_id(user: Optional[str]) -> bool:
+    return bool(user) and USER_ID.fullmatch(user) is not None
+
+
+@lru_cache(maxsize=None)
+def server_secret() -> bytes:
+    """``MOODMATE_SECRET``, or a random key created once next to the default state file."""
+    secret = os.environ.get(SECRET_ENV, "").strip()
+    if secret:
+        return secret.encode()
+    directory = os.path.dirname(SECRET_PATH)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(32).hex().encode())
+    try:
+        # The first replica to start wins; the others read its key
+        os.link(tmp, SECRET_PATH)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+    with open(SECRET_PATH, "rb") as f:
+        return f.read()
+
+
+def sign_user(user: str, secret: Optional[bytes] = None) -> str:
+    """Token ``<user>.<signature>`` handed to the browser."""
+    signature = hmac.new(secret or server_secret(), user.encode(), hashlib.sha256).hexdigest()[:32]
+    return f"{user}.{signature}"
+
+
+def user_from_token(token: Optional[str], secret: Optional[bytes] = None) -> Optional[str]:
+    """The user ID a token was signed for; None for a missing, malformed or forged token."""
+    if not isinstance(token, str):
+        return None
+    user, _, _ = token.rpartition(".")
+    if not valid_user_id(user) or not hmac.compare_digest(sign_user(user, secret), token):
+        return None
+    return user
+
+
+def _encode(event: Dict) -> bytes:
+    return json.dumps(event, separators=(",", ":")).encode()
+
+
+class UserStore:
+    """``MoodTracker`` per user ID, kept as an event log on a (cached) backend."""
+
+    def __init__(self, backend: CachedBackend, table: ItemTable = ITEMS):
+        self.backend = backend
+        self.table = table
+        # Item keys known to be in the backend already
+        self._stored = set()
+        # user -> (log length, tracker built from it); trackers are never changed once built
+        self._trackers: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, user: str) -> MoodTracker:
+        """The user's tracker; an empty one for a new user.
+
+        Only events past the cached tracker's are read and applied, to a copy,
+        so the cost of a load follows what changed rather than the history
+        length. A cold load starts at the last ``clear``.
+        """
+        with self._lock:
+            entry = self._trackers.get(user)
+        if entry is None:
+            length = int(self.backend.get(CLEARED_PREFIX + user) or 0)
+            tracker = MoodTracker()
+        else:
+            length, tracker = entry
+        events = self.backend.range(USER_PREFIX + user, length)
+        if events:
+            tracker = self._apply(tracker.copy() if entry is not None else tracker, events)
+        with self._lock:
+            current = self._trackers.get(user)
+            # A concurrent load may already have cached a longer log
+            if current is None or current[0] <= length + len(events):
+                self._trackers[user] = (length + len(events), tracker)
+            self._trackers.move_to_end(user)
+            while len(self._trackers) > self.backend.size:
+                self._trackers.popitem(last=False)
+        return tracker
+
+    def save_session(self, user: str, emotion_data: Dict, recommendations, input_mode: str,
+                     timestamp: Optional[datetime] = None):
+        """Append one session (``MoodTracker.save_session`` arguments) to the user's log."""
+        record = SessionRecord.create(
+            number=0,
+            timestamp=timestamp or datetime.now(),
+            input_mode=input_mode,
+            dominant=emotion_data.get('dominant', 'unknown'),
+            percentages=emotion_data.get('percentages', {}),
+            recommendations=recommendations,
+            table=self.table,
+        )
+        for item_id in record.song_ids + record.read_ids + record.therapy_ids:
+            item = self.table.get(item_id)
+            key = item_key(item)
+            if key not in self._stored:
+                self.backend.add(ITEM_PREFIX + key, _encode(list(item)))
+                self._stored.add(key)
+        self.backend.append(USER_PREFIX + user, _encode({"event": "session", **record.to_dict(self.table)}))
+
+    def clear(self, user: str):
+        """Forget the user's history (``MoodTracker.clear``); the cleared rows are blanked out.
+
+        The clear event carries the preferences a clear keeps, so a later
+        replay can start from it instead of from the beginning of the log.
+        """
+        favorites = self.load(user).preferences['favorite_genres']
+        key = USER_PREFIX + user
+        position = self.backend.append(key, _encode({"event": "clear", "favorites": favorites}))
+        self.backend.set(CLEARED_PREFIX + user, str(position).encode())
+        self.backend.erase(key, position)
+
+    def _apply(self, tracker: MoodTracker, events: List[bytes]) -> MoodTracker:
+        for raw in events:
+            if not raw:
+                # Blanked by a later clear
+                continue
+            event = json.loads(raw)
+            if event["event"] == "clear":
+                tracker.clear()
+                if "favorites" in event:
+                    tracker.preferences['favorite_genres'] = list(event["favorites"])
+                continue
+            for key in event["songs"] + event["reads"] + event["therapy"]:
+                if self.table.by_key(key) is None:
+                    item = self.backend.get(ITEM_PREFIX + key)
+                    if item is not None:
+                        self.table.intern(tuple(json.loads(item)))
+                        self._stored.add(key)
+            tracker.add_record(SessionRecord.from_dict(event, len(tracker.history) + 1, self.table))
+        return tracker
+
+
+@lru_cache(maxsize=None)
+def get_user_store() -> UserStore:
+    """Process-wide store configured from the environment."""
+    url = os.environ.get(STATE_ENV, "").strip() or DEFAULT_URL
+    ttl = float(os.environ.get(TTL_ENV) or DEFAULT_TTL)
+    return UserStore(CachedBackend(backend_from_url(url), ttl))
@@ -0,0 +1,121 @@
+"""
+Bounded store of sample detection frames as downscaled JPEGs.
+
+Video and webcam sessions offer every analyzed frame; the store keeps at most
+``capacity`` of them, so memory per session is constant no matter how long the
+stream runs. Which frames survive depends on the policy:
+
+- ``confidence``: the frames with the most confident detection
+- ``reservoir``: a uniform random sample of the whole stream (Algorithm R)
+
+Frames are only drawn, resized and encoded once they are admitted.
+"""
+
+import heapq
+import random
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from moodmate.aggregation import as_detections
+
+POLICIES = ("confidence", "reservoir")
+CAPACITY = 5
+MAX_SIDE = 320
+JPEG_QUALITY = 80
+
+
+class Thumbnail(NamedTuple):
+    index: int
+    score: float
+    jpeg: bytes
+
+
+def max_confidence(results) -> float:
+    """Score of a frame for the confidence policy (0 when nothing was detected)."""
+    det = as_detections(results)
+    return float(det.confs.max()) if len(det) else 0.0
+
+
+def encode_thumbnail(image_rgb: np.ndarray, max_side: int = MAX_SIDE, quality: int = JPEG_QUALITY) -> bytes:
+    """Downscale so the longer side is at most ``max_side`` and JPEG-encode."""
+    import cv2
+    height, width = image_rgb.shape[:2]
+    scale = max_side / max(height, width)
+    if scale < 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image_rgb = cv2.resize(image_rgb, size, interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR),
+                           [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("could not encode thumbnail")
+    return buf.tobytes()
+
+
+class ThumbnailStore:
+    """Keeps ``capacity`` representative frames of a stream; safe to share across threads."""
+
+    def __init__(self, capacity: int = CAPACITY, policy: str = "confidence", max_side: int = MAX_SIDE,
+                 quality: int = JPEG_QUALITY, seed: Optional[int] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown thumbnail policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.capacity = capacity
+        self.policy = policy
+        self.max_side = max_side
+        self.quality = quality
+        self.seen = 0
+        # confidence: min-heap of (score, -index, Thumbnail); reservoir: plain slots
+        self._items: List = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def offer(self, index: int, score: float, render: Callable[[], np.ndarray]) -> bool:
+        """Consider frame ``index``; ``render()`` produces the image only if it is kept."""
+        with self._lock:
+            self.seen += 1
+            slot = self._admit(score)
+        if slot is None:
+            return False
+        thumb = Thumbnail(index, score, encode_thumbnail(render(), self.max_side, self.quality))
+        with self._lock:
+            self._store(slot, thumb)
+        return True
+
+    def _admit(self, score: float):
+        if len(self._items) < self.capacity:
+            return "append"
+        if self.policy == "confidence":
+            # Ties keep the earlier frame
+            return "replace" if score > self._items[0][0] else None
+        j = self._rng.randrange(self.seen)
+        return j if j < self.capacity else None
+
+    def _store(self, slot, thumb: Thumbnail):
+        if self.policy == "confidence":
+            entry = (thumb.score, -thumb.index, thumb)
+            if len(self._items) < self.capacity:
+                heapq.heappush(self._items, entry)
+            elif thumb.score > self._items[0][0]:
+                heapq.heapreplace(self._items, entry)
+        elif slot == "append" and len(self._items) < self.capacity:
+            self._items.append(thumb)
+        elif isinstance(slot, int):
+            self._items[slot] = thumb
+
+    def thumbnails(self) -> List[Thumbnail]:
+        """Kept frames in stream order."""
+        with self._lock:
+            items = [entry[2] for entry in self._items] if self.policy == "confidence" else list(self._items)
+        return sorted(items, key=lambda t: t.index)
+
+    def images(self) -> List[bytes]:
+        """JPEG bytes in stream order (accepted by ``st.image`` and ``build_pdf``)."""
+        return [t.jpeg for t in self.thumbnails()]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(t.jpeg) for t in self.thumbnails())
+
+    def __len__(self):
+        return len(self._items)
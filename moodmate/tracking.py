@@ -0,0 +1,141 @@
+"""
+Per-face identity tracks, so several people are not blended into one mix.
+
+Each frame's boxes are associated with the live tracks by IoU. The whole
+tracks x detections IoU matrix is computed at once, and matching runs in
+vectorized rounds of *mutual best* pairs (a detection and a track that are
+each other's highest IoU). Each round settles every uncontested pair, so
+even crowded frames need only a handful of numpy passes instead of nested
+Python loops. Unmatched detections start new tracks; a track that is not
+seen for ``max_missed`` frames is closed but keeps its accumulator.
+
+Every track owns a confidence-weighted class vector (the same weighting as
+``accumulate_emotions``), so per-person percentages and a group summary in
+which each person counts once can be reported side by side.
+"""
+
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+from moodmate.aggregation import as_detections, dominant_emotion, normalize_percentages
+from moodmate.config import EMOTION_CLASSES
+from moodmate.metrics import stage
+
+IOU_THRESHOLD = 0.3
+# Frames a face may be missing (occluded, not detected) before its track closes
+MAX_MISSED = 15
+# Tracks shorter than this are treated as spurious detections in summaries
+MIN_FRAMES = 3
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of xyxy boxes ``a`` (n, 4) and ``b`` (m, 4) -> (n, m)."""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)), np.float32)
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0).astype(np.float32)
+
+
+def match_boxes(iou: np.ndarray, threshold: float = IOU_THRESHOLD):
+    """Greedy one-to-one matching on an IoU matrix -> (row indices, column indices)."""
+    iou = np.where(iou >= threshold, iou, -1.0)
+    rows, cols = [], []
+    while iou.size and iou.max() >= 0:
+        best_col = iou.argmax(axis=1)
+        best_row = iou.argmax(axis=0)
+        r = np.flatnonzero((best_row[best_col] == np.arange(len(iou))) & (iou.max(axis=1) >= 0))
+        c = best_col[r]
+        rows.append(r)
+        cols.append(c)
+        iou[r, :] = -1.0
+        iou[:, c] = -1.0
+    if not rows:
+        return np.zeros(0, np.intp), np.zeros(0, np.intp)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+class FaceTracker:
+    """Stable face IDs across frames, each with its own emotion accumulator."""
+
+    def __init__(self, iou_threshold: float = IOU_THRESHOLD, max_missed: int = MAX_MISSED):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        classes = len(EMOTION_CLASSES)
+        # Live tracks as parallel arrays
+        self.ids = np.zeros(0, np.int32)
+        self.boxes = np.zeros((0, 4), np.float32)
+        self.missed = np.zeros(0, np.int32)
+        # Accumulators for every track ever opened, indexed by track id
+        self.sums = np.zeros((0, classes), np.float64)
+        self.frames = np.zeros(0, np.int64)
+        # Streams update on their own thread while the page reads summaries
+        self._lock = threading.Lock()
+
+    def update(self, results, repeat: int = 1) -> np.ndarray:
+        """Associate one frame's detections; returns the track id of each detection.
+
+        ``repeat`` counts the frame that many times (frames that reused it).
+        """
+        det = as_detections(results)
+        with stage("track"), self._lock:
+            valid = (det.classes >= 0) & (det.classes < self.sums.shape[1])
+            rows, cols = match_boxes(iou_matrix(self.boxes, det.boxes), self.iou_threshold)
+            assigned = np.full(len(det), -1, np.int32)
+            assigned[cols] = self.ids[rows]
+
+            new = np.flatnonzero(assigned < 0)
+            new_ids = np.arange(len(new), dtype=np.int32) + len(self.sums)
+            assigned[new] = new_ids
+            self.sums = np.concatenate([self.sums, np.zeros((len(new), self.sums.shape[1]))])
+            self.frames = np.concatenate([self.frames, np.zeros(len(new), np.int64)])
+
+            np.add.at(self.sums, (assigned[valid], det.classes[valid]), det.confs[valid] * repeat)
+            np.add.at(self.frames, assigned, repeat)
+
+            missed = self.missed + 1
+            missed[rows] = 0
+            boxes = self.boxes.copy()
+            boxes[rows] = det.boxes[cols]
+            keep = missed <= self.max_missed
+            self.ids = np.concatenate([self.ids[keep], new_ids])
+            self.boxes = np.concatenate([boxes[keep], det.boxes[new]])
+            self.missed = np.concatenate([missed[keep], np.zeros(len(new), np.int32)])
+        return assigned
+
+    def people(self, min_frames: int = MIN_FRAMES) -> List[Dict]:
+        """Per-track summary, most seen first; short-lived tracks are left out."""
+        with self._lock:
+            sums, frames = self.sums.copy(), self.frames.copy()
+        order = np.argsort(-frames, kind="stable")
+        people = []
+        for track in order[frames[order] >= min_frames]:
+            percentages = normalize_percentages(dict(zip(EMOTION_CLASSES, sums[track].tolist())))
+            people.append({
+                "id": int(track),
+                "label": f"Person {len(people) + 1}",
+                "frames": int(frames[track]),
+                "dominant": dominant_emotion(percentages),
+                "percentages": percentages,
+            })
+        return people
+
+    def group(self, min_frames: int = MIN_FRAMES) -> Dict:
+        """Group mood with every person weighted equally, however long they were on screen."""
+        return group_summary(self.people(min_frames))
+
+
+def group_summary(people: List[Dict]) -> Dict:
+    if not people:
+        return {"people": 0, "percentages": normalize_percentages({}), "dominant": "natural", "agreement": 0.0}
+    mean = {k: float(np.mean([p["percentages"].get(k, 0.0) for p in people])) for k in EMOTION_CLASSES}
+    percentages = normalize_percentages(mean)
+    dominant = dominant_emotion(percentages)
+    agreement = sum(p["dominant"] == dominant for p in people) / len(people)
+    return {"people": len(people), "percentages": percentages, "dominant": dominant, "agreement": agreement}
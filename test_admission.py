@@ -0,0 +1,137 @@
+"""
+Tests for admission control in front of the model (no weights needed)
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from conftest import StubModel
+from moodmate.admission import IMAGE, STREAM, VIDEO, AdmissionController, Overloaded
+from moodmate.pipeline import StreamAnalyzer
+
+
+def _queue(controller, session, kind, order, **kwargs):
+    """Start a waiting request on a thread; it records its kind once admitted."""
+    def run():
+        with controller.slot(session, kind, **kwargs):
+            order.append(kind)
+
+    thread = threading.Thread(target=run)
+    before = controller.queue_length
+    thread.start()
+    deadline = time.time() + 5
+    while controller.queue_length == before and time.time() < deadline:
+        time.sleep(0.005)
+    return thread
+
+
+def test_image_requests_overtake_queued_video():
+    controller = AdmissionController(slots=1)
+    held = controller.acquire("a", VIDEO)
+    order = []
+    threads = [_queue(controller, "b", VIDEO, order), _queue(controller, "c", IMAGE, order)]
+
+    controller.release(held)
+    for thread in threads:
+        thread.join(5)
+    assert order == [IMAGE, VIDEO]
+    assert controller.running == 0 and controller.admitted == {IMAGE: 1, STREAM: 0, VIDEO: 2}
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    controller = AdmissionController(slots=1, max_queue=1)
+    held = controller.acquire("a", IMAGE)
+    order = []
+    thread = _queue(controller, "b", IMAGE, order)
+
+    with pytest.raises(Overloaded) as err:
+        controller.acquire("c", IMAGE)
+    assert err.value.retry_after > 0 and controller.rejected[IMAGE] == 1
+    # Background work is bounded elsewhere and only waits
+    video = _queue(controller, "c", VIDEO, order, bounded=False)
+    assert controller.queue_length == 2
+
+    controller.release(held)
+    thread.join(5)
+    video.join(5)
+    assert order == [IMAGE, VIDEO]
+
+
+def test_session_limit_leaves_slots_to_other_sessions():
+    controller = AdmissionController(slots=2, per_session=1)
+    held = controller.acquire("a", VIDEO)
+
+    with pytest.raises(Overloaded):
+        controller.acquire("a", IMAGE, timeout=0.05)
+    other = controller.acquire("b", IMAGE, timeout=0)
+    assert controller.running == 2 and controller.queue_length == 0
+    controller.release(other)
+    controller.release(held)
+
+
+def test_admit_with_a_slot_to_spare_wakes_the_queue():
+    """A waiter passed over for this ticket is woken at once instead of after ``POLL_INTERVAL``"""
+    class CountingCondition(threading.Condition):
+        notified = 0
+
+        def notify_all(self):
+            self.notified += 1
+            super().notify_all()
+
+    controller = AdmissionController(slots=2)
+    controller._cond = CountingCondition()
+    first = controller.acquire("a", IMAGE)
+    assert controller._cond.notified == 1
+    # The last free slot leaves nothing for a waiter to take
+    second = controller.acquire("b", IMAGE)
+    assert controller._cond.notified == 1
+    controller.release(first)
+    controller.release(second)
+
+
+def test_waiting_caller_sees_its_position():
+    controller = AdmissionController(slots=1)
+    held = controller.acquire("a", IMAGE)
+    order = []
+    first = _queue(controller, "b", IMAGE, order)
+    positions = []
+    done = threading.Thread(target=lambda: controller.acquire("c", VIDEO, on_wait=positions.append))
+    done.start()
+    while not positions:
+        time.sleep(0.005)
+
+    assert positions[0] == 2
+    controller.release(held)
+    first.join(5)
+    done.join(5)
+    assert positions[-1] in (1, 2) and controller.running == 1
+
+
+def test_stream_frames_reuse_detections_when_busy():
+    controller = AdmissionController(slots=1)
+    model = StubModel()
+    analyzer = StreamAnalyzer(controller.gate(model, "cam", STREAM, timeout=0), 0.25)
+    frame = np.zeros((32, 32, 3), np.uint8)
+    analyzer.process(frame)
+    held = controller.acquire("other", IMAGE)
+    analyzer.process(frame)
+    controller.release(held)
+
+    assert analyzer.weights["happy"] == pytest.approx(1.8)
+    assert controller.rejected[STREAM] == 1 and controller.admitted[STREAM] == 1
+    # Anything but predict is read from the wrapped model
+    assert analyzer.model.calls is model.calls and model.calls == [1]
+
+
+def test_prometheus_text_exports_queue_and_waits():
+    controller = AdmissionController(slots=1)
+    controller.release(controller.acquire("a", IMAGE))
+    text = controller.prometheus_text()
+
+    assert "moodmate_admission_queue_length 0" in text
+    assert 'moodmate_admission_admitted_total{kind="image"} 1' in text
+    assert 'moodmate_admission_wait_seconds_count{kind="image"} 1' in text
+    assert controller.stats()["wait_p95_ms"].keys() == {IMAGE}
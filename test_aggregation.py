@@ -0,0 +1,34 @@
+"""
+Tests for the UI-free detection aggregation helpers
+"""
+
+import numpy as np
+
+from conftest import FakeResult
+from moodmate.aggregation import Detections, accumulate_emotions, as_detections, emotion_vector
+from moodmate.config import EMOTION_CLASSES
+
+
+def test_as_detections_handles_empty_results():
+    """Missing or empty predictions normalize to zero detections"""
+    assert len(as_detections([])) == 0
+    assert len(as_detections([FakeResult(boxes=None)])) == 0
+    assert len(as_detections([FakeResult([], [])])) == 0
+
+
+def test_emotion_vector_weights_by_confidence():
+    """Per-class sums follow EMOTION_CLASSES order and skip unknown ids"""
+    res = [FakeResult([4, 4, 7, 42], [0.5, 0.25, 0.8, 0.9])]
+    vec = emotion_vector(res)
+    assert vec[EMOTION_CLASSES.index("happy")] == 0.75
+    assert np.isclose(vec[7], 0.8)
+    assert np.isclose(vec.sum(), 1.55)
+
+
+def test_accumulate_accepts_detections():
+    """Precomputed Detections are folded in like raw results"""
+    det = Detections(np.zeros((1, 4), np.float32), np.array([0.5], np.float32), np.array([0], np.int16))
+    weights = {}
+    accumulate_emotions(det, weights)
+    accumulate_emotions([det], weights)
+    assert weights == {EMOTION_CLASSES[0]: 1.0}
@@ -0,0 +1,105 @@
+"""
+Tests for the local HTTP API (uses a stub model, no weights needed)
+"""
+
+import json
+
+import cv2
+import numpy as np
+from starlette.testclient import TestClient
+
+from conftest import StubModel
+from moodmate.api import create_app
+
+
+def _sad_model():
+    """One 'sad' (id 6) box per frame"""
+    return StubModel(6, 0.8)
+
+
+def _video_bytes(tmp_path, frames=5):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 32))
+    for _ in range(frames):
+        writer.write(np.zeros((32, 32, 3), np.uint8))
+    writer.release()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_analyze_image():
+    """An image upload returns faces, percentages and recommendations"""
+    client = TestClient(create_app(model=_sad_model()))
+    _, png = cv2.imencode(".png", np.zeros((32, 32, 3), np.uint8))
+    data = client.post("/analyze/image", content=png.tobytes()).json()
+
+    assert data["dominant_emotion"] == "sad" and data["percentages"]["sad"] == 100.0
+    assert data["faces"] == [{"emotion": "sad", "confidence": 0.8, "box": [1.0, 2.0, 11.0, 12.0]}]
+    assert data["recommendations"]["songs"][0].keys() == {"title", "reason", "link"}
+    assert client.post("/analyze/image", content=b"not an image").status_code == 400
+
+
+def test_full_queue_answers_503(monkeypatch, tmp_path):
+    """Requests beyond the admission queue are turned away with Retry-After instead of timing out"""
+    monkeypatch.setenv("MOODMATE_MAX_QUEUE", "0")
+    client = TestClient(create_app(model=_sad_model()))
+    _, png = cv2.imencode(".png", np.zeros((32, 32, 3), np.uint8))
+    response = client.post("/analyze/image", content=png.tobytes())
+
+    assert response.status_code == 503 and int(response.headers["Retry-After"]) > 0
+    assert client.post("/analyze/video", content=_video_bytes(tmp_path)).status_code == 503
+    assert 'moodmate_admission_rejected_total{kind="image"} 1' in client.get("/metrics").text
+
+
+def test_analyze_video_streams_segments(tmp_path):
+    """Video analysis emits start, one progress event per segment, then the result"""
+    model = _sad_model()
+    client = TestClient(create_app(model=model))
+    url = "/analyze/video?segment=2&change=0"
+    with client.stream("POST", url, content=_video_bytes(tmp_path)) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [e["event"] for e in events] == ["start", "progress", "progress", "progress", "result"]
+    assert model.calls == [2, 2, 1]
+    assert [e["frames"] for e in events[1:4]] == [2, 4, 5]
+    assert events[-1]["dominant_emotion"] == "sad" and events[-1]["detections"] == 5
+
+
+def test_static_video_reuses_detections(tmp_path):
+    """Unchanged frames skip inference but still count toward the percentages"""
+    model = _sad_model()
+    client = TestClient(create_app(model=model))
+    response = client.post("/analyze/video?segment=2", content=_video_bytes(tmp_path))
+    result = json.loads(response.text.strip().splitlines()[-1])
+
+    assert model.calls == [1]
+    assert result["frames"] == 5 and result["inferred"] == 1 and result["detections"] == 5
+
+
+def test_recommendations():
+    """Lookups by emotion or by distribution; bad input is rejected"""
+    client = TestClient(create_app(model=_sad_model()))
+    assert len(client.get("/recommendations/happy?k=2").json()["songs"]) == 2
+    assert client.get("/recommendations/bored").status_code == 404
+    mixed = client.post("/recommendations", json={"percentages": {"happy": 60, "sad": 40}}).json()
+    assert mixed["breathing"]["name"]
+    assert client.post("/recommendations", json={"k": 3}).status_code == 400
+    assert client.get("/recommendations/happy?k=abc").status_code == 400
+
+
+class FailingModel(StubModel):
+    def predict(self, frames, **kwargs):
+        if self.calls:
+            raise RuntimeError("CUDA out of memory")
+        return super().predict(frames, **kwargs)
+
+
+def test_video_failure_ends_stream_with_error_event(tmp_path):
+    """A crash after the response started is reported as a final NDJSON event, not a cut-off body"""
+    client = TestClient(create_app(model=FailingModel()))
+    response = client.post("/analyze/video?segment=2&change=0", content=_video_bytes(tmp_path))
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [e["event"] for e in events] == ["start", "progress", "error"]
+    assert "CUDA out of memory" in events[-1]["detail"]
@@ -6,80 +6,64 @@ Test script for AI MoodMate app functionality
 import os
 import sys
 import numpy as np
-from PIL import Image
 from ultralytics import YOLO
 
-# Add the project directory to Python path
-sys.path.insert(0, '/home/surendra208/Documents/jaya/aimoodmate/YOLO/ai_moodmate')
+# Paths come from the project itself so the suite runs from any checkout
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+
+from moodmate.config import MODEL_PATH  # noqa: E402
 
 def test_model_loading():
     """Test if the YOLO model loads correctly"""
     print("Testing model loading...")
-    model_path = '/home/surendra208/Documents/jaya/aimoodmate/YOLO/ai_moodmate/last.pt'
-    
-    if not os.path.exists(model_path):
-        print(f"❌ Model file not found at {model_path}")
-        return False
-    
-    try:
-        model = YOLO(model_path)
-        print(f"✅ Model loaded successfully!")
-        print(f"   Classes: {model.model.names}")
-        print(f"   Number of classes: {len(model.model.names)}")
-        return True
-    except Exception as e:
-        print(f"❌ Error loading model: {e}")
-        return False
+    model_path = MODEL_PATH
+
+    assert os.path.exists(model_path), f"❌ Model file not found at {model_path}"
+
+    model = YOLO(model_path)
+    print("✅ Model loaded successfully!")
+    print(f"   Classes: {model.model.names}")
+    print(f"   Number of classes: {len(model.model.names)}")
 
 def test_emotion_detection():
     """Test emotion detection on a dummy image"""
     print("\nTesting emotion detection...")
     
-    try:
-        model = YOLO('/home/surendra208/Documents/jaya/aimoodmate/YOLO/ai_moodmate/last.pt')
-        
-        # Create a dummy image (random noise)
-        dummy_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        
-        # Run prediction
-        results = model.predict(dummy_image, conf=0.25, verbose=False)
-        
-        print(f"✅ Emotion detection test completed!")
-        print(f"   Results: {len(results)} detection(s)")
-        
-        if results and len(results) > 0:
-            res = results[0]
-            if hasattr(res, "boxes") and res.boxes is not None:
-                print(f"   Detected {len(res.boxes)} face(s)")
-            else:
-                print("   No faces detected (expected for random image)")
-        
-        return True
-    except Exception as e:
-        print(f"❌ Error in emotion detection: {e}")
-        return False
+    model = YOLO(MODEL_PATH)
+
+    # Create a dummy image (random noise)
+    dummy_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    # Run prediction
+    results = model.predict(dummy_image, conf=0.25, verbose=False)
+
+    print("✅ Emotion detection test completed!")
+    print(f"   Results: {len(results)} detection(s)")
+
+    assert len(results) == 1
+    res = results[0]
+    if hasattr(res, "boxes") and res.boxes is not None:
+        print(f"   Detected {len(res.boxes)} face(s)")
+    else:
+        print("   No faces detected (expected for random image)")
 
 def test_app_imports():
     """Test if all required modules can be imported"""
     print("\nTesting app imports...")
     
-    try:
-        import streamlit as st
-        import numpy as np
-        import pandas as pd
-        import plotly.express as px
-        from PIL import Image
-        import cv2
-        from ultralytics import YOLO
-        from fpdf import FPDF
-        from streamlit_webrtc import webrtc_streamer, VideoTransformerBase, WebRtcMode
-        import av
-        
-        print("✅ All required modules imported successfully!")
-        return True
-    except ImportError as e:
-        print(f"❌ Import error: {e}")
-        return False
+    import streamlit as st  # noqa: F401
+    import numpy as np  # noqa: F401
+    import pandas as pd  # noqa: F401
+    import plotly.express as px  # noqa: F401
+    from PIL import Image  # noqa: F401
+    import cv2  # noqa: F401
+    from ultralytics import YOLO  # noqa: F401
+    from fpdf import FPDF  # noqa: F401
+    from streamlit_webrtc import webrtc_streamer, VideoTransformerBase, WebRtcMode  # noqa: F401
+    import av  # noqa: F401
+
+    print("✅ All required modules imported successfully!")
 
 def test_file_structure():
     """Test if all required files exist"""
@@ -93,16 +77,16 @@ def test_file_structure():
         'outputs'
     ]
     
-    all_exist = True
+    missing = []
     for file_path in required_files:
-        full_path = f'/home/surendra208/Documents/jaya/aimoodmate/YOLO/ai_moodmate/{file_path}'
+        full_path = os.path.join(PROJECT_DIR, file_path)
         if os.path.exists(full_path):
             print(f"✅ {file_path}")
         else:
             print(f"❌ {file_path} - Missing!")
-            all_exist = False
-    
-    return all_exist
+            missing.append(file_path)
+
+    assert not missing, f"Missing: {', '.join(missing)}"
 
 def main():
     """Run all tests"""
@@ -120,8 +104,11 @@ def main():
     total = len(tests)
     
     for test in tests:
-        if test():
+        try:
+            test()
             passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__}: {e}")
     
     print("\n" + "=" * 50)
     print(f"📊 Test Results: {passed}/{total} tests passed")
@@ -134,7 +121,7 @@ def main():
         print("   • Clickable links for reading recommendations")
         print("   • Fixed deprecation warnings")
         print("\nTo run the app:")
-        print("1. cd /home/surendra208/Documents/jaya/aimoodmate/YOLO/ai_moodmate")
+        print(f"1. cd {PROJECT_DIR}")
         print("2. source .venv/bin/activate")
         print("3. streamlit run app.py")
         print("\nThe app will be available at: http://localhost:8501")
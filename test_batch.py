@@ -0,0 +1,100 @@
+"""
+Tests for the headless batch CLI (uses a stub model, no weights needed)
+"""
+
+import csv
+
+import cv2
+import numpy as np
+
+from conftest import StubModel
+from moodmate import batch
+
+
+def _media(tmp_path):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f"img{i}.jpg"), np.zeros((32, 32, 3), np.uint8))
+    (tmp_path / "notes.txt").write_text("skip me")
+    writer = cv2.VideoWriter(str(tmp_path / "clip.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 32))
+    for _ in range(6):
+        writer.write(np.zeros((32, 32, 3), np.uint8))
+    writer.release()
+
+
+def test_images_are_batched(tmp_path):
+    _media(tmp_path)
+    model = StubModel()
+    rows = batch.analyze_images(model, str(tmp_path), ["img0.jpg", "img1.jpg", "missing.jpg"], conf=0.25)
+
+    assert model.calls == [2]
+    assert [r["path"] for r in rows] == ["missing.jpg", "img0.jpg", "img1.jpg"]
+    assert rows[0]["error"] == "unreadable image"
+    assert rows[1]["dominant_emotion"] == "happy" and rows[1]["happy"] == 100.0
+
+
+def test_video_stride_and_batches(tmp_path):
+    _media(tmp_path)
+    model = StubModel()
+    row = batch.analyze_video(model, str(tmp_path), "clip.avi", conf=0.25, stride=2, batch=2)
+
+    assert row["frames"] == 3
+    assert model.calls == [2, 1]
+    assert row["detections"] == 3
+
+
+def test_run_resumes_from_existing_output(tmp_path, monkeypatch):
+    media = tmp_path / "media"
+    media.mkdir()
+    _media(media)
+    model = StubModel()
+    monkeypatch.setattr(batch, "model_loader", lambda path: lambda: model)
+    output = str(tmp_path / "out.csv")
+
+    assert batch.run(str(media), output, batch=2, log=lambda msg: None) == 4
+    assert batch.run(str(media), output, batch=2, log=lambda msg: None) == 0
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(r["path"] for r in rows) == ["clip.avi", "img0.jpg", "img1.jpg", "img2.jpg"]
+
+
+def test_jsonl_writer_ignores_truncated_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"path": "a.jpg", "error": ""}\n{"path": "b.jpg", "err')
+    assert batch.ResultWriter(str(output)).completed() == {"a.jpg"}
+
+
+def test_video_change_detection_reuses_detections(tmp_path):
+    """A static clip gets one predict call but every sampled frame is counted"""
+    _media(tmp_path)
+    model = StubModel()
+    row = batch.analyze_video(model, str(tmp_path), "clip.avi", conf=0.25, stride=2, batch=2, change_threshold=3.0)
+
+    assert model.calls == [1]
+    assert row["frames"] == 3 and row["detections"] == 3 and row["happy"] == 100.0
+
+
+def test_retried_failures_leave_one_row_per_path(tmp_path):
+    """A failed file's new row replaces its error row instead of sitting next to it"""
+    for name in ("out.csv", "out.jsonl"):
+        output = str(tmp_path / name)
+        first = batch.ResultWriter(output)
+        first.write([{"path": "a.jpg", "error": ""}, {"path": "b.jpg", "error": "unreadable image"}])
+        first.close()
+
+        retry = batch.ResultWriter(output)
+        assert retry.completed() == {"a.jpg"}
+        retry.write([{"path": "b.jpg", "error": "", "happy": 100.0}])
+        retry.close()
+
+        rows = list(batch.ResultWriter(output)._existing_rows())
+        assert [(r["path"], r["error"]) for r in rows] == [("a.jpg", ""), ("b.jpg", "")]
+
+
+def test_jsonl_append_after_truncated_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"path": "a.jpg", "error": ""}\n{"path": "b.jpg", "err')
+    writer = batch.ResultWriter(str(output))
+    writer.write([{"path": "b.jpg", "error": ""}])
+    writer.close()
+    assert batch.ResultWriter(str(output)).completed() == {"a.jpg", "b.jpg"}
@@ -0,0 +1,43 @@
+"""
+Tests for the benchmark runner (tiny settings and a stub model)
+"""
+
+import numpy as np
+
+from moodmate import bench
+
+
+class StubModel:
+    def predict(self, frames, **kwargs):
+        return [None] * (len(frames) if isinstance(frames, list) else 1)
+
+
+def test_measure_reports_per_item_stats():
+    """Stats are ordered and per-item numbers divide by the items per call"""
+    stats = bench.measure(lambda: sum(range(1000)), repeat=5, warmup=0, items=10)
+    assert stats["repeat"] == 5
+    assert stats["min_ms"] <= stats["median_ms"] <= stats["p95_ms"]
+    assert np.isclose(stats["per_item_ms"], stats["median_ms"] / 10, atol=1e-3)
+
+
+def test_run_suite_covers_every_case():
+    """One record per case with a stable case id"""
+    records = bench.run_suite({"stub": StubModel()}, resolutions=["240p"], batch_sizes=[2],
+                              box_counts=[4], video_frames=3, repeat=1, log=lambda _: None)
+    cases = [r["case"] for r in records]
+    assert cases == [
+        "accumulate[boxes=4]",
+        "replay[boxes=4,frames=1000]",
+        "draw[resolution=240p,boxes=4]",
+        "pdf[images=3]",
+        "predict[backend=stub,resolution=240p,batch=2]",
+        "video[backend=stub,resolution=240p,frames=3]",
+    ]
+
+
+def test_compare_flags_slowdowns_only():
+    """Only cases slower than the threshold and present in both runs are reported"""
+    baseline = [{"case": "a", "median_ms": 10.0}, {"case": "b", "median_ms": 10.0}]
+    results = [{"case": "a", "median_ms": 13.0}, {"case": "b", "median_ms": 11.0}, {"case": "c", "median_ms": 1.0}]
+    regressions = bench.compare(results, baseline, threshold=0.2)
+    assert len(regressions) == 1 and regressions[0].startswith("a:")
@@ -0,0 +1,48 @@
+"""
+Tests for webcam capture constraints and the server-side downscale
+"""
+
+import numpy as np
+
+from moodmate.capture import capture_constraints, fit_size, frame_to_rgb, inference_sizes
+
+
+class FakeFrame:
+    """Stands in for av.VideoFrame: records whether it had to be rescaled"""
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.reformatted = None
+
+    def reformat(self, width, height, format):
+        self.reformatted = (width, height, format)
+        return FakeFrame(width, height)
+
+    def to_ndarray(self, format="rgb24"):
+        return np.zeros((self.height, self.width, 3), np.uint8)
+
+
+def test_constraints_cap_size_and_rate():
+    video = capture_constraints(640, 480, 15)["video"]
+    assert video["width"] == {"ideal": 640, "max": 640}
+    assert video["frameRate"]["max"] == 15
+
+
+def test_oversized_frames_are_scaled_in_one_pass():
+    frame = FakeFrame(1920, 1080)
+    rgb = frame_to_rgb(frame, 640, 480)
+    assert rgb.shape == (360, 640, 3) and frame.reformatted == (640, 360, "rgb24")
+
+    small = FakeFrame(320, 240)
+    assert frame_to_rgb(small, 640, 480).shape == (240, 320, 3) and small.reformatted is None
+
+
+def test_fit_size_keeps_aspect_and_even_dimensions():
+    assert fit_size(1279, 719, 640, 480) == (640, 358)
+    assert fit_size(320, 240, 640, 480) == (320, 240)
+
+
+def test_inference_sizes_follow_the_capture():
+    assert inference_sizes(320, 240) == (320,)
+    assert inference_sizes(640, 480) == (640, 512, 416, 320)
+    assert inference_sizes(100, 80) == (320,)
@@ -0,0 +1,63 @@
+"""
+Tests for the fast/full model cascade (stub models, no weights needed)
+"""
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from conftest import FakeResult, StubModel
+from moodmate import model as model_module
+from moodmate.aggregation import as_detections
+from moodmate.api import create_app
+from moodmate.cascade import CascadeModel, CascadeStats, cascade_stats, threshold_from_env
+from moodmate.model import ModelPool
+
+
+class PixelModel(StubModel):
+    """Answers class ``cls_id``; the confidence is the frame's pixel value / 100"""
+
+    def answer(self, frame, **kwargs):
+        return FakeResult([self.cls_id], [float(frame.flat[0]) / 100])
+
+
+def _frame(value):
+    return np.full((8, 8, 3), value, np.uint8)
+
+
+def test_only_unsure_frames_reach_the_full_model():
+    fast, full = PixelModel(4), PixelModel(6)
+    cascade = CascadeModel(fast, full, threshold=0.6)
+    results = cascade.predict([_frame(90), _frame(30), _frame(70), _frame(10)], conf=0.25)
+
+    # One fast batch of 4, one full batch with just the two low-confidence frames
+    assert fast.calls == [4] and full.calls == [2]
+    assert [int(as_detections([r]).classes[0]) for r in results] == [4, 6, 4, 6]
+    stats = cascade.cascade.summary()
+    assert stats["frames"] == 4 and stats["escalated"] == 2 and stats["escalation_ratio"] == 0.5
+
+
+def test_single_frame_call_and_confident_frames_skip_full_model():
+    fast, full = PixelModel(4), PixelModel(6)
+    cascade = CascadeModel(fast, full, threshold=0.5)
+    assert len(cascade.predict(_frame(80))) == 1
+    assert full.calls == []
+
+
+def test_loader_builds_cascades_sharing_one_stats(monkeypatch):
+    monkeypatch.setattr(model_module, "load_yolo", lambda path: PixelModel(4 if "fast" in path else 6))
+    load = model_module.model_loader("full.pt", {"MOODMATE_FAST_MODEL": "fast.pt",
+                                                 "MOODMATE_CASCADE_THRESHOLD": "0.5"})
+    pool = ModelPool(load, 2, [load(), load()])
+    pool.predict(_frame(10))
+    pool.predict(_frame(90))
+    stats = cascade_stats(pool)
+    assert isinstance(stats, CascadeStats) and stats.frames == 2 and stats.escalated == 1
+    assert pool.first.threshold == 0.5
+    assert cascade_stats(PixelModel(4)) is None
+    assert threshold_from_env({}) == 0.6
+
+
+def test_api_reports_cascade_counters():
+    client = TestClient(create_app(model=CascadeModel(PixelModel(4), PixelModel(6), threshold=0.6)))
+    assert "cascade" in client.get("/health").json()
+    assert "moodmate_cascade_escalated_total 0" in client.get("/metrics").text
@@ -0,0 +1,69 @@
+"""
+Tests for the indexed recommendation catalog
+"""
+
+import json
+
+from moodmate import catalog_data
+from moodmate.catalog import Catalog, ItemTable, PersonalizationState, personalization_state
+
+
+def test_default_catalog_matches_source_lists():
+    """Lookups return the same lists as the original per-emotion dicts"""
+    catalog = Catalog.from_defaults(ItemTable())
+    songs, reads, therapy, breathing = catalog.recommend("sad")
+
+    assert list(songs) == catalog_data.YOUTUBE_SONGS["sad"]
+    assert list(reads) == catalog_data.READING_MINDFULNESS["sad"]
+    assert list(therapy) == catalog_data.THERAPY_RESOURCES
+    assert breathing is catalog_data.BREATHING_EXERCISES["sad"]
+
+
+def test_unknown_emotion_falls_back_to_natural():
+    catalog = Catalog.from_defaults(ItemTable())
+    assert catalog.recommend("unknown")[0] == catalog.recommend("natural")[0]
+
+
+def test_duplicate_items_share_one_id():
+    """Items listed under several emotions are stored once"""
+    table = ItemTable()
+    catalog = Catalog.from_defaults(table)
+    total_entries = sum(len(v) for v in catalog.index.values())
+    assert len(table) < total_entries
+
+
+def test_personalized_picks_are_cached():
+    """Personalized lists depend only on (emotion, state) and are reused"""
+    catalog = Catalog.from_defaults(ItemTable())
+    state = PersonalizationState(stabilize=True, milestone=5, weekly=True)
+
+    songs, reads, _, _ = catalog.personalized("happy", state)
+    assert songs[0] == catalog_data.PERSONALIZED_SONGS["stabilize"]
+    assert songs[1][0] == "🏆 Milestone Achievement: 5 Sessions!"
+    assert songs[2:] == tuple(catalog_data.YOUTUBE_SONGS["happy"][:3])
+    assert reads[0] == catalog_data.PERSONALIZED_READS["weekly"]
+    assert catalog.personalized("happy", state)[0] is songs
+
+
+def test_personalization_state_thresholds():
+    insights = {'total_sessions': 10, 'mood_stability': 0.3, 'most_common_emotion': "sad"}
+    state = personalization_state("sad", insights, 10)
+    assert state == PersonalizationState(True, True, 10, True, True, True)
+    assert personalization_state("sad", None, 1) == PersonalizationState()
+
+
+def test_load_row_catalog_files(tmp_path):
+    """JSONL and CSV rows override their kinds and keep defaults for the rest"""
+    rows = [{"kind": "song", "emotion": "happy", "title": f"Song {i}", "reason": "r", "link": "l"} for i in range(1000)]
+    jsonl = tmp_path / "catalog.jsonl"
+    jsonl.write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+    csv_path = tmp_path / "catalog.csv"
+    csv_path.write_text("kind,emotion,title,reason,link\nread,sad,Guide,why,https://x\n", encoding="utf-8")
+
+    catalog = Catalog.from_file(str(jsonl), ItemTable())
+    assert len(catalog.items("song", "happy")) == 1000
+    assert list(catalog.items("read", "sad")) == catalog_data.READING_MINDFULNESS["sad"]
+
+    catalog = Catalog.from_file(str(csv_path), ItemTable())
+    assert catalog.items("read", "sad") == (("Guide", "why", "https://x"),)
+    assert list(catalog.therapy) == catalog_data.THERAPY_RESOURCES
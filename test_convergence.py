@@ -0,0 +1,33 @@
+"""
+Tests for the convergence-based early stop
+"""
+
+from moodmate.convergence import ConvergenceMonitor, share_vector
+
+
+def _feed(monitor, per_frame, frames):
+    weights = {}
+    for i in range(frames):
+        for label, w in per_frame(i).items():
+            weights[label] = weights.get(label, 0.0) + w
+        if monitor.update(weights):
+            return i + 1
+    return None
+
+
+def test_stable_mix_converges_after_enough_windows():
+    monitor = ConvergenceMonitor(tolerance=2.0, window=10, windows=3, min_frames=30)
+    stop = _feed(monitor, lambda i: {"happy": 0.9, "sad": 0.3}, 500)
+    assert stop == 30 and monitor.converged
+
+
+def test_shifting_mix_does_not_converge():
+    """The mix drifts from sad to happy over the video, so there is no early stop"""
+    monitor = ConvergenceMonitor(tolerance=2.0, window=10, windows=3, min_frames=30)
+    assert _feed(monitor, lambda i: {"happy": i / 100, "sad": 1.0}, 200) is None
+
+
+def test_no_detections_never_converge():
+    monitor = ConvergenceMonitor(window=5, windows=2, min_frames=0)
+    assert _feed(monitor, lambda i: {}, 100) is None
+    assert share_vector({}) is None
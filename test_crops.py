@@ -0,0 +1,59 @@
+"""
+Tests for the two-stage face-crop classifier (stub model, no weights needed)
+"""
+
+import numpy as np
+
+from conftest import FakeResult, StubModel
+from moodmate.crops import FaceCropClassifier, crop_regions
+
+
+class CropModel(StubModel):
+    """Full frames: one 'natural' face at a fixed spot. Crops: 'happy' face filling the central half"""
+
+    FACE = [200, 100, 280, 200]
+
+    def __init__(self, lose_face_on_crop=None):
+        super().__init__()
+        self.lose_face_on_crop = lose_face_on_crop
+
+    def answer(self, frame, imgsz=None, **kwargs):
+        if imgsz is None:
+            return FakeResult([5], [0.9], [self.FACE])
+        if self.lose_face_on_crop == len(self.calls):
+            return FakeResult()
+        h, w = frame.shape[:2]
+        return FakeResult([4], [0.8], [[w / 4, h / 4, 3 * w / 4, 3 * h / 4]])
+
+
+def _frame():
+    return np.zeros((480, 640, 3), np.uint8)
+
+
+def test_crop_regions_grow_and_clip():
+    regions = crop_regions(np.array([[10, 10, 50, 90], [600, 400, 640, 480]], np.float32), 640, 480, 0.25)
+    assert regions.tolist() == [[0, 0, 60, 110], [590, 380, 640, 480]]
+
+
+def test_full_pass_then_crops_until_refresh():
+    """One full-frame pass finds the face; following frames only classify the crop at small size"""
+    model = CropModel()
+    classifier = FaceCropClassifier(model, 0.25, refresh_every=3, crop_size=160)
+    dets = [classifier.detect(_frame()) for _ in range(5)]
+
+    assert model.calls == [1] * 5 and model.sizes == [None, 160, 160, 160, None]
+    assert [int(d.classes[0]) for d in dets] == [5, 4, 4, 4, 5]
+    assert classifier.full_passes == 2 and classifier.crop_passes == 3
+    # Crop boxes come back in frame coordinates
+    assert dets[1].boxes[0].tolist() == [210.0, 112.5, 270.0, 187.5]
+
+
+def test_lost_face_falls_back_to_full_pass():
+    """An empty crop triggers a full-frame pass on the same frame"""
+    model = CropModel(lose_face_on_crop=2)
+    classifier = FaceCropClassifier(model, 0.25, refresh_every=10)
+    classifier.detect(_frame())
+    det = classifier.detect(_frame())
+
+    assert model.sizes == [None, 160, None]
+    assert int(det.classes[0]) == 5 and classifier.full_passes == 2
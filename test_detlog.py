@@ -0,0 +1,111 @@
+"""
+Tests for the binary detection log and model-free replay
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from moodmate.aggregation import EMPTY, Detections, accumulate_emotions, normalize_percentages
+from moodmate.bench import synthetic_detections
+from moodmate.config import EMOTION_CLASSES
+from moodmate.detlog import (
+    FLUSH_EVERY, DetectionLog, DetectionLogWriter, main, prune_logs, replay, replay_percentages, replay_timeline,
+)
+
+
+def _frames(n, boxes=3):
+    return [synthetic_detections(boxes, 640, 480, seed=i) for i in range(n)]
+
+
+def test_round_trip_is_memory_mapped_and_exact(tmp_path):
+    path = str(tmp_path / "a.mdlog")
+    frames = _frames(5) + [Detections.empty()]
+    with DetectionLogWriter(path, source="video", fps=30.0) as log:
+        for i, det in enumerate(frames):
+            log.write(i, det, i / 30.0)
+
+    log = DetectionLog(path)
+    assert isinstance(log.records, np.memmap) and len(log) == 6
+    assert log.header["source"] == "video" and log.header["fps"] == 30.0
+    for (index, ts, det), original in zip(log.detections(), frames):
+        assert np.allclose(ts, index / 30.0)
+        assert np.array_equal(det.classes, original.classes)
+        assert np.array_equal(det.confs, original.confs)
+        assert np.array_equal(det.boxes, original.boxes)
+
+
+def test_replay_matches_live_aggregation(tmp_path):
+    """Replaying gives the same weights the live loop accumulated"""
+    path = str(tmp_path / "b.mdlog")
+    live = {k: 0.0 for k in EMOTION_CLASSES}
+    with DetectionLogWriter(path) as log:
+        for i, det in enumerate(_frames(20)):
+            accumulate_emotions(det, live)
+            log.write(i, det)
+
+    log = DetectionLog(path)
+    assert replay(log) == pytest.approx(live)
+    assert replay_percentages(log) == normalize_percentages(replay(log))
+    # Stricter threshold drops detections without re-running anything
+    assert sum(replay(log, conf=0.9).values()) < sum(live.values())
+    timeline = list(replay_timeline(log, points=4))
+    assert len(timeline) == 4 and timeline[-1][1] == replay_percentages(log)
+
+
+def test_extra_detections_keep_the_most_confident(tmp_path):
+    path = str(tmp_path / "c.mdlog")
+    det = synthetic_detections(12, 640, 480)
+    with DetectionLogWriter(path, slots=4) as log:
+        log.write(0, det)
+    assert log.truncated == 1
+
+    _, _, kept = next(DetectionLog(path).detections())
+    assert np.array_equal(np.sort(kept.confs), np.sort(det.confs)[-4:])
+
+
+def test_log_is_readable_while_being_written(tmp_path):
+    """Only flushed, whole records are visible; flush() publishes the rest"""
+    path = str(tmp_path / "d.mdlog")
+    writer = DetectionLogWriter(path)
+    for i, det in enumerate(_frames(FLUSH_EVERY + 3)):
+        writer.write(i, det)
+    assert len(DetectionLog(path)) == FLUSH_EVERY
+    writer.flush()
+    assert len(DetectionLog(path)) == FLUSH_EVERY + 3
+    writer.close()
+
+
+def test_rejects_other_files_and_prints_percentages(tmp_path, capsys):
+    bad = tmp_path / "bad.mdlog"
+    bad.write_bytes(b"not a log at all")
+    with pytest.raises(ValueError):
+        DetectionLog(str(bad))
+
+    path = str(tmp_path / "e.mdlog")
+    with DetectionLogWriter(path) as log:
+        log.write(0, _frames(1)[0])
+    assert main([path]) == 0
+    assert '"frames": 1' in capsys.readouterr().out
+
+
+def test_writer_creates_the_file_on_first_write(tmp_path):
+    path = str(tmp_path / "lazy.mdlog")
+    DetectionLogWriter(path).close()
+    assert not os.path.exists(path)
+
+    with DetectionLogWriter(path) as log:
+        log.write(0, EMPTY)
+    assert len(DetectionLog(path)) == 1
+
+
+def test_prune_keeps_the_newest_logs(tmp_path):
+    for i in range(4):
+        path = tmp_path / f"webcam_{i}.mdlog"
+        path.write_bytes(b"")
+        os.utime(path, (i, i))
+    (tmp_path / "video_x.mdlog").write_bytes(b"")
+    prune_logs(str(tmp_path), "webcam_", 2)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["video_x.mdlog", "webcam_2.mdlog", "webcam_3.mdlog"]
@@ -0,0 +1,52 @@
+"""
+Tests for the columnar mood history
+"""
+
+from datetime import datetime
+
+from moodmate.config import EMOTION_CLASSES
+from moodmate.history import HistoryFrame
+
+
+def _percentages(**values):
+    return {k: values.get(k, 0.0) for k in EMOTION_CLASSES}
+
+
+def test_display_frame_matches_session_rows():
+    """The history table formats dates, categories and the top-3 breakdown"""
+    history = HistoryFrame()
+    history.append(datetime(2024, 5, 1, 9, 30), "Image", "happy",
+                   _percentages(happy=70.0, sad=20.0, angry=10.0), "session_1")
+
+    row = history.display_frame().iloc[0]
+    assert row['Date'] == "2024-05-01"
+    assert row['Time'] == "09:30"
+    assert row['Input Mode'] == "Image"
+    assert row['Dominant Emotion'] == "Happy"
+    assert row['Emotion Breakdown'] == "Happy(70.0%), Sad(20.0%), Angry(10.0%)"
+    assert row['Session ID'] == "session_1"
+
+
+def test_append_grows_and_invalidates_cache():
+    """Appending past capacity keeps every row and refreshes cached views"""
+    history = HistoryFrame(capacity=2)
+    for i in range(5):
+        emotion = "sad" if i % 2 else "happy"
+        history.append(datetime(2024, 5, 1), "Video", emotion, _percentages(**{emotion: 100.0}), f"session_{i + 1}")
+        assert len(history.frame()) == i + 1
+
+    frame = history.frame()
+    assert list(frame['sad'])[:2] == [0.0, 100.0]
+    assert frame['dominant_emotion'].dtype == "category"
+    counts = dict(zip(history.dominant_counts()['Emotion'], history.dominant_counts()['Count']))
+    assert counts == {"happy": 3, "sad": 2}
+
+
+def test_unknown_dominant_and_custom_mode():
+    """Unknown dominant emotions and unexpected modes are kept as categories"""
+    history = HistoryFrame()
+    history.append(datetime(2024, 5, 1), "Batch", "unknown", {}, "session_1")
+
+    frame = history.frame()
+    assert frame['dominant_emotion'][0] == "unknown"
+    assert frame['input_mode'][0] == "Batch"
@@ -0,0 +1,61 @@
+"""
+Tests for the incremental mood insights aggregate
+"""
+
+from datetime import datetime, timedelta
+
+from moodmate.insights import MoodInsights
+from moodmate.records import SessionRecord
+
+
+def _session(emotion, mode="Image", days=0):
+    return SessionRecord.create(
+        number=1,
+        timestamp=datetime(2024, 1, 1) + timedelta(days=days),
+        input_mode=mode,
+        dominant=emotion,
+        percentages={emotion: 100.0},
+        recommendations=([], [], [], emotion),
+    )
+
+
+def test_empty_insights():
+    """No sessions yields no dashboard summary"""
+    assert MoodInsights().as_dict() is None
+
+
+def test_recent_window_slides():
+    """Trend and stability only consider the last 7 sessions"""
+    insights = MoodInsights()
+    for emotion in ["sad"] * 3 + ["happy"] * 7:
+        insights.record(emotion, "Image", datetime(2024, 1, 1))
+
+    summary = insights.as_dict()
+    assert summary['total_sessions'] == 10
+    assert summary['recent_trend'] == {"happy": 7}
+    assert summary['most_common_emotion'] == "happy"
+    assert summary['mood_stability'] == 1 / 7
+    assert insights.emotion_counts == {"sad": 3, "happy": 7}
+
+
+def test_history_page_metrics():
+    """Mode counts, overall emotion and days active match the full history"""
+    history = [
+        _session("angry", "Video", days=0),
+        _session("angry", "Image", days=2),
+        _session("happy", "Video", days=4),
+    ]
+    insights = MoodInsights.from_history(history)
+
+    assert insights.most_used_mode == "Video"
+    assert insights.most_common_emotion == "angry"
+    assert insights.days_active == 5
+    assert insights.as_dict()['last_session'] is history[-1]
+
+
+def test_reset():
+    """Clearing history resets every counter"""
+    insights = MoodInsights.from_history([_session("happy")])
+    insights.reset()
+    assert insights.as_dict() is None
+    assert insights.days_active == 1
@@ -0,0 +1,148 @@
+"""
+Tests for background video jobs (stub model, no weights needed)
+"""
+
+import functools
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from conftest import StubModel
+from moodmate.convergence import ConvergenceMonitor
+from moodmate.detlog import DetectionLog, replay
+from moodmate.jobs import CANCELLED, DONE, FAILED, JobManager, Throttle, job_key
+
+
+def _video(tmp_path, frames=6):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 32))
+    for i in range(frames):
+        writer.write(np.full((32, 32, 3), i * 40, np.uint8))
+    writer.release()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _wait(job, timeout=10):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_runs_once_per_upload_and_settings(tmp_path):
+    """Re-submitting the same bytes and settings returns the same job without re-analyzing"""
+    manager = JobManager(outputs_dir=str(tmp_path / "jobs"))
+    model = StubModel()
+    data = _video(tmp_path)
+    job = _wait(manager.submit_video(data, model, 0.25))
+
+    assert job.status == DONE and job.frames == 6 and len(model.calls) == 6
+    assert job.percentages["happy"] == 100.0 and job.detection_images()
+    assert manager.submit_video(data, model, 0.25) is job and len(model.calls) == 6
+    assert manager.submit_video(data, model, 0.5) is not job
+    # The spooled upload is removed once the job ends
+    assert not os.path.exists(job.path)
+
+
+def test_cancel_stops_a_running_job(tmp_path):
+    gate = threading.Event()
+    manager = JobManager(outputs_dir=str(tmp_path))
+    job = manager.submit_video(_video(tmp_path), StubModel(gate=gate), 0.25)
+    assert manager.cancel(job.key)
+    gate.set()
+
+    assert _wait(job).status == CANCELLED and job.frames < 6
+    # A cancelled job can be started again
+    assert manager.submit_video(_video(tmp_path), StubModel(), 0.25) is not job
+
+
+def test_resubmit_replaces_a_cancelled_job_that_is_still_running(tmp_path):
+    gate = threading.Event()
+    manager = JobManager(workers=2, outputs_dir=str(tmp_path / "jobs"))
+    data = _video(tmp_path)
+    old = manager.submit_video(data, StubModel(gate=gate), 0.25)
+    old.cancel()
+    new = manager.submit_video(data, StubModel(), 0.25)
+    assert new is not old and new.path != old.path and new.log_path != old.log_path
+
+    # The old job winding down must not delete the new job's upload or log
+    assert _wait(new).status == DONE and new.frames == 6
+    gate.set()
+    assert _wait(old).status == CANCELLED and len(DetectionLog(new.log_path)) > 0
+
+
+def test_queued_jobs_report_their_position(tmp_path):
+    gate = threading.Event()
+    manager = JobManager(workers=1, outputs_dir=str(tmp_path))
+    running = manager.submit_video(_video(tmp_path), StubModel(gate=gate), 0.25)
+    second = manager.submit_video(_video(tmp_path), StubModel(), 0.3)
+    third = manager.submit_video(_video(tmp_path), StubModel(), 0.35)
+
+    assert [manager.position(job.key) for job in (second, third)] == [1, 2]
+    second.cancel()
+    assert manager.position(third.key) == 1
+    gate.set()
+    assert _wait(running).status == DONE and manager.position(running.key) == 0
+    _wait(third)
+
+
+def test_undecodable_upload_fails(tmp_path):
+    job = _wait(JobManager(outputs_dir=str(tmp_path)).submit_video(b"not a video", StubModel(), 0.25))
+    assert job.status == FAILED and job.error == "no decodable frames"
+
+
+def test_key_depends_on_content_and_settings():
+    assert job_key(b"a", conf=0.25) == job_key(b"a", conf=0.25)
+    assert job_key(b"a", conf=0.25) != job_key(b"b", conf=0.25) != job_key(b"a", conf=0.3)
+
+
+def test_converge_stops_before_the_end(tmp_path, monkeypatch):
+    monkeypatch.setattr("moodmate.jobs.ConvergenceMonitor",
+                        functools.partial(ConvergenceMonitor, window=2, windows=2, min_frames=4))
+    manager = JobManager(outputs_dir=str(tmp_path))
+    job = _wait(manager.submit_video(_video(tmp_path, frames=12), StubModel(), 0.25, converge=True))
+
+    assert job.status == DONE and job.converged
+    assert job.frames == 4 and job.total == 12 and job.analyzed_ratio < 1
+
+
+def test_converge_stops_when_the_frame_count_is_unknown(tmp_path, monkeypatch):
+    """Containers that report no frame count still stop once the mix settles"""
+    monkeypatch.setattr("moodmate.jobs.ConvergenceMonitor",
+                        functools.partial(ConvergenceMonitor, window=2, windows=2, min_frames=4))
+    monkeypatch.setattr("moodmate.pipeline.video_frame_count", lambda path: 0)
+    job = _wait(JobManager(outputs_dir=str(tmp_path)).submit_video(_video(tmp_path, frames=12), StubModel(), 0.25,
+                                                                     converge=True))
+
+    assert job.status == DONE and job.converged
+    assert job.frames == 4 and job.total == 0
+
+
+def test_throttle_paces_updates_by_wall_clock():
+    now = [0.0]
+    throttle = Throttle(0.5, clock=lambda: now[0])
+    ticks = []
+    for i in range(20):
+        ticks.append(throttle.ready())
+        now[0] += 0.125
+    # First call, then once every 0.5 s
+    assert [i for i, t in enumerate(ticks) if t] == [0, 4, 8, 12, 16]
+
+
+def test_running_job_publishes_preview_and_timeline(tmp_path, monkeypatch):
+    monkeypatch.setattr("moodmate.jobs.PREVIEW_INTERVAL", 0.0)
+    job = _wait(JobManager(outputs_dir=str(tmp_path)).submit_video(_video(tmp_path), StubModel(), 0.25))
+    assert job.preview[:2] == b"\xff\xd8" and job.preview_index == 6
+    assert [n for n, _ in job.timeline] == [1, 2, 3, 4, 5, 6]
+    assert job.timeline[-1][1]["happy"] == 100.0
+
+
+def test_job_records_a_replayable_detection_log(tmp_path):
+    job = _wait(JobManager(outputs_dir=str(tmp_path)).submit_video(_video(tmp_path), StubModel(), 0.25))
+    log = DetectionLog(job.log_path)
+    assert len(log) == 6 and log.header["source"] == "video"
+    assert replay(log) == job.weights
@@ -0,0 +1,87 @@
+"""
+Tests for the per-stage timing histograms
+"""
+
+from moodmate import metrics
+from moodmate.metrics import Histogram, Metrics
+
+
+def test_disabled_timer_is_shared_noop():
+    """Nothing is recorded while metrics are off"""
+    registry = Metrics(enabled=False)
+    with registry.time("predict"):
+        pass
+    assert registry.time("a") is registry.time("b")
+    assert registry.summary() == []
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timers_stay_on_while_any_session_watches():
+    """Unticking the panel in one tab turns timers off only once no other tab shows it"""
+    registry = Metrics(enabled=False, clock=FakeClock())
+    registry.watch("tab-a")
+    registry.watch("tab-b")
+    registry.watch("tab-a", False)
+    assert registry.enabled
+    registry.watch("tab-b", False)
+    assert not registry.enabled and registry.time("predict") is registry.time("draw")
+    assert Metrics(enabled=True).enabled
+
+
+def test_watch_lapses_when_a_tab_stops_renewing():
+    """A tab closed with the panel open cannot unregister; its watch expires after the TTL"""
+    clock = FakeClock()
+    registry = Metrics(enabled=False, watch_ttl=30.0, clock=clock)
+    registry.watch("open-tab")
+    registry.watch("closed-tab")
+    clock.now = 20.0
+    registry.watch("open-tab")
+    clock.now = 40.0
+    assert registry.enabled
+    clock.now = 51.0
+    assert not registry.enabled and registry._watchers == {}
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    """p50/p95 land inside the bucket holding that rank"""
+    hist = Histogram(bounds=(0.01, 0.02, 0.04))
+    for seconds in [0.005] * 50 + [0.015] * 45 + [0.03] * 5:
+        hist.observe(seconds)
+    assert hist.quantile(0.5) == 0.01
+    assert 0.01 < hist.quantile(0.95) <= 0.02
+    assert hist.quantile(1.0) == 0.04
+    assert Histogram().quantile(0.5) is None
+
+
+def test_prometheus_export_is_cumulative():
+    """Buckets are cumulative and end with +Inf equal to the count"""
+    registry = Metrics(enabled=True)
+    for seconds in (0.0002, 0.003, 20.0):
+        registry.observe("draw", seconds)
+    text = registry.prometheus_text()
+    assert '# TYPE moodmate_stage_seconds histogram' in text
+    assert 'moodmate_stage_seconds_bucket{stage="draw",le="0.00025"} 1' in text
+    assert 'moodmate_stage_seconds_bucket{stage="draw",le="0.005"} 2' in text
+    assert 'moodmate_stage_seconds_bucket{stage="draw",le="+Inf"} 3' in text
+    assert 'moodmate_stage_seconds_count{stage="draw"} 3' in text
+
+
+def test_predict_speed_split(monkeypatch):
+    """ultralytics' per-image speed dict is recorded per predict call"""
+    registry = Metrics(enabled=True)
+    monkeypatch.setattr(metrics, "METRICS", registry)
+
+    class _Result:
+        speed = {"preprocess": 1.0, "inference": 10.0, "postprocess": 2.0}
+
+    metrics.observe_predict_speed([_Result()], frames=4)
+    rows = {row["stage"]: row for row in registry.summary()}
+    assert set(rows) == {"predict.preprocess", "predict.inference", "predict.postprocess"}
+    assert rows["predict.inference"]["total_s"] == 0.04
@@ -0,0 +1,55 @@
+"""
+Tests for adaptive webcam rate control (fake clock and stub model)
+"""
+
+import numpy as np
+
+from conftest import StubModel
+from moodmate.pipeline import StreamAnalyzer
+from moodmate.ratecontrol import RateController
+
+
+def _drive(rate, latency, frames, clock):
+    inferred = 0
+    for _ in range(frames):
+        clock[0] += 1 / 30
+        if rate.should_infer():
+            inferred += 1
+            rate.record(latency)
+    return inferred
+
+
+def test_slow_inference_skips_frames_and_lowers_resolution():
+    clock = [0.0]
+    rate = RateController(target_fps=15, latency_budget_ms=100, sizes=(640, 480, 320), cooldown=2,
+                          clock=lambda: clock[0])
+    inferred = _drive(rate, 0.3, 120, clock)
+
+    assert rate.imgsz == 320
+    # 300 ms per inference at 15 fps needs the model on at most every 5th frame
+    assert rate.skip == 5 and inferred < 40
+    stats = rate.stats()
+    assert stats["latency_ms"] == 300.0 and stats["analysis_fps"] < stats["output_fps"]
+
+
+def test_fast_inference_recovers_full_rate_and_size():
+    clock = [0.0]
+    rate = RateController(target_fps=15, latency_budget_ms=100, sizes=(640, 480, 320), cooldown=2,
+                          clock=lambda: clock[0])
+    _drive(rate, 0.3, 60, clock)
+    _drive(rate, 0.01, 200, clock)
+    assert rate.imgsz == 640 and rate.skip == 1
+
+
+def test_stream_analyzer_reuses_detections_on_skipped_frames():
+    model = StubModel()
+    rate = RateController(sizes=(320,))
+    rate.skip = 3
+    rate.latency = 0.1
+    analyzer = StreamAnalyzer(model, 0.25, rate=rate)
+    for _ in range(6):
+        analyzer.process(np.zeros((32, 32, 3), np.uint8))
+
+    assert model.sizes == [320, 320]
+    # Every frame still counts, skipped ones with the last detections
+    assert np.isclose(analyzer.weights["happy"], 0.9 * 6)
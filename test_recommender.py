@@ -0,0 +1,72 @@
+"""
+Tests for the vector-similarity recommender
+"""
+
+import time
+
+import numpy as np
+
+from moodmate import catalog_data
+from moodmate.catalog import Catalog, ItemTable
+from moodmate.config import EMOTION_CLASSES
+from moodmate.recommender import VectorRecommender
+
+
+def _synthetic_catalog(n_items):
+    rng = np.random.default_rng(0)
+    emotions = rng.integers(0, len(EMOTION_CLASSES), size=n_items)
+    entries = [("song", EMOTION_CLASSES[e], (f"Song {i}", "r", f"https://x/{i}")) for i, e in enumerate(emotions)]
+    return Catalog(entries, catalog_data.BREATHING_EXERCISES, ItemTable())
+
+
+def test_one_hot_distribution_prefers_that_emotion():
+    """A pure distribution ranks items listed only under that emotion first"""
+    catalog = Catalog.from_defaults(ItemTable())
+    songs, reads, therapy, breathing = VectorRecommender(catalog).recommend({"sleepy": 100.0})
+
+    sleepy_songs = set(catalog_data.YOUTUBE_SONGS["sleepy"])
+    assert len(songs) == 5
+    assert sum(song in sleepy_songs for song in songs) >= 4
+    assert breathing is catalog_data.BREATHING_EXERCISES["sleepy"]
+    assert list(therapy) == catalog_data.THERAPY_RESOURCES
+
+
+def test_mixed_distribution_uses_secondary_emotions():
+    """Items tagged with both leading emotions outrank single-emotion items"""
+    entries = [
+        ("song", "happy", ("Only happy", "", "")),
+        ("song", "sad", ("Only sad", "", "")),
+        ("song", "happy", ("Bittersweet", "", "")),
+        ("song", "sad", ("Bittersweet", "", "")),
+    ]
+    recommender = VectorRecommender(Catalog(entries, catalog_data.BREATHING_EXERCISES, ItemTable()))
+    songs, _, _, _ = recommender.recommend({"happy": 55.0, "sad": 45.0}, k=3)
+    assert [s[0] for s in songs] == ["Bittersweet", "Only happy", "Only sad"]
+
+
+def test_empty_distribution_falls_back_to_emotion_lists():
+    catalog = Catalog.from_defaults(ItemTable())
+    songs, _, _, _ = VectorRecommender(catalog).recommend({}, "sad", k=2)
+    assert list(songs) == catalog_data.YOUTUBE_SONGS["sad"][:2]
+
+
+def test_large_catalog_top_k():
+    """Top-k over 100k items is exact and fast enough to run on every rerun"""
+    recommender = VectorRecommender(_synthetic_catalog(100_000))
+    query = np.random.default_rng(1).random(len(EMOTION_CLASSES)).astype(np.float32)
+    query /= np.linalg.norm(query)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        top = recommender.top_k("song", query, 5)
+    elapsed = (time.perf_counter() - start) / 20
+
+    catalog = recommender.catalog
+    vectors = {}
+    for (kind, emotion), ids in catalog.index.items():
+        for item_id in ids:
+            vectors.setdefault(item_id, np.zeros(len(EMOTION_CLASSES), dtype=np.float32))[EMOTION_CLASSES.index(emotion)] = 1.0
+    scores = {i: float(v @ query / np.linalg.norm(v)) for i, v in vectors.items()}
+    best = sorted(scores.values(), reverse=True)[:5]
+    assert np.allclose([scores[i] for i in top], best)
+    assert elapsed < 0.01
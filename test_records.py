@@ -0,0 +1,40 @@
+"""
+Tests for compact session records
+"""
+
+from datetime import datetime
+
+from moodmate.catalog import ItemTable
+from moodmate.records import SessionRecord
+
+SONG = ("Pharrell Williams - Happy", "Upbeat rhythm", "https://www.youtube.com/watch?v=ZbZSe6N_BXs")
+READ = ("Gratitude Journaling Guide", "Free practice", "https://www.mindful.org/")
+THERAPY = ("NIMHANS (India)", "National mental health institute", "https://www.nimhans.ac.in/")
+
+
+def test_record_formats_on_read():
+    """Dates, session id and percentages are derived from compact fields"""
+    table = ItemTable()
+    record = SessionRecord.create(3, datetime(2024, 5, 1, 9, 30), "Image", "happy",
+                                  {"happy": 66.67, "sad": 33.33}, ([SONG], [READ], [THERAPY], {"name": "x"}), table)
+
+    assert record.session_id == "session_3"
+    assert record.date == "2024-05-01"
+    assert record.time == "09:30"
+    assert record.timestamp == datetime(2024, 5, 1, 9, 30)
+    assert record.emotion_percentages["happy"] == 66.67
+    assert record.emotion_percentages["angry"] == 0.0
+    assert record.percentages.dtype.name == "float32"
+    assert record.recommendations(table) == ([SONG], [READ], [THERAPY], "happy")
+
+
+def test_items_are_shared_between_records():
+    """Repeated catalog items are stored once and referenced by ID"""
+    table = ItemTable()
+    recs = ([SONG, READ], [READ], [THERAPY], "natural")
+    first = SessionRecord.create(1, datetime(2024, 5, 1), "Video", "natural", {}, recs, table)
+    second = SessionRecord.create(2, datetime(2024, 5, 2), "Video", "natural", {}, recs, table)
+
+    assert len(table) == 3
+    assert first.song_ids == second.song_ids == (0, 1)
+    assert table.get(first.read_ids[0]) is table.get(second.read_ids[0])
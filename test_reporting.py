@@ -0,0 +1,47 @@
+"""
+Tests for the session summary PDF
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+from moodmate.reporting import build_pdf, clean_text_for_pdf
+from moodmate.thumbnails import encode_thumbnail
+
+
+def test_clean_text_strips_unencodable_characters():
+    """Smart quotes become ASCII and emoji are dropped"""
+    assert clean_text_for_pdf("“Hi” – it’s 🎵 time") == '"Hi" - it\'s  time'
+    assert clean_text_for_pdf("x" * 20, max_length=10) == "xxxxxxx..."
+
+
+def test_build_pdf_with_images_and_emoji(tmp_path):
+    """Personalized titles with emoji and in-memory images (arrays or JPEG thumbnails) render to a PDF"""
+    items = [("🎯 Focus Mix", "Because you're calm", "https://example.com")]
+    path = build_pdf(
+        {"timestamp": "2024-01-01 10:00:00", "input_mode": "Image"},
+        {"happy": 100.0},
+        "happy",
+        (items, items, items),
+        detection_images=[np.zeros((32, 32, 3), np.uint8), encode_thumbnail(np.zeros((32, 32, 3), np.uint8))],
+        outputs_dir=str(tmp_path),
+    )
+    with open(path, "rb") as f:
+        assert f.read(5) == b"%PDF-"
+
+
+def test_build_pdf_lists_people(tmp_path):
+    """Several tracked faces add a per-person section with the group mood"""
+    people = [
+        {"label": "Person 1", "frames": 10, "dominant": "happy", "percentages": {"happy": 80.0, "sad": 20.0}},
+        {"label": "Person 2", "frames": 6, "dominant": "sad", "percentages": {"happy": 10.0, "sad": 90.0}},
+    ]
+    path = build_pdf({"timestamp": "2024-01-01 10:00:00", "input_mode": "Video"}, {"happy": 50.0, "sad": 50.0},
+                     "happy", ([], [], []), outputs_dir=str(tmp_path), people=people)
+    with open(path, "rb") as f:
+        streams = re.findall(rb"stream\r?\n(.*?)\r?\nendstream", f.read(), re.S)
+    text = b"".join(zlib.decompress(s) for s in streams if s[:1] == b"x").decode("latin-1")
+    text = text.replace("\\(", "(").replace("\\)", ")")
+    assert "People Detected: 2" in text and "Person 2 (6 frames): Sad - Sad 90.0%" in text
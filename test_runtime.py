@@ -0,0 +1,81 @@
+"""
+Tests for thread/worker tuning and the model replica pool
+"""
+
+import threading
+import time
+
+import pytest
+
+from moodmate import runtime
+from moodmate.model import ModelPool
+from moodmate.runtime import RuntimeConfig, candidate_settings, parse_cpu_list
+
+
+class SlowModel:
+    """Stub replica that records how many predictions overlap"""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def predict(self, frame, **kwargs):
+        with SlowModel.lock:
+            SlowModel.active += 1
+            SlowModel.peak = max(SlowModel.peak, SlowModel.active)
+        time.sleep(0.01)
+        with SlowModel.lock:
+            SlowModel.active -= 1
+        return []
+
+
+def test_config_from_env():
+    env = {"MOODMATE_TORCH_THREADS": "2", "MOODMATE_CV2_THREADS": "0", "MOODMATE_WORKERS": "3",
+           "MOODMATE_CPU_AFFINITY": "0-2,5", "MOODMATE_AUTOTUNE": "0"}
+    assert RuntimeConfig.from_env(env) == RuntimeConfig(2, 0, 3, (0, 1, 2, 5), "")
+    assert RuntimeConfig.from_env({}) == RuntimeConfig()
+    with pytest.raises(ValueError):
+        RuntimeConfig.from_env({"MOODMATE_WORKERS": "many"})
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("3, 0-1") == (0, 1, 3)
+    with pytest.raises(ValueError):
+        parse_cpu_list("a-b")
+
+
+def test_candidates_never_oversubscribe():
+    for cpus in (1, 4, 6, 16):
+        pairs = candidate_settings(cpus)
+        assert (1, 1) in pairs and (cpus, 1) in pairs
+        assert all(t * w <= cpus for t, w in pairs)
+
+
+def test_pool_limits_concurrency_and_grows_lazily():
+    """At most `size` predictions overlap and replicas are only built when needed"""
+    SlowModel.peak = 0
+    loads = []
+    pool = ModelPool(lambda: loads.append(1) or SlowModel(), size=2)
+    threads = [threading.Thread(target=lambda: [pool.predict(None) for _ in range(3)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 2 and SlowModel.peak == 2
+
+
+def test_autotune_result_is_cached(tmp_path, monkeypatch):
+    """The winner is stored per host/model; explicit settings override it"""
+    monkeypatch.setattr(runtime, "apply_threads", lambda *args: None)
+    monkeypatch.setattr(runtime, "available_cpus", lambda: 2)
+    speeds = {(1, 1): 5.0, (1, 2): 9.0, (2, 1): 7.0}
+    monkeypatch.setattr(runtime, "measure_throughput",
+                        lambda models, threads, frame: speeds[(threads, len(models))])
+    path = str(tmp_path / "tuning.json")
+
+    config = runtime.tuned_config(RuntimeConfig(autotune="1"), SlowModel, "last.pt", path, log=lambda _: None)
+    assert (config.torch_threads, config.workers) == (1, 2)
+
+    speeds.clear()  # a second measurement would fail
+    cached = runtime.tuned_config(RuntimeConfig(autotune="1", torch_threads=2), SlowModel, "last.pt", path)
+    assert (cached.torch_threads, cached.workers) == (2, 2)
@@ -0,0 +1,51 @@
+"""
+Tests for change-detection frame skipping
+"""
+
+import numpy as np
+
+from moodmate.sampling import ChangeDetector, keyframe_batches
+
+
+def _scene(value, size=(240, 320)):
+    return np.full(size + (3,), value, np.uint8)
+
+
+def _talking_head(i):
+    """Static background with a small 'mouth' region that flickers every frame"""
+    frame = _scene(90)
+    frame[150:160, 150:170] = 40 if i % 2 else 200
+    return frame
+
+
+def test_detector_skips_static_and_catches_changes():
+    """Unchanged frames are skipped; a scene cut becomes a keyframe"""
+    detector = ChangeDetector(threshold=3.0, max_skip=100)
+    flags = [detector.is_keyframe(f) for f in [_scene(10)] * 4 + [_scene(200)] * 3]
+    assert flags == [True, False, False, False, True, False, False]
+    assert detector.keyframes == 2 and detector.frames == 7
+
+
+def test_max_skip_forces_keyframes():
+    detector = ChangeDetector(threshold=3.0, max_skip=2)
+    flags = [detector.is_keyframe(_scene(10)) for _ in range(7)]
+    assert flags == [True, False, False, True, False, False, True]
+
+
+def test_zero_threshold_disables_skipping():
+    detector = ChangeDetector(threshold=0)
+    assert all(detector.is_keyframe(_scene(10)) for _ in range(3))
+
+
+def test_talking_head_needs_few_inferences():
+    """Small local motion stays under the threshold"""
+    detector = ChangeDetector()
+    keyframes = sum(detector.is_keyframe(_talking_head(i)) for i in range(90))
+    assert keyframes <= 90 // 10
+
+
+def test_keyframe_batches_carry_weights():
+    """Reused frames add to the weight of the keyframe before them; every frame is counted once"""
+    frames = enumerate([_scene(10)] * 3 + [_scene(200)] * 2 + [_scene(10)] + [_scene(120)] * 2)
+    batches = list(keyframe_batches(frames, batch=2, detector=ChangeDetector(threshold=3.0)))
+    assert [[(k.index, k.weight) for k in b] for b in batches] == [[(0, 3), (3, 2)], [(5, 1), (6, 2)]]
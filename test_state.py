@@ -0,0 +1,190 @@
+"""
+Tests for the external per-user state backends and read-through cache
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from moodmate.catalog import ItemTable, item_key
+from moodmate.records import SessionRecord
+from moodmate.state import (USER_PREFIX, CachedBackend, MemoryBackend, UserStore, backend_from_url, sign_user,
+                            user_from_token, valid_user_id)
+
+SONG = ("Pharrell Williams - Happy", "Upbeat rhythm", "https://www.youtube.com/watch?v=ZbZSe6N_BXs")
+RECOMMENDATIONS = ([SONG], [], [], "happy")
+BACKENDS = ["memory://", "sqlite:///{tmp}/state.db", "file:///{tmp}/state"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.starts = []
+
+    def range(self, key, start=0):
+        self.starts.append(start)
+        return super().range(key, start)
+
+
+def _save(store, user="user1234", emotion="happy"):
+    store.save_session(user, {"dominant": emotion, "percentages": {emotion: 100.0}}, RECOMMENDATIONS, "Image",
+                       timestamp=datetime(2024, 5, 1, 9, 30))
+
+
+def test_record_round_trips_by_item_key():
+    """Item IDs are process-local, so rows reference items by content hash"""
+    table, other = ItemTable(), ItemTable()
+    other.intern(("Something else", "", ""))
+    record = SessionRecord.create(2, datetime(2024, 5, 1), "Video", "sad", {"sad": 75.0, "fear": 25.0},
+                                  RECOMMENDATIONS, table)
+    row = record.to_dict(table)
+    assert row["songs"] == [item_key(SONG)]
+
+    other.intern(SONG)
+    restored = SessionRecord.from_dict(row, 7, other)
+    assert restored.number == 7 and restored.emotion_percentages == record.emotion_percentages
+    assert restored.song_ids == (1,) and restored.recommendations(other) == ([SONG], [], [], "happy")
+
+
+@pytest.mark.parametrize("url", BACKENDS)
+def test_backends_store_values_and_logs(url, tmp_path):
+    backend = backend_from_url(url.format(tmp=tmp_path))
+    assert backend.get("k") is None and backend.range("k") == []
+    assert backend.add("k", b"one") and not backend.add("k", b"two")
+    assert backend.get("k") == b"one"
+    backend.set("k", b"three")
+    assert backend.get("k") == b"three"
+    assert [backend.append("k", value) for value in (b"a", b"b", b"c")] == [0, 1, 2]
+    assert backend.range("k") == [b"a", b"b", b"c"] and backend.range("k", 2) == [b"c"]
+    backend.erase("k", 2)
+    assert backend.range("k") == [b"", b"", b"c"]
+    backend.delete("k")
+    assert backend.get("k") is None and backend.range("k") == []
+
+
+def test_cache_fetches_only_the_tail_after_ttl():
+    clock = FakeClock()
+    backend = CountingBackend()
+    cache = CachedBackend(backend, ttl=2.0, clock=clock)
+    backend.append("k", b"a")
+
+    assert cache.range("k") == [b"a"] and cache.range("k") == [b"a"] and backend.starts == [0]
+    backend.append("k", b"b")
+    clock.now = 3.0
+    assert cache.range("k") == [b"a", b"b"] and backend.starts == [0, 1]
+    # An append through the cache is visible on the next read
+    cache.append("k", b"c")
+    assert cache.range("k") == [b"a", b"b", b"c"] and backend.starts == [0, 1, 2]
+
+
+def test_store_replays_sessions_and_clears():
+    store = UserStore(CachedBackend(MemoryBackend(), ttl=0.0), ItemTable())
+    _save(store)
+    _save(store, emotion="sad")
+    tracker = store.load("user1234")
+    assert [(r.number, r.dominant_emotion) for r in tracker.history] == [(1, "happy"), (2, "sad")]
+    assert tracker.history[0].recommendations(store.table)[0] == [SONG]
+
+    store.clear("user1234")
+    _save(store, emotion="fear")
+    history = store.load("user1234").history
+    assert [(r.number, r.dominant_emotion) for r in history] == [(1, "fear")]
+
+
+def test_load_applies_only_new_events():
+    """A warm load reads the tail past the cached tracker and extends a copy of it"""
+    backend = CountingBackend()
+    store = UserStore(CachedBackend(backend, ttl=0.0), ItemTable())
+    for _ in range(3):
+        _save(store)
+    before = store.load("user1234")
+    _save(store, emotion="sad")
+    after = store.load("user1234")
+
+    assert backend.starts == [0, 3]
+    assert len(before.history) == 3 and len(before.frame) == 3 and before.insights.total_sessions == 3
+    assert [r.number for r in after.history] == [1, 2, 3, 4] and len(after.frame) == 4
+    assert after.mood_insights()["most_common_emotion"] == "happy" and after.insights.recent[-1] == "sad"
+
+
+def test_cold_load_starts_at_the_last_clear():
+    """Cleared rows are blanked and a new replica replays from the clear, keeping its preferences"""
+    backend = MemoryBackend()
+    store = UserStore(CachedBackend(backend, ttl=0.0), ItemTable())
+    _save(store)
+    _save(store, emotion="sad")
+    store.clear("user1234")
+    _save(store, emotion="fear")
+
+    assert backend.range(USER_PREFIX + "user1234", 0)[:2] == [b"", b""]
+    counting = CountingBackend()
+    counting._values, counting._logs = backend._values, backend._logs
+    cold = UserStore(CachedBackend(counting, ttl=0.0), ItemTable()).load("user1234")
+    assert counting.starts == [2]
+    assert [(r.number, r.dominant_emotion) for r in cold.history] == [(1, "fear")]
+    assert cold.preferences == store.load("user1234").preferences
+    assert cold.preferences["favorite_genres"] == ["happy", "sad", "fear"]
+
+
+def test_replicas_share_users_through_the_backend(tmp_path):
+    """Two app processes on one SQLite file (each with its own item table) see each other's sessions"""
+    clock = FakeClock()
+    url = f"sqlite:///{tmp_path}/state.db"
+    a = UserStore(CachedBackend(backend_from_url(url), ttl=2.0, clock=clock), ItemTable())
+    b = UserStore(CachedBackend(backend_from_url(url), ttl=2.0, clock=clock), ItemTable())
+    assert len(b.load("user1234").history) == 0
+
+    _save(a)
+    # b serves its cached (empty) read until the TTL, but its own save is not lost
+    assert len(b.load("user1234").history) == 0
+    _save(b, emotion="sad")
+    clock.now = 3.0
+
+    for store in (a, b):
+        history = store.load("user1234").history
+        assert [r.dominant_emotion for r in history] == ["happy", "sad"]
+        assert history[1].recommendations(store.table)[0] == [SONG]
+
+
+def test_concurrent_saves_are_all_kept(tmp_path):
+    url = f"sqlite:///{tmp_path}/state.db"
+    stores = [UserStore(CachedBackend(backend_from_url(url), ttl=0.0), ItemTable()) for _ in range(4)]
+    threads = [threading.Thread(target=lambda s=s: [_save(s) for _ in range(5)]) for s in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stores[0].load("user1234").history) == 20
+
+
+def test_unchanged_log_reuses_the_decoded_tracker():
+    store = UserStore(CachedBackend(MemoryBackend(), ttl=0.0))
+    _save(store)
+    tracker = store.load("user1234")
+    assert store.load("user1234") is tracker
+    _save(store)
+    # A save builds a new tracker instead of changing the one other sessions hold
+    assert store.load("user1234") is not tracker and len(tracker.history) == 1
+
+
+def test_user_ids_are_validated():
+    assert valid_user_id("7e39ee148f11d253ceea62895df68cb7")
+    assert not valid_user_id(None) and not valid_user_id("short") and not valid_user_id("../../etc/passwd")
+
+
+def test_user_tokens_are_signed():
+    token = sign_user("7e39ee148f11d253ceea62895df68cb7", b"key")
+    assert user_from_token(token, b"key") == "7e39ee148f11d253ceea62895df68cb7"
+    forged = "0" * 32 + token[32:]
+    assert user_from_token(forged, b"key") is None and user_from_token(token, b"other") is None
+    assert user_from_token("7e39ee148f11d253ceea62895df68cb7", b"key") is None and user_from_token(None, b"key") is None
@@ -0,0 +1,60 @@
+"""
+Tests for the bounded JPEG thumbnail store
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from moodmate.thumbnails import ThumbnailStore, encode_thumbnail
+
+
+def _frame(value=0, size=(480, 640)):
+    return np.full(size + (3,), value, np.uint8)
+
+
+def test_encode_downscales_longer_side():
+    """Thumbnails are JPEGs no larger than max_side"""
+    jpeg = encode_thumbnail(_frame(), max_side=160)
+    img = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert jpeg[:2] == b"\xff\xd8"
+    assert img.shape[:2] == (120, 160)
+
+
+def test_confidence_policy_keeps_best_frames_in_order():
+    """The most confident frames of the whole stream survive, in stream order"""
+    store = ThumbnailStore(capacity=3, policy="confidence")
+    scores = [0.2, 0.9, 0.1, 0.5, 0.95, 0.3, 0.8]
+    for i, score in enumerate(scores):
+        store.offer(i, score, lambda: _frame())
+    assert [t.index for t in store.thumbnails()] == [1, 4, 6]
+    assert store.seen == len(scores) and len(store.images()) == 3
+
+
+def test_rejected_frames_are_not_rendered():
+    """render() only runs for admitted frames"""
+    store = ThumbnailStore(capacity=2, policy="confidence")
+    rendered = []
+
+    def render(i):
+        rendered.append(i)
+        return _frame()
+
+    for i, score in enumerate([0.9, 0.8, 0.1, 0.2, 0.95]):
+        store.offer(i, score, lambda i=i: render(i))
+    assert rendered == [0, 1, 4]
+
+
+def test_reservoir_is_bounded_and_spans_the_stream():
+    """Reservoir sampling keeps capacity frames drawn from the whole stream"""
+    store = ThumbnailStore(capacity=5, policy="reservoir", seed=1)
+    for i in range(500):
+        store.offer(i, 0.0, lambda: _frame(size=(48, 64)))
+    indexes = [t.index for t in store.thumbnails()]
+    assert len(indexes) == 5 and indexes == sorted(indexes)
+    assert max(indexes) >= 100
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        ThumbnailStore(policy="newest")
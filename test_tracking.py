@@ -0,0 +1,73 @@
+"""
+Tests for per-face identity tracks and the group summary
+"""
+
+import numpy as np
+
+from moodmate.aggregation import Detections
+from moodmate.config import EMOTION_CLASSES
+from moodmate.tracking import FaceTracker, group_summary, iou_matrix, match_boxes
+
+HAPPY, SAD = EMOTION_CLASSES.index("happy"), EMOTION_CLASSES.index("sad")
+
+
+def _det(boxes, classes, conf=0.9):
+    boxes = np.array(boxes, np.float32).reshape(-1, 4)
+    return Detections(boxes, np.full(len(boxes), conf, np.float32), np.array(classes, np.int16))
+
+
+def test_iou_matrix_matches_pairwise_definition():
+    a = np.array([[0, 0, 10, 10], [5, 5, 15, 15]], np.float32)
+    b = np.array([[0, 0, 10, 10], [10, 10, 20, 20], [100, 100, 110, 110]], np.float32)
+    iou = iou_matrix(a, b)
+    assert iou.shape == (2, 3)
+    assert np.isclose(iou[0, 0], 1.0) and iou[0, 2] == 0.0
+    assert np.isclose(iou[1, 1], 25 / 175)
+    assert iou_matrix(a, np.zeros((0, 4), np.float32)).shape == (2, 0)
+
+
+def test_match_boxes_is_one_to_one():
+    """Two tracks competing for one box: the better overlap wins, the other stays unmatched"""
+    rows, cols = match_boxes(np.array([[0.9, 0.0], [0.8, 0.0], [0.0, 0.5]]), threshold=0.3)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0), (2, 1)]
+
+
+def test_people_keep_their_ids_when_boxes_are_reordered():
+    tracker = FaceTracker()
+    left, right = [0, 0, 50, 50], [200, 0, 250, 50]
+    for step in range(5):
+        shift = [step * 2, 0, step * 2, 0]
+        frame = [np.add(left, shift), np.add(right, shift)]
+        classes = [HAPPY, SAD]
+        if step % 2:
+            frame, classes = frame[::-1], classes[::-1]
+        ids = tracker.update(_det(frame, classes))
+        assert sorted(ids.tolist()) == [0, 1]
+
+    people = tracker.people()
+    assert [p["dominant"] for p in people] == ["happy", "sad"]
+    assert all(p["frames"] == 5 for p in people)
+    group = tracker.group()
+    assert group["people"] == 2 and group["agreement"] == 0.5
+    assert group["percentages"]["happy"] == group["percentages"]["sad"] == 50.0
+
+
+def test_tracks_close_after_missed_frames_but_keep_their_counts():
+    tracker = FaceTracker(max_missed=2)
+    for _ in range(3):
+        tracker.update(_det([0, 0, 50, 50], [HAPPY]))
+    for _ in range(3):
+        tracker.update(Detections.empty())
+    assert len(tracker.ids) == 0
+    # Same place again, but the old track is gone: a new person
+    assert tracker.update(_det([0, 0, 50, 50], [HAPPY])).tolist() == [1]
+    assert [p["frames"] for p in tracker.people(min_frames=1)] == [3, 1]
+
+
+def test_short_tracks_are_left_out_of_the_summary():
+    tracker = FaceTracker()
+    tracker.update(_det([[0, 0, 50, 50], [300, 300, 350, 350]], [HAPPY, SAD]))
+    tracker.update(_det([0, 0, 50, 50], [HAPPY]))
+    tracker.update(_det([0, 0, 50, 50], [HAPPY]))
+    assert [p["dominant"] for p in tracker.people()] == ["happy"]
+    assert group_summary([])["people"] == 0